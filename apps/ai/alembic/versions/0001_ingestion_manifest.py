@@ -0,0 +1,49 @@
+"""ingestion manifest and chunk content hashes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ingestion_manifest',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('funding_id', sa.Integer(), nullable=False),
+        sa.Column('source_path', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['funding_id'], ['fundings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('funding_id', 'source_path')
+    )
+    op.add_column('funding_chunks', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('funding_chunks', sa.Column('manifest_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'funding_chunks_manifest_id_fkey', 'funding_chunks', 'ingestion_manifest',
+        ['manifest_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_funding_chunks_content_hash', 'funding_chunks', ['content_hash'])
+    op.create_index('ix_funding_chunks_manifest_id', 'funding_chunks', ['manifest_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_funding_chunks_manifest_id', table_name='funding_chunks')
+    op.drop_index('ix_funding_chunks_content_hash', table_name='funding_chunks')
+    op.drop_constraint('funding_chunks_manifest_id_fkey', 'funding_chunks', type_='foreignkey')
+    op.drop_column('funding_chunks', 'manifest_id')
+    op.drop_column('funding_chunks', 'content_hash')
+    op.drop_table('ingestion_manifest')
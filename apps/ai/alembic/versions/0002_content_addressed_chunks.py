@@ -0,0 +1,101 @@
+"""content-addressed chunks shared across fundings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'funding_chunk_links',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('funding_id', sa.Integer(), nullable=False),
+        sa.Column('chunk_id', sa.Integer(), nullable=False),
+        sa.Column('manifest_id', sa.Integer(), nullable=True),
+        sa.Column('page_no', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['funding_id'], ['fundings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['chunk_id'], ['funding_chunks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['manifest_id'], ['ingestion_manifest.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('manifest_id', 'chunk_id')
+    )
+    op.create_index('ix_funding_chunk_links_funding_id', 'funding_chunk_links', ['funding_id'])
+    op.create_index('ix_funding_chunk_links_chunk_id', 'funding_chunk_links', ['chunk_id'])
+
+    # Rows written before hashing existed
+    op.execute("""
+        UPDATE funding_chunks
+        SET content_hash = encode(sha256(convert_to(chunk_text, 'UTF8')), 'hex')
+        WHERE content_hash IS NULL
+    """)
+
+    # Every existing row becomes a link to the lowest id holding the same text.
+    # Legacy rows have no manifest, and NULLs never conflict in the unique constraint,
+    # so duplicates are collapsed here (DISTINCT ON treats NULLs as equal, keeping the
+    # first page) and rows already linked are skipped, keeping a re-run idempotent.
+    op.execute("""
+        INSERT INTO funding_chunk_links (funding_id, chunk_id, manifest_id, page_no)
+        SELECT DISTINCT ON (c.funding_id, k.id, c.manifest_id) c.funding_id, k.id, c.manifest_id, c.page_no
+        FROM funding_chunks c
+        JOIN (SELECT content_hash, min(id) AS id FROM funding_chunks GROUP BY content_hash) k
+            ON k.content_hash = c.content_hash
+        WHERE NOT EXISTS (
+            SELECT 1 FROM funding_chunk_links l
+            WHERE l.funding_id = c.funding_id
+              AND l.chunk_id = k.id
+              AND l.manifest_id IS NOT DISTINCT FROM c.manifest_id
+        )
+        ORDER BY c.funding_id, k.id, c.manifest_id, c.page_no NULLS LAST
+        ON CONFLICT (manifest_id, chunk_id) DO NOTHING
+    """)
+    op.execute("""
+        DELETE FROM funding_chunks c
+        USING funding_chunks k
+        WHERE c.content_hash = k.content_hash AND c.id > k.id
+    """)
+
+    op.drop_index('ix_funding_chunks_content_hash', table_name='funding_chunks')
+    op.drop_column('funding_chunks', 'manifest_id')
+    op.drop_column('funding_chunks', 'page_no')
+    op.drop_column('funding_chunks', 'funding_id')
+    op.alter_column('funding_chunks', 'content_hash', nullable=False)
+    op.create_unique_constraint('funding_chunks_content_hash_key', 'funding_chunks', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('funding_chunks_content_hash_key', 'funding_chunks', type_='unique')
+    op.add_column('funding_chunks', sa.Column('funding_id', sa.Integer(), nullable=True))
+    op.add_column('funding_chunks', sa.Column('page_no', sa.Integer(), nullable=True))
+    op.add_column('funding_chunks', sa.Column('manifest_id', sa.Integer(), nullable=True))
+
+    # One row per link again; the shared originals are dropped afterwards
+    op.execute("""
+        INSERT INTO funding_chunks
+            (funding_id, manifest_id, page_no, chunk_text, embedding, content_hash, created_at, updated_at)
+        SELECT l.funding_id, l.manifest_id, l.page_no, c.chunk_text, c.embedding, c.content_hash, c.created_at, c.updated_at
+        FROM funding_chunk_links l
+        JOIN funding_chunks c ON c.id = l.chunk_id
+    """)
+    op.drop_table('funding_chunk_links')
+    op.execute("DELETE FROM funding_chunks WHERE funding_id IS NULL")
+
+    op.alter_column('funding_chunks', 'funding_id', nullable=False)
+    op.alter_column('funding_chunks', 'content_hash', nullable=True)
+    op.create_foreign_key('funding_chunks_funding_id_fkey', 'funding_chunks', 'fundings', ['funding_id'], ['id'])
+    op.create_foreign_key(
+        'funding_chunks_manifest_id_fkey', 'funding_chunks', 'ingestion_manifest',
+        ['manifest_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_funding_chunks_content_hash', 'funding_chunks', ['content_hash'])
+    op.create_index('ix_funding_chunks_manifest_id', 'funding_chunks', ['manifest_id'])
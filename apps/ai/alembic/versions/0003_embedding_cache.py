@@ -0,0 +1,42 @@
+"""persistent embedding cache
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'embedding_cache',
+        sa.Column('text_hash', sa.String(length=64), nullable=False),
+        sa.Column('model_id', sa.String(), nullable=False),
+        sa.Column('dims', sa.Integer(), nullable=False),
+        sa.Column('vector', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('text_hash', 'model_id', 'dims')
+    )
+
+    # Every stored chunk so far was embedded with Titan v2 at 1024 dimensions
+    op.execute("""
+        INSERT INTO embedding_cache (text_hash, model_id, dims, vector, created_at)
+        SELECT content_hash, 'amazon.titan-embed-text-v2:0', 1024, embedding, now() AT TIME ZONE 'utc'
+        FROM funding_chunks
+        WHERE embedding IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('embedding_cache')
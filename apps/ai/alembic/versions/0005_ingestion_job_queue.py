@@ -0,0 +1,42 @@
+"""ingestion job queue: leases, retries and catalog jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('ingestion_jobs', 's3_key', nullable=True)
+    op.add_column('ingestion_jobs', sa.Column('source_path', sa.String(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('ingestion_jobs', sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'))
+    op.add_column('ingestion_jobs', sa.Column('run_after', sa.DateTime(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('locked_by', sa.String(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('locked_until', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE ingestion_jobs SET run_after = created_at")
+    op.alter_column('ingestion_jobs', 'run_after', nullable=False)
+    op.create_index('ix_ingestion_jobs_status_run_after', 'ingestion_jobs', ['status', 'run_after'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingestion_jobs_status_run_after', table_name='ingestion_jobs')
+    op.drop_column('ingestion_jobs', 'locked_until')
+    op.drop_column('ingestion_jobs', 'locked_by')
+    op.drop_column('ingestion_jobs', 'run_after')
+    op.drop_column('ingestion_jobs', 'max_attempts')
+    op.drop_column('ingestion_jobs', 'attempts')
+    op.drop_column('ingestion_jobs', 'source_path')
+    op.execute("DELETE FROM ingestion_jobs WHERE s3_key IS NULL")
+    op.alter_column('ingestion_jobs', 's3_key', nullable=False)
@@ -0,0 +1,31 @@
+"""ocr page cache
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ocr_page_cache',
+        sa.Column('page_hash', sa.String(length=64), nullable=False),
+        sa.Column('engine', sa.String(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('page_hash', 'engine')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ocr_page_cache')
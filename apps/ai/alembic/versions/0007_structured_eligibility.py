@@ -0,0 +1,122 @@
+"""structured eligibility columns on fundings
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import re
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of app/services/eligibility.py at this revision, so the backfill
+# gives the same result however the app's extraction changes later
+_SECTOR_TAGS = {
+    "technology": [r"technology", r"tech", r"ict", r"software", r"digital (economy|content)", r"it services", r"msc"],
+    "creative": [r"creative", r"digital content", r"animation", r"games?", r"film", r"media", r"digital comics?"],
+    "tourism": [r"tourism", r"hospitality", r"travel", r"hotels?"],
+    "manufacturing": [r"manufactur\w*", r"factory", r"industrial"],
+    "agriculture": [r"agricultur\w*", r"agro\w*", r"farming", r"plantation", r"fisher\w*"],
+    "services": [r"professional services", r"retail", r"trading", r"wholesale"],
+    "construction": [r"construction", r"property"],
+}
+_SECTOR_PATTERNS = {
+    tag: re.compile(r"\b(" + "|".join(patterns) + r")\b", re.IGNORECASE)
+    for tag, patterns in _SECTOR_TAGS.items()
+}
+_ALL_SECTORS = re.compile(r"\b(all|any) (economic )?sectors\b", re.IGNORECASE)
+_UPPER_BOUND = r"(?:≤|<=|<|not exceeding|not more than|no more than|up to|below|under|less than|fewer than|maximum of|max\.?)"
+_MULTIPLIERS = {"k": 1e3, "m": 1e6, "mil": 1e6, "million": 1e6, "b": 1e9, "bil": 1e9, "billion": 1e9}
+_REVENUE_CAP = re.compile(
+    r"\b(?:revenue|turnover|sales)\b[^.;]{0,40}?" + _UPPER_BOUND + r"\s*RM\s*([\d.,]+)\s*(k|m|mil|million|b|bil|billion)?\b",
+    re.IGNORECASE
+)
+_EMPLOYEE_CAP = re.compile(
+    _UPPER_BOUND + r"\s*(\d[\d,]*)\s*(?:full[- ]time\s+)?(?:employees|workers|staff)\b"
+    r"|(\d[\d,]*)\s*(?:full[- ]time\s+)?(?:employees|workers|staff)\s*(?:or fewer|or less|and below)",
+    re.IGNORECASE
+)
+_MALAYSIAN_EQUITY = re.compile(
+    r"(?:≥|>=|at least|minimum of|min\.?)?\s*(\d{2,3})\s*%\s*(?:Malaysian|local|Bumiputera)\s*(?:equity|owned|ownership|shareholding)",
+    re.IGNORECASE
+)
+_MIN_AMOUNT = re.compile(
+    r"\b(?:minimum|min\.?)\s*(?:financing|grant|loan|funding|facility)\s*(?:amount|size)?\s*(?:of|is)?\s*RM\s*([\d.,]+)\s*(k|m|mil|million|b|bil|billion)?\b",
+    re.IGNORECASE
+)
+
+
+def _ringgit(number, unit):
+    return float(number.replace(",", "").rstrip(".")) * _MULTIPLIERS.get((unit or "").lower(), 1)
+
+
+def _extract_criteria(sector, eligibility):
+    text = eligibility or ""
+    tags = sorted(tag for tag, pattern in _SECTOR_PATTERNS.items() if pattern.search(sector)) if sector else []
+    sectors = None if _ALL_SECTORS.search(text) else (tags or None)
+
+    revenue_caps = [_ringgit(number, unit) for number, unit in _REVENUE_CAP.findall(text)]
+    employee_caps = [int((bounded or trailing).replace(",", "")) for bounded, trailing in _EMPLOYEE_CAP.findall(text)]
+
+    equity = [int(share) for share in _MALAYSIAN_EQUITY.findall(text)]
+    malaysian_owned = bool(equity) and max(equity) > 50 and not re.search(r"\bforeign[- ]", text, re.IGNORECASE)
+    if re.search(r"\bMalaysian[- ]owned\b", text, re.IGNORECASE):
+        malaysian_owned = True
+
+    match = _MIN_AMOUNT.search(text)
+
+    return {
+        "sectors": sectors,
+        "max_revenue": max(revenue_caps) if revenue_caps else None,
+        "max_employees": max(employee_caps) if employee_caps else None,
+        "malaysian_owned": malaysian_owned,
+        "min_amount": _ringgit(*match.groups()) if match else None,
+    }
+
+
+def upgrade() -> None:
+    op.add_column('fundings', sa.Column('sectors', postgresql.ARRAY(sa.String()), nullable=True))
+    op.add_column('fundings', sa.Column('max_employees', sa.Integer(), nullable=True))
+    op.add_column('fundings', sa.Column('max_revenue', sa.Float(), nullable=True))
+    op.add_column('fundings', sa.Column('min_amount', sa.Float(), nullable=True))
+    op.add_column('fundings', sa.Column('malaysian_owned', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column('fundings', 'malaysian_owned', server_default=None)
+
+    # Existing grants get the same extraction ingestion applies from now on
+    connection = op.get_bind()
+    fundings = connection.execute(sa.text("SELECT id, sector, eligibility FROM fundings")).fetchall()
+    for funding_id, sector, eligibility in fundings:
+        criteria = _extract_criteria(sector, eligibility)
+        connection.execute(
+            sa.text("""
+                UPDATE fundings
+                SET sectors = :sectors, max_employees = :max_employees, max_revenue = :max_revenue,
+                    min_amount = :min_amount, malaysian_owned = :malaysian_owned
+                WHERE id = :id
+            """),
+            {**criteria, "id": funding_id}
+        )
+
+    op.create_index('ix_fundings_sectors', 'fundings', ['sectors'], postgresql_using='gin')
+    op.create_index('ix_fundings_max_employees', 'fundings', ['max_employees'])
+    op.create_index('ix_fundings_max_revenue', 'fundings', ['max_revenue'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fundings_max_revenue', table_name='fundings')
+    op.drop_index('ix_fundings_max_employees', table_name='fundings')
+    op.drop_index('ix_fundings_sectors', table_name='fundings')
+    op.drop_column('fundings', 'malaysian_owned')
+    op.drop_column('fundings', 'min_amount')
+    op.drop_column('fundings', 'max_revenue')
+    op.drop_column('fundings', 'max_employees')
+    op.drop_column('fundings', 'sectors')
@@ -0,0 +1,47 @@
+"""company grant match matrix
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'company_grant_matches',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('funding_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['funding_id'], ['fundings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id', 'funding_id')
+    )
+    op.create_index('ix_company_grant_matches_company_rank', 'company_grant_matches', ['company_id', 'rank'])
+    op.create_index('ix_company_grant_matches_funding_id', 'company_grant_matches', ['funding_id'])
+    op.create_table(
+        'match_refresh_state',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('companies_watermark', sa.DateTime(), nullable=True),
+        sa.Column('fundings_watermark', sa.DateTime(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('match_refresh_state')
+    op.drop_index('ix_company_grant_matches_funding_id', table_name='company_grant_matches')
+    op.drop_index('ix_company_grant_matches_company_rank', table_name='company_grant_matches')
+    op.drop_table('company_grant_matches')
@@ -0,0 +1,63 @@
+"""is_active flags and partial indexes for active grants
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('fundings', sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.alter_column('fundings', 'is_active', server_default=None)
+    op.add_column('funding_chunks', sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+    op.execute("""
+        UPDATE fundings
+        SET is_active = (deadline IS NULL OR deadline > timezone('utc', now()))
+    """)
+    op.execute("""
+        UPDATE funding_chunks c
+        SET is_active = EXISTS (
+            SELECT 1 FROM funding_chunk_links l
+            JOIN fundings f ON f.id = l.funding_id
+            WHERE l.chunk_id = c.id AND f.is_active
+        )
+    """)
+
+    # Eligibility indexes from 0007 become partial
+    op.drop_index('ix_fundings_sectors', table_name='fundings')
+    op.drop_index('ix_fundings_max_employees', table_name='fundings')
+    op.drop_index('ix_fundings_max_revenue', table_name='fundings')
+    op.create_index('ix_fundings_active', 'fundings', ['id'], postgresql_where=sa.text('is_active'))
+    op.create_index('ix_fundings_sectors', 'fundings', ['sectors'], postgresql_using='gin', postgresql_where=sa.text('is_active'))
+    op.create_index('ix_fundings_max_employees', 'fundings', ['max_employees'], postgresql_where=sa.text('is_active'))
+    op.create_index('ix_fundings_max_revenue', 'fundings', ['max_revenue'], postgresql_where=sa.text('is_active'))
+    op.create_index(
+        'ix_funding_chunks_embedding_active', 'funding_chunks', ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_funding_chunks_embedding_active', table_name='funding_chunks')
+    op.drop_index('ix_fundings_max_revenue', table_name='fundings')
+    op.drop_index('ix_fundings_max_employees', table_name='fundings')
+    op.drop_index('ix_fundings_sectors', table_name='fundings')
+    op.drop_index('ix_fundings_active', table_name='fundings')
+    op.create_index('ix_fundings_sectors', 'fundings', ['sectors'], postgresql_using='gin')
+    op.create_index('ix_fundings_max_employees', 'fundings', ['max_employees'])
+    op.create_index('ix_fundings_max_revenue', 'fundings', ['max_revenue'])
+    op.drop_column('funding_chunks', 'is_active')
+    op.drop_column('fundings', 'is_active')
@@ -0,0 +1,26 @@
+"""chat history indexes for keyset pagination
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Newest-first range scans: latest session per user, message history per session
+    op.create_index('ix_chat_sessions_user_created', 'chat_sessions', ['userId', 'created_at', 'id'])
+    op.create_index('ix_chat_messages_session_created', 'chat_messages', ['session_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_session_created', table_name='chat_messages')
+    op.drop_index('ix_chat_sessions_user_created', table_name='chat_sessions')
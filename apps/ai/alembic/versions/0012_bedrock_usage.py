@@ -0,0 +1,45 @@
+"""bedrock usage accounting
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bedrock_usage',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('model_id', sa.String(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('session_id', sa.String(), nullable=True),
+        sa.Column('message_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bedrock_usage_created_model', 'bedrock_usage', ['created_at', 'model_id'])
+    op.add_column('chat_messages', sa.Column('input_tokens', sa.Integer(), nullable=True))
+    op.add_column('chat_messages', sa.Column('output_tokens', sa.Integer(), nullable=True))
+    op.add_column('chat_messages', sa.Column('latency_ms', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_messages', 'latency_ms')
+    op.drop_column('chat_messages', 'output_tokens')
+    op.drop_column('chat_messages', 'input_tokens')
+    op.drop_index('ix_bedrock_usage_created_model', table_name='bedrock_usage')
+    op.drop_table('bedrock_usage')
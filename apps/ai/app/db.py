@@ -3,6 +3,7 @@ from sqlalchemy.orm import sessionmaker, Session
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from .utils.metrics import instrument_engine
 
 # Load .env from the apps/ai directory (or parent dirs)
 env_path = Path(__file__).resolve().parents[1] / ".env"
@@ -20,6 +21,7 @@ if not DATABASE_URL:
     raise RuntimeError("Please add DATABASE_URL to your .env file for AWS Aurora connection")
 
 engine = create_engine(DATABASE_URL)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 metadata = MetaData(schema="public")
 
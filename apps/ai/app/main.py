@@ -1,8 +1,13 @@
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
-from .routers import chat, companies, funding, auth
+from .routers import chat, companies, funding, auth, usage
+from .utils.metrics import MetricsMiddleware, REGISTRY
+from .utils.tracing import TracingMiddleware
 
 app = FastAPI(title="MyFundFinder AI API", version="1.0.0")
 
@@ -15,15 +20,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-stage spans for every request, summarized in the Server-Timing header
+app.add_middleware(TracingMiddleware)
+# Latency histograms and SQL counts per route (plus EMF records in Lambda)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(companies.router)
 app.include_router(funding.router)
+app.include_router(usage.router)
 
 @app.get("/health")
 def health():
     return {"status": "ok", "service": "MyFundFinder AI API"}
 
+# Prometheus scrape endpoint for private deployments. Off in Lambda, where the API is
+# public and EMF records carry the metrics; METRICS_ENDPOINT=true|false overrides
+if os.getenv("METRICS_ENDPOINT", "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true").lower() == "true":
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Lambda handler for AWS deployment
 handler = Mangum(app)
\ No newline at end of file
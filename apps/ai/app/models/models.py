@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Boolean, ARRAY
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Float, Boolean, ARRAY, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY as PgArray
 from pgvector.sqlalchemy import Vector
 from .base import Base
 
@@ -22,7 +22,7 @@ class User(Base):
 class Company(Base):
     __tablename__ = "companies"
     
-    id = Column(String, primary_key=True)
+    id = Column(Integer, primary_key=True)  # Autoincrement, owned by the web app's Prisma schema
     company_name = Column(String, nullable=False)
     company_id = Column(String, unique=True)
     sector = Column(String)
@@ -38,7 +38,7 @@ class UserCompany(Base):
     __tablename__ = "user_companies"
     
     user_id = Column(String, ForeignKey("users.id"), primary_key=True)
-    company_id = Column(String, ForeignKey("companies.id"), primary_key=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
     role = Column(String)
     
     user = relationship("User", back_populates="companies")
@@ -46,6 +46,7 @@ class UserCompany(Base):
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (Index("ix_chat_sessions_user_created", "userId", "created_at", "id"),)
     
     id = Column(String, primary_key=True)
     userId = Column(String, nullable=False)  # Use the actual DB column name
@@ -57,18 +58,26 @@ class ChatSession(Base):
     user_id = Column(String, ForeignKey("users.id"))
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime, nullable=False)
+    # Rolling summary of every message up to summary_message_id, maintained after each turn
+    summary = Column(Text)
+    summary_message_id = Column(Integer)
     
     user = relationship("User", back_populates="chat_sessions", foreign_keys=[user_id])
     chat_messages = relationship("ChatMessage", back_populates="session")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (Index("ix_chat_messages_session_created", "session_id", "created_at", "id"),)
     
     id = Column(Integer, primary_key=True)
     session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
     role = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     tokens = Column(Integer)
+    # Bedrock-reported usage of the call that produced an assistant message
+    input_tokens = Column(Integer)
+    output_tokens = Column(Integer)
+    latency_ms = Column(Float)
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime, nullable=False)
     
@@ -88,6 +97,13 @@ class Agency(Base):
 
 class Funding(Base):
     __tablename__ = "fundings"
+    # Partial indexes: queries filter on is_active, so expired grants are never read
+    __table_args__ = (
+        Index("ix_fundings_active", "id", postgresql_where=text("is_active")),
+        Index("ix_fundings_sectors", "sectors", postgresql_using="gin", postgresql_where=text("is_active")),
+        Index("ix_fundings_max_employees", "max_employees", postgresql_where=text("is_active")),
+        Index("ix_fundings_max_revenue", "max_revenue", postgresql_where=text("is_active")),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
@@ -99,21 +115,158 @@ class Funding(Base):
     required_docs = Column(Text)
     agency_id = Column(Integer, ForeignKey("agencies.id"))
     s3_keys = Column(ARRAY(String))  # Changed to array for multiple files
+    # Structured eligibility, extracted from sector/eligibility text; NULL means unrestricted
+    sectors = Column(PgArray(String))  # && (overlap) needs the PostgreSQL ARRAY type
+    max_employees = Column(Integer)
+    max_revenue = Column(Float)
+    min_amount = Column(Float)
+    malaysian_owned = Column(Boolean, nullable=False, default=False)
+    is_active = Column(Boolean, nullable=False, default=True)  # Deadline unset or ahead; kept by ActiveGrantService
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime, nullable=False)
     
     agency = relationship("Agency", back_populates="fundings")
-    chunks = relationship("FundingChunk", back_populates="funding")
+    chunk_links = relationship("FundingChunkLink", back_populates="funding")
+    chunks = relationship("FundingChunk", secondary="funding_chunk_links", viewonly=True)
+    documents = relationship("IngestionManifest", back_populates="funding")
+
+class IngestionManifest(Base):
+    """One row per ingested source document; committed together with its chunks"""
+    __tablename__ = "ingestion_manifest"
+    __table_args__ = (UniqueConstraint("funding_id", "source_path"),)
+    
+    id = Column(Integer, primary_key=True)
+    funding_id = Column(Integer, ForeignKey("fundings.id", ondelete="CASCADE"), nullable=False)
+    source_path = Column(String, nullable=False)  # Relative to the data/ catalog root
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the document bytes
+    chunk_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    
+    funding = relationship("Funding", back_populates="documents")
+    chunk_links = relationship("FundingChunkLink", back_populates="document")
+
+class IngestionJob(Base):
+    """
+    A document waiting to be (or being) ingested off the request path. Workers claim
+    rows with FOR UPDATE SKIP LOCKED and hold them until locked_until; an expired lease
+    makes the job claimable again.
+    """
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (Index("ix_ingestion_jobs_status_run_after", "status", "run_after"),)
+    
+    id = Column(Integer, primary_key=True)
+    funding_id = Column(Integer, ForeignKey("fundings.id", ondelete="CASCADE"), nullable=False, index=True)
+    s3_key = Column(String)  # Uploaded documents
+    source_path = Column(String)  # Catalog documents, relative to the data directory
+    filename = Column(String)
+    content_hash = Column(String(64))  # SHA-256 of the document
+    size_bytes = Column(BigInteger)
+    status = Column(String(20), nullable=False, default="queued")  # (uploading →) queued → running → succeeded | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False)  # Not claimable before this (retry backoff)
+    locked_by = Column(String)
+    locked_until = Column(DateTime)
+    chunks_created = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    
+    funding = relationship("Funding")
 
 class FundingChunk(Base):
+    """Content-addressed chunk: identical text is stored and embedded once"""
     __tablename__ = "funding_chunks"
+    __table_args__ = (
+        # Vector search only ever ranks chunks of active grants
+        Index(
+            "ix_funding_chunks_embedding_active", "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_where=text("is_active")
+        ),
+    )
     
     id = Column(Integer, primary_key=True)
-    funding_id = Column(Integer, ForeignKey("fundings.id"), nullable=False)
     chunk_text = Column(Text, nullable=False)
     embedding = Column(Vector(1024))  # Titan V2 embeddings are 1024 dimensions
-    page_no = Column(Integer)
+    content_hash = Column(String(64), unique=True, nullable=False)  # SHA-256 of chunk_text
+    is_active = Column(Boolean, nullable=False, server_default=text("true"))  # Linked to at least one active funding
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime, nullable=False)
     
-    funding = relationship("Funding", back_populates="chunks")
+    links = relationship("FundingChunkLink", back_populates="chunk")
+    fundings = relationship("Funding", secondary="funding_chunk_links", viewonly=True)
+
+class FundingChunkLink(Base):
+    """Where a chunk occurs: which funding, which source document, which page"""
+    __tablename__ = "funding_chunk_links"
+    __table_args__ = (UniqueConstraint("manifest_id", "chunk_id"),)
+    
+    id = Column(Integer, primary_key=True)
+    funding_id = Column(Integer, ForeignKey("fundings.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_id = Column(Integer, ForeignKey("funding_chunks.id", ondelete="CASCADE"), nullable=False, index=True)
+    manifest_id = Column(Integer, ForeignKey("ingestion_manifest.id", ondelete="CASCADE"))
+    page_no = Column(Integer)
+    
+    funding = relationship("Funding", back_populates="chunk_links")
+    chunk = relationship("FundingChunk", back_populates="links")
+    document = relationship("IngestionManifest", back_populates="chunk_links")
+
+class EmbeddingCacheEntry(Base):
+    """Embedding memo keyed by text hash and model, kept across reseeds"""
+    __tablename__ = "embedding_cache"
+    
+    text_hash = Column(String(64), primary_key=True)  # SHA-256 of the embedded text
+    model_id = Column(String, primary_key=True)
+    dims = Column(Integer, primary_key=True)
+    vector = Column(Vector(), nullable=False)  # Dimension varies with dims
+    created_at = Column(DateTime, nullable=False)
+
+class OcrPageCache(Base):
+    """OCR text per scanned page, keyed by the page's image content, kept across reseeds"""
+    __tablename__ = "ocr_page_cache"
+    
+    page_hash = Column(String(64), primary_key=True)  # SHA-256 of the page's image streams
+    engine = Column(String, primary_key=True)  # e.g. tesseract-eng
+    text = Column(Text, nullable=False)  # Empty when the scan holds no readable text
+    created_at = Column(DateTime, nullable=False)
+
+class CompanyGrantMatch(Base):
+    """Precomputed top-N grants per company, refreshed by match.py"""
+    __tablename__ = "company_grant_matches"
+    __table_args__ = (Index("ix_company_grant_matches_company_rank", "company_id", "rank"),)
+    
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    funding_id = Column(Integer, ForeignKey("fundings.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Float, nullable=False)  # Cosine similarity of company and grant profiles
+    rank = Column(Integer, nullable=False)  # 1 = best match
+    computed_at = Column(DateTime, nullable=False)
+    
+    funding = relationship("Funding")
+
+class MatchRefreshState(Base):
+    """updated_at watermarks of the last match refresh; rows changed since are rescored"""
+    __tablename__ = "match_refresh_state"
+    
+    name = Column(String, primary_key=True)
+    companies_watermark = Column(DateTime)
+    fundings_watermark = Column(DateTime)
+    refreshed_at = Column(DateTime, nullable=False)
+
+class BedrockUsage(Base):
+    """One row per Bedrock call: tokens as Bedrock reports them, and wall-clock latency"""
+    __tablename__ = "bedrock_usage"
+    __table_args__ = (Index("ix_bedrock_usage_created_model", "created_at", "model_id"),)
+    
+    id = Column(BigInteger, primary_key=True)
+    model_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False)  # chat, summary, embedding
+    input_tokens = Column(Integer)
+    output_tokens = Column(Integer)
+    latency_ms = Column(Float, nullable=False)
+    error = Column(Text)  # Set when the call failed
+    session_id = Column(String)  # Chat session the call served, if any
+    message_id = Column(Integer)  # Assistant message it produced, if any
+    created_at = Column(DateTime, nullable=False)
@@ -1,57 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from ..db import get_db
+from typing import List, Optional
+from ..db import get_db, SessionLocal
 from ..models.models import User, Company, ChatSession, ChatMessage, Funding, FundingChunk, UserCompany
 from ..schemas.schemas import ChatRequest, ChatResponse, ChatSession as ChatSessionSchema, ChatMessage as ChatMessageSchema
 from ..routers.auth import get_current_user, verify_company_access
+from ..services.bedrock_limiter import LimiterTimeout, bedrock_deadline, is_throttle
 from ..services.chat import ChatService
+from ..services.conversation import ConversationSummarizer
 from ..services.embeddings import EmbeddingService
 from ..services.grant_filter import GrantFilterService
+from ..utils.pagination import newest_first_before, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..utils.tracing import span
+import os
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Bedrock retries stop in time to answer before API Gateway's 29 s integration timeout
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "25"))
+CHAT_RETRY_AFTER_SECONDS = 5
+
+def update_session_summary(session_id: str):
+    """Background task: fold pending messages into the rolling summary after the reply is sent"""
+    db = SessionLocal()
+    try:
+        with span("summary"):
+            ConversationSummarizer(db).update(session_id)
+    finally:
+        db.close()
+
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Main chat endpoint for grant recommendations"""
-    # Get user's company from UserCompany relationship
-    user_company = db.query(UserCompany).filter(
-        UserCompany.user_id == current_user.id
-    ).first()
-    
-    if not user_company:
-        raise HTTPException(status_code=404, detail="No company associated with user")
-    
-    # Get company details
-    company = db.query(Company).filter(Company.id == user_company.company_id).first()
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    print(f"🏢 User {current_user.email} querying for company: {company.company_name} (Sector: {company.sector})")
-    
-    # Use tool-based chat service
-    from ..services.chat_tools import ToolBasedChatService
-    tool_chat_service = ToolBasedChatService(db)
-    
-    # Create or get chat session
-    session = tool_chat_service.get_or_create_session(current_user.id)
+    with span("context") as context_span:
+        # Get user's company from UserCompany relationship
+        user_company = db.query(UserCompany).filter(
+            UserCompany.user_id == current_user.id
+        ).first()
+        
+        if not user_company:
+            raise HTTPException(status_code=404, detail="No company associated with user")
+        
+        # Get company details
+        company = db.query(Company).filter(Company.id == user_company.company_id).first()
+        if not company:
+            raise HTTPException(status_code=404, detail="Company not found")
+        context_span.set("company_id", company.id)
+        
+        # Use tool-based chat service
+        from ..services.chat_tools import ToolBasedChatService
+        tool_chat_service = ToolBasedChatService(db)
+        
+        # Create or get chat session
+        session = tool_chat_service.get_or_create_session(current_user.id)
     
     # Save user message
-    tool_chat_service.save_message(session.id, "user", request.message)
+    with span("persist", role="user"):
+        user_message = tool_chat_service.save_message(session.id, "user", request.message)
     
-    # Generate response using tools and conversation context
-    response = await tool_chat_service.generate_response_with_tools(
-        request.message, 
-        company, 
-        session.id
-    )
+    # Generate response using tools and conversation context (spans per stage inside)
+    try:
+        with bedrock_deadline(CHAT_DEADLINE_SECONDS):
+            response = await tool_chat_service.generate_response_with_tools(
+                request.message, 
+                company, 
+                session.id,
+                current_message_id=user_message.id
+            )
+    except (LimiterTimeout, ClientError) as e:
+        if isinstance(e, ClientError) and not is_throttle(e):
+            raise
+        # Out of Bedrock capacity for now; the client retries instead of getting an error as the answer
+        raise HTTPException(
+            status_code=503,
+            detail="The assistant is busy right now. Please try again shortly.",
+            headers={"Retry-After": str(CHAT_RETRY_AFTER_SECONDS)}
+        )
     
     # Save assistant response
-    tool_chat_service.save_message(session.id, "assistant", response)
+    with span("persist", role="assistant"):
+        tool_chat_service.save_message(session.id, "assistant", response, usage=tool_chat_service.last_usage)
+    # Most turns fit the prompt without folding; under Mangum a background task delays the response
+    if tool_chat_service.summarizer.is_due(session):
+        background_tasks.add_task(update_session_summary, session.id)
     
     return ChatResponse(
         response=response,
@@ -61,34 +98,63 @@ async def chat(
 
 @router.get("/sessions", response_model=List[ChatSessionSchema])
 async def get_user_sessions(
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's chat sessions"""
-    sessions = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).order_by(ChatSession.created_at.desc()).limit(20).all()
+    """Get user's chat sessions, newest first; pass X-Next-Before back as ?before= for older ones"""
+    # userId is set on every session, including ones the web app creates
+    sessions = db.query(ChatSession).filter(ChatSession.userId == current_user.id)
+    
+    cursor = None
+    if before is not None:
+        cursor = sessions.filter(ChatSession.id == before).first()
+        if not cursor:
+            raise HTTPException(status_code=400, detail="Unknown session cursor")
     
-    return sessions
+    page = newest_first_before(sessions, ChatSession, cursor).limit(limit + 1).all()
+    if len(page) > limit:
+        page = page[:limit]
+        response.headers["X-Next-Before"] = page[-1].id
+    
+    return page
 
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageSchema])
 async def get_session_messages(
     session_id: str,
+    response: Response,
+    before: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get messages for a specific chat session"""
+    """
+    Latest `limit` messages of a session (before message `before`, if given), in
+    chronological order. X-Next-Before is set when older messages remain.
+    """
     # Verify session belongs to user
     session = db.query(ChatSession).filter(
         ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
+        ChatSession.userId == current_user.id
     ).first()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at.asc()).all()
+    messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id)
+    
+    cursor = None
+    if before is not None:
+        cursor = messages.filter(ChatMessage.id == before).first()
+        if not cursor:
+            raise HTTPException(status_code=400, detail="Unknown message cursor")
+    
+    page = newest_first_before(messages, ChatMessage, cursor).limit(limit + 1).all()
+    if len(page) > limit:
+        page = page[:limit]
+        response.headers["X-Next-Before"] = str(page[-1].id)
     
-    return messages
+    page.reverse()
+    return page
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from typing import List
 from ..db import get_db
-from ..models.models import User, Company, UserCompany
-from ..schemas.schemas import Company as CompanySchema
-from ..routers.auth import get_current_user
+from ..models.models import User, Company, UserCompany, Funding, CompanyGrantMatch
+from ..schemas.schemas import Company as CompanySchema, GrantMatch
+from ..routers.auth import get_current_user, verify_company_access
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
@@ -19,3 +19,31 @@ async def get_user_companies(
     ).all()
     
     return companies
+
+@router.get("/{company_id}/matches", response_model=List[GrantMatch])
+async def get_company_matches(
+    company_id: int,
+    limit: int = 20,
+    _: bool = Depends(verify_company_access),
+    db: Session = Depends(get_db)
+):
+    """Precomputed best-fit grants for a company, best first (refreshed by match.py)"""
+    matches = db.query(CompanyGrantMatch, Funding).join(
+        Funding, Funding.id == CompanyGrantMatch.funding_id
+    ).filter(
+        CompanyGrantMatch.company_id == company_id,
+        Funding.is_active
+    ).order_by(CompanyGrantMatch.rank).limit(limit).all()
+    
+    return [
+        GrantMatch(
+            funding_id=funding.id,
+            title=funding.title,
+            sector=funding.sector,
+            amount=funding.amount,
+            score=match.score,
+            rank=match.rank,
+            computed_at=match.computed_at
+        )
+        for match, funding in matches
+    ]
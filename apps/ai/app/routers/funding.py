@@ -1,18 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+import asyncio
+import os
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..db import get_db
-from ..models.models import User, Funding, FundingChunk
-from ..schemas.schemas import FundingUploadResponse
+from datetime import datetime
+from ..db import get_db, SessionLocal
+from ..models.models import User, Funding
+from ..schemas.schemas import (
+    FundingUploadRequest,
+    FundingUploadResponse,
+    FundingUploadUrlsRequest,
+    FundingUploadUrlsResponse,
+    IngestionJobStatus,
+    PresignedUpload,
+)
 from ..routers.auth import get_current_user
-from ..services.document_processor import DocumentProcessor
-from ..services.embeddings import EmbeddingService
+from ..services.active_grants import parse_deadline
+from ..services.eligibility import extract_criteria
+from ..services.ingestion import SUPPORTED_SUFFIXES
+from ..services.ingestion_jobs import IngestionJobService, spool_upload
 from ..services.s3_service import S3Service
 
 router = APIRouter(prefix="/admin/funding", tags=["funding"])
 
-@router.post("/upload", response_model=FundingUploadResponse)
+# Process uploads in this process after responding; off by default in Lambda, where
+# Mangum runs background tasks before returning and the scheduled worker (app.worker) drains the queue
+INLINE_INGESTION = os.getenv(
+    "INGESTION_INLINE", "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true"
+).lower() == "true"
+
+async def run_upload_job(job_id: int, spool_path: str, s3_key: str, content_type: Optional[str] = None):
+    """
+    Background task: put the spooled upload in S3, release the job to the queue, and
+    (inline) ingest it from the spool. The request's session is closed by the time this runs.
+    """
+    db = SessionLocal()
+    try:
+        job_service = IngestionJobService(db)
+        try:
+            await asyncio.to_thread(S3Service().upload_path, spool_path, s3_key, content_type)
+        except Exception as e:
+            job_service.fail_upload(job_id, str(e))
+            print(f"❌ Ingestion job {job_id}: S3 upload failed: {e}")
+            return
+        job_service.mark_uploaded(job_id)
+
+        if INLINE_INGESTION:
+            # Claimed through the queue like any worker, so a job is never run twice
+            job = job_service.claim(job_id)
+            if job is not None:
+                await job_service.run_job(job, local_path=spool_path)
+    finally:
+        db.close()
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+async def run_uploaded_job(job_id: int):
+    """Background task: ingest a job whose document the client put in S3 itself"""
+    db = SessionLocal()
+    try:
+        job_service = IngestionJobService(db)
+        job = job_service.claim(job_id)
+        if job is not None:
+            await job_service.run_job(job)
+    finally:
+        db.close()
+
+def check_supported(filenames: List[str]) -> None:
+    unsupported = [name for name in filenames if os.path.splitext(name or "")[1].lower() not in SUPPORTED_SUFFIXES]
+    if unsupported:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {', '.join(unsupported)} (supported: {', '.join(sorted(SUPPORTED_SUFFIXES))})"
+        )
+
+def create_funding(db: Session, metadata: FundingUploadRequest) -> Funding:
+    now = datetime.utcnow()
+    deadline = parse_deadline(metadata.deadline)
+    funding = Funding(
+        title=metadata.title,
+        description=metadata.description,
+        sector=metadata.sector,
+        deadline=deadline,
+        is_active=deadline is None or deadline > now,
+        amount=metadata.amount,
+        eligibility=metadata.eligibility,
+        required_docs=metadata.required_docs,
+        agency_id=metadata.agency_id,
+        created_at=now,
+        updated_at=now,
+        **extract_criteria(metadata.sector, metadata.eligibility)
+    )
+    db.add(funding)
+    db.commit()
+    db.refresh(funding)
+    return funding
+
+@router.post("/upload", response_model=FundingUploadResponse, status_code=202)
 async def upload_funding(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: Optional[str] = Form(None),
     sector: Optional[str] = Form(None),
@@ -25,63 +111,121 @@ async def upload_funding(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Upload funding documents and create embeddings"""
+    """
+    Queue funding documents for ingestion; returns job ids to poll. The S3 put runs
+    after the response. Under Lambda (Mangum finishes background tasks before it
+    returns) use /upload-urls instead, so the request never carries the files.
+    """
+    check_supported([file.filename for file in files])
     
-    # Create funding record
-    funding = Funding(
+    funding = create_funding(db, FundingUploadRequest(
         title=title,
         description=description,
         sector=sector,
+        deadline=parse_deadline(deadline),
         amount=amount,
         eligibility=eligibility,
         required_docs=required_docs,
         agency_id=agency_id
-    )
-    db.add(funding)
-    db.commit()
-    db.refresh(funding)
+    ))
     
-    # Initialize services
-    doc_processor = DocumentProcessor()
-    embedding_service = EmbeddingService()
-    s3_service = S3Service()
-    
-    chunks_created = 0
+    job_service = IngestionJobService(db)
+    s3_keys = []
+    job_ids = []
     
     for file in files:
-        # Upload to S3
+        # Spool to disk once (hashing as we go); the job multipart-uploads from the spool
+        spool = await spool_upload(file)
         s3_key = f"fundings/{funding.id}/{file.filename}"
-        await s3_service.upload_file(file, s3_key)
-        
-        # Update funding with S3 key (store first file's key)
-        if not funding.s3_key:
-            funding.s3_key = s3_key
-            db.commit()
-        
-        # Extract text from PDF
-        content = await file.read()
-        text = doc_processor.extract_text_from_pdf(content)
         
-        # Chunk text
-        chunks = doc_processor.chunk_text(text)
-        
-        # Generate embeddings and save chunks
-        for i, chunk_text in enumerate(chunks):
-            embedding = await embedding_service.generate_embedding(chunk_text)
-            
-            chunk = FundingChunk(
-                funding_id=funding.id,
-                chunk_text=chunk_text,
-                embedding=embedding,
-                page_no=i + 1
-            )
-            db.add(chunk)
-            chunks_created += 1
+        s3_keys.append(s3_key)
+        job = job_service.enqueue(
+            funding.id,
+            s3_key=s3_key,
+            filename=file.filename,
+            content_hash=spool["content_hash"],
+            size=spool["size"],
+            status="uploading"
+        )
+        job_ids.append(job.id)
+        background_tasks.add_task(run_upload_job, job.id, spool["path"], s3_key, file.content_type)
     
+    funding.s3_keys = s3_keys
+    funding.updated_at = datetime.utcnow()
     db.commit()
     
     return FundingUploadResponse(
         funding_id=funding.id,
-        status="success",
-        chunks_created=chunks_created
+        status="queued",
+        job_ids=job_ids
     )
+
+@router.post("/upload-urls", response_model=FundingUploadUrlsResponse, status_code=201)
+async def create_upload_urls(
+    request: FundingUploadUrlsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a funding and one presigned S3 PUT URL per document. After each PUT, call
+    /jobs/{job_id}/uploaded to queue the document for ingestion.
+    """
+    check_supported([file.filename for file in request.files])
+    
+    funding = create_funding(db, request)
+    s3_service = S3Service()
+    job_service = IngestionJobService(db)
+    uploads = []
+    
+    for file in request.files:
+        s3_key = f"fundings/{funding.id}/{os.path.basename(file.filename)}"
+        job = job_service.enqueue(funding.id, s3_key=s3_key, filename=file.filename, status="uploading")
+        uploads.append(PresignedUpload(
+            job_id=job.id,
+            filename=file.filename,
+            s3_key=s3_key,
+            upload_url=s3_service.get_upload_url(s3_key, file.content_type)
+        ))
+    
+    funding.s3_keys = [upload.s3_key for upload in uploads]
+    funding.updated_at = datetime.utcnow()
+    db.commit()
+    
+    return FundingUploadUrlsResponse(funding_id=funding.id, status="uploading", uploads=uploads)
+
+@router.post("/jobs/{job_id}/uploaded", response_model=IngestionJobStatus, status_code=202)
+async def confirm_upload(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a document the client has PUT to its presigned URL"""
+    job_service = IngestionJobService(db)
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    
+    if job.status == "uploading":
+        size = await asyncio.to_thread(S3Service().get_size, job.s3_key)
+        if size is None:
+            raise HTTPException(status_code=409, detail="Document not found in S3; PUT it to the upload URL first")
+        if job_service.mark_uploaded(job_id, size) and INLINE_INGESTION:
+            background_tasks.add_task(run_uploaded_job, job_id)
+        db.refresh(job)
+    
+    return job
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobStatus)
+async def get_ingestion_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Status of a queued document ingestion"""
+    job = IngestionJobService(db).get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    
+    return job
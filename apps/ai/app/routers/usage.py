@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import datetime, timedelta
+from ..db import get_db
+from ..models.models import User
+from ..schemas.schemas import BedrockUsageSummary
+from ..routers.auth import get_current_user
+from ..services.usage import usage_by_day
+
+router = APIRouter(prefix="/admin/usage", tags=["usage"])
+
+@router.get("/", response_model=List[BedrockUsageSummary])
+async def get_usage(
+    days: int = Query(7, ge=1, le=90),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bedrock tokens, calls and latency per day, model and operation"""
+    return usage_by_day(db, datetime.utcnow() - timedelta(days=days))
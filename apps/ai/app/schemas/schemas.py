@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 class UserBase(BaseModel):
     email: str
@@ -28,6 +28,15 @@ class Company(CompanyBase):
     class Config:
         from_attributes = True
 
+class GrantMatch(BaseModel):
+    funding_id: int
+    title: str
+    sector: Optional[str] = None
+    amount: Optional[float] = None
+    score: float
+    rank: int
+    computed_at: datetime
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -49,11 +58,48 @@ class FundingUploadRequest(BaseModel):
 class FundingUploadResponse(BaseModel):
     funding_id: int
     status: str
+    job_ids: List[int]
+
+class DocumentUpload(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+
+class FundingUploadUrlsRequest(FundingUploadRequest):
+    files: List[DocumentUpload]
+
+class PresignedUpload(BaseModel):
+    job_id: int
+    filename: str
+    s3_key: str
+    upload_url: str  # PUT the file here, with the same Content-Type
+
+class FundingUploadUrlsResponse(BaseModel):
+    funding_id: int
+    status: str
+    uploads: List[PresignedUpload]
+
+class IngestionJobStatus(BaseModel):
+    id: int
+    funding_id: int
+    s3_key: Optional[str] = None
+    source_path: Optional[str] = None
+    filename: Optional[str] = None
+    status: str
+    attempts: int
+    max_attempts: int
     chunks_created: int
+    error: Optional[str] = None
+    run_after: datetime
+    locked_until: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
 
 class ChatSession(BaseModel):
     id: str
-    user_id: str
+    user_id: Optional[str] = None  # Unset on sessions the web app creates (it writes userId)
     created_at: datetime
     
     class Config:
@@ -68,3 +114,14 @@ class ChatMessage(BaseModel):
     
     class Config:
         from_attributes = True
+
+class BedrockUsageSummary(BaseModel):
+    day: date
+    model_id: str
+    operation: str
+    calls: int
+    errors: int
+    input_tokens: int
+    output_tokens: int
+    avg_latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
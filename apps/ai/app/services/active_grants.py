@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+from sqlalchemy import DateTime, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+from ..models.models import Funding, FundingChunk, FundingChunkLink
+
+
+def _db_now():
+    """UTC from the database clock, the same clock the scheduled refresh compares against"""
+    return func.timezone('utc', func.now(), type_=DateTime)
+
+
+def parse_deadline(value) -> Optional[datetime]:
+    """Metadata deadlines arrive as ISO strings or datetimes; stored as naive UTC"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ActiveGrantService:
+    """
+    Maintains the is_active flags that hot queries filter on instead of comparing
+    deadlines row by row:
+      - fundings.is_active: the deadline is unset or still ahead
+      - funding_chunks.is_active: linked to at least one active funding
+    Both tables carry partial indexes WHERE is_active (including the HNSW index on
+    chunk embeddings), so expired grants and their chunks are never read.
+    Nothing here commits: changes join the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_fundings(self) -> List[int]:
+        """Flip fundings whose deadline state changed; returns their ids"""
+        is_open = or_(Funding.deadline.is_(None), Funding.deadline > _db_now())
+        return list(self.db.scalars(
+            update(Funding)
+            .where(Funding.is_active.is_distinct_from(is_open))
+            .values(is_active=is_open)
+            .returning(Funding.id)
+        ))
+
+    def sync_chunks(self, funding_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute chunk flags, for chunks linked to the given fundings or (None) all
+        of them. Only rows whose flag actually changes are written.
+        """
+        linked_to_active = exists().where(
+            FundingChunkLink.chunk_id == FundingChunk.id,
+            FundingChunkLink.funding_id == Funding.id,
+            Funding.is_active
+        )
+        statement = update(FundingChunk).where(
+            FundingChunk.is_active.is_distinct_from(linked_to_active)
+        ).values(is_active=linked_to_active)
+
+        if funding_ids is not None:
+            if not funding_ids:
+                return 0
+            statement = statement.where(FundingChunk.id.in_(
+                select(FundingChunkLink.chunk_id).where(FundingChunkLink.funding_id.in_(funding_ids))
+            ))
+
+        return self.db.execute(statement, execution_options={"synchronize_session": False}).rowcount
+
+    def next_boundary(self) -> Optional[datetime]:
+        """Earliest deadline still ahead: the next moment a refresh has work to do"""
+        return self.db.scalar(
+            select(func.min(Funding.deadline)).where(Funding.is_active, Funding.deadline.isnot(None))
+        )
+
+    def refresh(self) -> Dict[str, Any]:
+        """Expire grants whose deadline passed (or revive extended ones) and their chunks"""
+        flipped = self.refresh_fundings()
+        chunks = self.sync_chunks(flipped)
+        return {
+            "fundings_changed": len(flipped),
+            "chunks_changed": chunks,
+            "next_boundary": self.next_boundary()
+        }
@@ -0,0 +1,49 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+from .bedrock_limiter import BedrockLimiter, LimitedBedrock
+from .bedrock_local import LocalBedrock
+
+# aws: the real service (or a compatible endpoint at BEDROCK_ENDPOINT_URL); local: in-process stand-in
+BEDROCK_BACKEND = os.getenv("BEDROCK_BACKEND", "aws").lower()
+
+
+@lru_cache(maxsize=None)
+def _limiter() -> BedrockLimiter:
+    # Throttling is per account and model, so every client in the process shares one
+    return BedrockLimiter()
+
+
+@lru_cache(maxsize=None)
+def _local_backend() -> LocalBedrock:
+    # Shared, so latency sampling and throttling are one sequence across services
+    return LocalBedrock.from_env()
+
+
+def bedrock_client(max_pool_connections: Optional[int] = None) -> LimitedBedrock:
+    """
+    bedrock-runtime client for the configured backend, behind the shared limiter
+    (RPM/TPM buckets, adaptive concurrency, retries within the deadline)
+    """
+    if BEDROCK_BACKEND == "local":
+        return LimitedBedrock(_local_backend(), _limiter())
+    if BEDROCK_BACKEND != "aws":
+        raise ValueError(f"Unknown BEDROCK_BACKEND '{BEDROCK_BACKEND}' (expected aws or local)")
+
+    # The limiter retries throttles itself; botocore retrying underneath would multiply attempts
+    config = Config(retries={"mode": "standard", "total_max_attempts": 1})
+    if max_pool_connections:
+        config = config.merge(Config(max_pool_connections=max_pool_connections))
+    client = boto3.client(
+        'bedrock-runtime',
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        endpoint_url=os.getenv('BEDROCK_ENDPOINT_URL') or None,
+        config=config
+    )
+    return LimitedBedrock(client, _limiter())
@@ -0,0 +1,242 @@
+import io
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from ..utils.metrics import BEDROCK_CONCURRENCY, BEDROCK_LIMITER_WAIT, BEDROCK_RETRIES
+
+# Bedrock quotas are per account, region and model. These are conservative starting
+# points; set the account's values (Service Quotas console, divided by the number of
+# API processes) as JSON in BEDROCK_QUOTAS, e.g. {"amazon.nova-pro-v1:0": {"rpm": 100, "tpm": 200000}}.
+# Setting BEDROCK_QUOTAS replaces these; models without an entry get no rate limit.
+DEFAULT_QUOTAS = {
+    "amazon.nova-pro-v1:0": {"rpm": 100, "tpm": 200_000},
+    "amazon.titan-embed-text-v2:0": {"rpm": 2_000, "tpm": 300_000},
+}
+BURST_SECONDS = float(os.getenv("BEDROCK_BURST_SECONDS", "10"))  # Bucket capacity, in seconds of quota
+INITIAL_CONCURRENCY = int(os.getenv("BEDROCK_INITIAL_CONCURRENCY", "8"))
+MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "64"))
+DEADLINE_SECONDS = float(os.getenv("BEDROCK_DEADLINE_SECONDS", "25"))  # Per call, unless the request set a tighter one
+RETRY_BASE_SECONDS = 0.25
+RETRY_MAX_SECONDS = 8.0
+DECREASE_COOLDOWN_SECONDS = 1.0  # Throttles from one burst halve the limit once, not once each
+
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException", "ModelNotReadyException"}
+
+_deadline: ContextVar[Optional[float]] = ContextVar("bedrock_deadline", default=None)
+
+
+class LimiterTimeout(Exception):
+    """No capacity for a Bedrock call before its deadline"""
+
+
+@contextmanager
+def bedrock_deadline(seconds: float):
+    """Bedrock calls made in this scope (threads started from it included) finish or fail by then"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(min(deadline, current) if current is not None else deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def is_throttle(error: ClientError) -> bool:
+    return (
+        error.response.get("Error", {}).get("Code") in THROTTLE_CODES
+        or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") in (429, 503)
+    )
+
+
+def estimate_tokens(body) -> int:
+    """
+    Tokens to reserve before a call: the request at ~4 characters per token plus
+    the requested output ceiling. Bedrock itself reserves maxTokens against TPM.
+    """
+    text = body.decode("utf-8") if isinstance(body, bytes) else str(body)
+    try:
+        max_tokens = json.loads(text).get("inferenceConfig", {}).get("maxTokens", 0)
+    except (ValueError, AttributeError):
+        max_tokens = 0
+    return len(text) // 4 + max_tokens
+
+
+def used_tokens(payload: bytes, estimate: int) -> int:
+    """Tokens Bedrock reported for a response (Nova usage or Titan inputTextTokenCount)"""
+    try:
+        response = json.loads(payload)
+    except ValueError:
+        return estimate
+    usage = response.get("usage")
+    if usage:
+        return (usage.get("inputTokens") or 0) + (usage.get("outputTokens") or 0)
+    return response.get("inputTextTokenCount", estimate)
+
+
+class TokenBucket:
+    """Refills at a per-minute rate up to `burst_seconds` worth; a larger request may borrow (level goes negative)"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (capped at a full bucket, so big requests are not starved)"""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def settle(self, amount: float):
+        """Charge (or refund, if negative) the difference between used and reserved"""
+        self.level = min(self.capacity, self.level - amount)
+
+
+class ModelLimiter:
+    """
+    Admission control for one model: request and token buckets sized to its
+    RPM/TPM quotas, and a concurrency limit adjusted AIMD-style, +1/limit per
+    success and halved on a throttle. Callers are Bedrock worker threads.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        initial_concurrency: int = INITIAL_CONCURRENCY,
+        max_concurrency: int = MAX_CONCURRENCY
+    ):
+        self.model_id = model_id
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self._condition = threading.Condition()
+        BEDROCK_CONCURRENCY.set(self.limit, model=model_id)
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        return max(
+            self.requests.wait_time(1, now) if self.requests else 0.0,
+            self.tokens.wait_time(tokens, now) if self.tokens else 0.0
+        )
+
+    def acquire(self, tokens: int, deadline: float):
+        """Block until a slot and the quota allow one call of ~`tokens`, or raise LimiterTimeout"""
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(tokens, now) if self.in_flight < int(self.limit) else None
+                if wait == 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(tokens)
+                    self.in_flight += 1
+                    BEDROCK_LIMITER_WAIT.observe(now - started, model=self.model_id)
+                    return
+                # Fail fast when the quota cannot free up in time; a slot may, so wait for that
+                if now >= deadline or (wait is not None and now + wait > deadline):
+                    raise LimiterTimeout(f"No Bedrock capacity for {self.model_id} before the deadline")
+                self._condition.wait(timeout=min(wait if wait is not None else deadline - now, deadline - now))
+
+    def release(self, outcome: str, token_delta: int = 0):
+        """outcome is ok, throttled or error; token_delta is used minus reserved tokens"""
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if outcome == "throttled":
+                if now - self.last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.last_decrease = now
+            elif outcome == "ok":
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            if self.tokens and token_delta:
+                self.tokens.settle(token_delta)
+            BEDROCK_CONCURRENCY.set(round(self.limit, 2), model=self.model_id)
+            self._condition.notify_all()
+
+
+class BedrockLimiter:
+    """Process-wide: one ModelLimiter per model id, shared by every client"""
+
+    def __init__(self, quotas: Optional[Dict[str, Dict[str, float]]] = None):
+        if quotas is None:
+            configured = os.getenv("BEDROCK_QUOTAS")
+            quotas = json.loads(configured) if configured else DEFAULT_QUOTAS
+        self.quotas = quotas
+        self.models: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def model(self, model_id: str) -> ModelLimiter:
+        with self._lock:
+            if model_id not in self.models:
+                quota = self.quotas.get(model_id, {})
+                self.models[model_id] = ModelLimiter(model_id, quota.get("rpm", 0), quota.get("tpm", 0))
+            return self.models[model_id]
+
+
+class LimitedBedrock:
+    """
+    bedrock-runtime client whose invoke_model goes through the limiter and retries
+    throttles with full-jitter exponential backoff, as long as the call's deadline
+    allows. Anything else is passed through to the wrapped client.
+    """
+
+    def __init__(self, client, limiter: BedrockLimiter):
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def invoke_model(self, modelId: str, body, **kwargs) -> Dict[str, Any]:
+        model = self.limiter.model(modelId)
+        reserved = estimate_tokens(body)
+        call_deadline = time.monotonic() + DEADLINE_SECONDS
+        request_deadline = _deadline.get()
+        deadline = min(call_deadline, request_deadline) if request_deadline is not None else call_deadline
+
+        attempt = 0
+        while True:
+            model.acquire(reserved, deadline)
+            outcome, used = "error", reserved
+            try:
+                response = self.client.invoke_model(modelId=modelId, body=body, **kwargs)
+                # Read here to settle the token bucket with the reported usage; callers still get a readable body
+                payload = response["body"].read()
+                response["body"] = io.BytesIO(payload)
+                used = used_tokens(payload, reserved)
+                outcome = "ok"
+                return response
+            except ClientError as e:
+                if not is_throttle(e):
+                    raise
+                outcome = "throttled"
+                attempt += 1
+                delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                BEDROCK_RETRIES.inc(model=modelId)
+            finally:
+                model.release(outcome, used - reserved)
+            time.sleep(delay)
@@ -0,0 +1,164 @@
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+_TITLE_PATTERN = re.compile(r'"title":\s*"([^"]+)"')
+
+
+class Latency:
+    """Log-normal delay around a median; sigma 0 gives a constant delay"""
+
+    def __init__(self, median_ms: float, sigma: float = 0.3, seed: int = 0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        if not self.sigma:
+            return self.median_ms
+        with self._lock:
+            return self.median_ms * math.exp(self._random.gauss(0, self.sigma))
+
+    def wait(self):
+        time.sleep(self.sample_ms() / 1000)
+
+
+def local_embedding(text: str, dimensions: int) -> List[float]:
+    """Unit vector seeded by the text's hash: same text, same vector, on every run and machine"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def local_reply(prompt: str) -> str:
+    """Templated answer naming the grants found in the prompt's tool results"""
+    if "running summary" in prompt:
+        return "The user runs a Malaysian SME and is comparing grants; no decision has been made yet."
+
+    titles = list(dict.fromkeys(_TITLE_PATTERN.findall(prompt)))[:3]
+    if not titles:
+        return (
+            "I can help you find Malaysian SME funding. Tell me about your sector, company size "
+            "and what the funding is for, and I will suggest suitable grants."
+        )
+
+    listed = "\n".join(f"{i}. **{title}** - matches your sector and company size." for i, title in enumerate(titles, 1))
+    return f"Here are grants that fit your company:\n\n{listed}\n\nWould you like more details about any specific grant?"
+
+
+class LocalBedrock:
+    """
+    Offline stand-in for a bedrock-runtime client (invoke_model and
+    invoke_model_with_response_stream). Titan embedding requests get hash-seeded
+    vectors of the requested dimensions; Nova message requests get templated
+    replies. Calls sleep for a sampled first-token latency plus output tokens at
+    `tokens_per_second`, and fail with ThrottlingException at `throttle_rate`.
+    """
+
+    def __init__(
+        self,
+        embed_latency: Latency,
+        chat_latency: Latency,
+        tokens_per_second: float = 0,
+        throttle_rate: float = 0,
+        seed: int = 0
+    ):
+        self.embed_latency = embed_latency
+        self.chat_latency = chat_latency
+        self.tokens_per_second = tokens_per_second
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LocalBedrock":
+        sigma = float(os.getenv("LOCAL_BEDROCK_LATENCY_SIGMA", "0.3"))
+        return cls(
+            embed_latency=Latency(float(os.getenv("LOCAL_BEDROCK_EMBED_LATENCY_MS", "40")), sigma, seed=1),
+            chat_latency=Latency(float(os.getenv("LOCAL_BEDROCK_CHAT_LATENCY_MS", "500")), sigma, seed=2),
+            tokens_per_second=float(os.getenv("LOCAL_BEDROCK_TOKENS_PER_SECOND", "80")),
+            throttle_rate=float(os.getenv("LOCAL_BEDROCK_THROTTLE_RATE", "0"))
+        )
+
+    def _throttle(self, operation: str):
+        if not self.throttle_rate:
+            return
+        with self._lock:
+            throttled = self._random.random() < self.throttle_rate
+        if throttled:
+            raise ClientError(
+                {
+                    "Error": {"Code": "ThrottlingException", "Message": "Too many requests, please wait before trying again."},
+                    "ResponseMetadata": {"HTTPStatusCode": 429}
+                },
+                operation
+            )
+
+    def _stream_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _complete(self, request: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        prompt = "\n".join(
+            block.get("text", "")
+            for message in request.get("messages", [])
+            for block in message.get("content", [])
+        )
+        reply = local_reply(prompt)
+        max_tokens = request.get("inferenceConfig", {}).get("maxTokens")
+        words = reply.split(" ")
+        if max_tokens and len(words) > max_tokens:
+            reply = " ".join(words[:max_tokens])
+        return reply, {"inputTokens": max(1, len(prompt) // 4), "outputTokens": len(reply.split(" "))}
+
+    def invoke_model(self, modelId: str, body, **kwargs) -> Dict[str, Any]:
+        request = json.loads(body)
+        self._throttle("InvokeModel")
+
+        if "inputText" in request:
+            self.embed_latency.wait()
+            text = request["inputText"]
+            response = {
+                "embedding": local_embedding(text, request.get("dimensions", 1024)),
+                "inputTextTokenCount": max(1, len(text) // 4)
+            }
+        else:
+            reply, usage = self._complete(request)
+            self.chat_latency.wait()
+            time.sleep(self._stream_delay(usage["outputTokens"]))
+            response = {
+                "output": {"message": {"role": "assistant", "content": [{"text": reply}]}},
+                "stopReason": "end_turn",
+                "usage": {**usage, "totalTokens": usage["inputTokens"] + usage["outputTokens"]}
+            }
+
+        return {"body": io.BytesIO(json.dumps(response).encode("utf-8")), "contentType": "application/json"}
+
+    def invoke_model_with_response_stream(self, modelId: str, body, **kwargs) -> Dict[str, Any]:
+        request = json.loads(body)
+        self._throttle("InvokeModelWithResponseStream")
+        reply, usage = self._complete(request)
+
+        def events() -> Iterator[Dict[str, Any]]:
+            self.chat_latency.wait()
+            delay = self._stream_delay(1)
+            for i, word in enumerate(reply.split(" ")):
+                time.sleep(delay)
+                delta = {"contentBlockDelta": {"delta": {"text": word if i == 0 else f" {word}"}, "contentBlockIndex": 0}}
+                yield {"chunk": {"bytes": json.dumps(delta).encode("utf-8")}}
+            yield {"chunk": {"bytes": json.dumps({"messageStop": {"stopReason": "end_turn"}}).encode("utf-8")}}
+            yield {"chunk": {"bytes": json.dumps({"metadata": {"usage": usage}}).encode("utf-8")}}
+
+        return {"body": events(), "contentType": "application/json"}
@@ -1,31 +1,25 @@
-import boto3
 import json
 import uuid
 from typing import List
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
-from ..models.models import ChatSession, ChatMessage, FundingChunk, Company, Funding
+from ..models.models import ChatSession, ChatMessage, FundingChunk, FundingChunkLink, Company, Funding
+from .bedrock import bedrock_client
 from .embeddings import EmbeddingService
-import os
 
 class ChatService:
     def __init__(self, db: Session):
         self.db = db
-        self.bedrock = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
-        self.embedding_service = EmbeddingService()
+        self.bedrock = bedrock_client()
+        self.embedding_service = EmbeddingService(db)
         self.model_id = "amazon.nova-pro-v1:0"
     
     def get_or_create_session(self, user_id: str) -> ChatSession:
         """Get or create chat session for user"""
         session = self.db.query(ChatSession).filter(
             ChatSession.userId == user_id
-        ).order_by(ChatSession.created_at.desc()).first()
+        ).order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).first()
         
         if not session:
             now = datetime.utcnow()
@@ -63,7 +57,7 @@ class ChatService:
         # Get last 10 messages from this session
         recent_messages = self.db.query(ChatMessage).filter(
             ChatMessage.session_id == session_id
-        ).order_by(ChatMessage.created_at.desc()).limit(10).all()
+        ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(10).all()
         
         context = {
             "shown_grants": [],
@@ -196,7 +190,7 @@ class ChatService:
             
             if grant:
                 chunks = self.db.query(FundingChunk).filter(
-                    FundingChunk.funding_id == grant.id
+                    FundingChunk.links.any(FundingChunkLink.funding_id == grant.id)
                 ).all()
                 
                 print(f"📚 Retrieved {len(chunks)} detailed chunks for {grant.title}")
@@ -216,13 +210,18 @@ class ChatService:
         seen_grants = set()
         
         for grant_id in eligible_funding_ids:
+            if grant_id in seen_grants:
+                continue
+            
             chunk = self.db.query(FundingChunk).filter(
-                FundingChunk.funding_id == grant_id
+                FundingChunk.links.any(FundingChunkLink.funding_id == grant_id)
             ).first()
             
-            if chunk and chunk.funding_id not in seen_grants:
-                selected_chunks.append(chunk)
-                seen_grants.add(chunk.funding_id)
+            if chunk:
+                # A shared chunk already covers every grant it is linked to
+                if chunk not in selected_chunks:
+                    selected_chunks.append(chunk)
+                seen_grants.update(funding.id for funding in chunk.fundings)
                 
                 if len(selected_chunks) >= 5:
                     break
@@ -276,15 +275,16 @@ class ChatService:
             seen_grants = set()
             
             for chunk in chunks:
-                grant_id = chunk.funding.id
-                if grant_id not in seen_grants:
-                    seen_grants.add(grant_id)
+                for funding in chunk.fundings:
+                    if funding.id in seen_grants:
+                        continue
+                    seen_grants.add(funding.id)
                     grant_info = f"""
-Grant: {chunk.funding.title}
-Sector: {chunk.funding.sector or 'General'}
-Amount: RM{chunk.funding.amount:,.0f} (max)
-Eligibility: {chunk.funding.eligibility or 'See requirements'}
-Description: {chunk.funding.description or 'No description available'}
+Grant: {funding.title}
+Sector: {funding.sector or 'General'}
+Amount: RM{funding.amount:,.0f} (max)
+Eligibility: {funding.eligibility or 'See requirements'}
+Description: {funding.description or 'No description available'}
 Content: {chunk.chunk_text[:500]}...
 """
                     context_parts.append(grant_info)
@@ -1,30 +1,50 @@
-import boto3
+import asyncio
 import json
+import time
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from botocore.exceptions import BotoCoreError, ClientError
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..models.models import ChatSession, ChatMessage, Company
+from .bedrock import bedrock_client
+from .bedrock_limiter import LimiterTimeout, is_throttle
+from .conversation import ConversationSummarizer
+from .grant_filter import GrantFilterService
 from .grant_tools import GrantTools
+from .embeddings import EmbeddingService
+from .tokenizer import get_tokenizer
+from .usage import UsageLog
+from ..utils.metrics import record_cache
+from ..utils.singleflight import SingleFlight, flight_key
+from ..utils.tracing import Span, span
 import os
 
+# Tool output (grant metadata, RAG passages) is capped so the prompt has a hard ceiling
+TOOL_RESULT_TOKENS = int(os.getenv("CHAT_TOOL_RESULT_TOKENS", "3000"))
+
+# Requests whose prompts are byte-identical (same company, conversation context and question) share one
+# Nova Pro call, whichever session they come from; any difference in the prompt means a separate call
+CHAT_FLIGHT = SingleFlight("chat")
+
 class ToolBasedChatService:
     def __init__(self, db: Session):
         self.db = db
-        self.bedrock = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
+        self.bedrock = bedrock_client()
         self.grant_tools = GrantTools(db)
+        self.grant_filter = GrantFilterService(db)
+        self.embedding_service = EmbeddingService(db)
+        self.summarizer = ConversationSummarizer(db)
+        self.tokenizer = get_tokenizer()
         self.model_id = "amazon.nova-pro-v1:0"
+        self.usage = UsageLog()
+        self.last_usage = None  # Usage of the latest LLM call, stored on the assistant message
     
     def get_or_create_session(self, user_id: str) -> ChatSession:
         """Get or create chat session for user"""
         session = self.db.query(ChatSession).filter(
             ChatSession.userId == user_id
-        ).order_by(ChatSession.created_at.desc()).first()
+        ).order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).first()
         
         if not session:
             now = datetime.utcnow()
@@ -43,70 +63,70 @@ class ToolBasedChatService:
         
         return session
     
-    def save_message(self, session_id: str, role: str, content: str):
-        """Save chat message to database"""
+    def save_message(self, session_id: str, role: str, content: str, usage: Optional[Dict[str, Any]] = None) -> ChatMessage:
+        """
+        Save chat message to database. With `usage` (an assistant reply), the Bedrock
+        token counts and latency are stored on it, and every Bedrock call made for
+        this turn is written to bedrock_usage in the same transaction.
+        """
         now = datetime.utcnow()
         message = ChatMessage(
             session_id=session_id,
             role=role,
             content=content,
-            tokens=len(content.split()),
+            tokens=self.tokenizer.count(content),
             created_at=now,
             updated_at=now
         )
+        if usage:
+            message.input_tokens = usage["input_tokens"]
+            message.output_tokens = usage["output_tokens"]
+            message.latency_ms = usage["latency_ms"]
+            if usage["output_tokens"] is not None:
+                message.tokens = usage["output_tokens"]
         self.db.add(message)
+        
+        if role == "assistant":
+            self.db.flush()
+            self.usage.flush(self.db, session_id=session_id, message_id=message.id)
+            self.embedding_service.usage.flush(self.db, session_id=session_id)
         self.db.commit()
+        return message
     
-    def get_conversation_history(self, session_id: str, limit: int = 10) -> List[Dict[str, str]]:
-        """Get recent conversation history for context"""
-        messages = self.db.query(ChatMessage).filter(
-            ChatMessage.session_id == session_id
-        ).order_by(ChatMessage.created_at.desc()).limit(limit).all()
-        
-        # Reverse to get chronological order
-        messages.reverse()
-        
-        return [
-            {
-                "role": msg.role,
-                "content": msg.content
-            }
-            for msg in messages
-        ]
+    def classify_intent(self, query: str) -> str:
+        """Which tool a query needs: grants, details, amount, conversational or search"""
+        query_lower = query.lower()
+        if any(phrase in query_lower for phrase in ['what grants', 'available grants', 'all grants', 'list grants', 'grants for']):
+            return "grants"
+        if any(phrase in query_lower for phrase in ['tell me more', 'more details', 'details about', 'more about', 'explain']):
+            return "details"
+        if any(word in query_lower for word in ['rm', 'ringgit', 'million', 'thousand']) or any(char.isdigit() for char in query):
+            return "amount"
+        if len(query.split()) <= 3 and any(word in query_lower for word in ['sure', 'yes', 'ok', 'okay', 'continue']):
+            return "conversational"
+        return "search"
     
-    async def generate_response_with_tools(self, query: str, company: Company, session_id: str) -> str:
-        """Generate response using tools and conversation context"""
-        
-        print(f"🤖 LLM Tool Calling Process Started")
-        print(f"📝 Query: '{query}'")
-        
-        # Get conversation history
-        conversation_history = self.get_conversation_history(session_id)
-        print(f"💬 Conversation History: {len(conversation_history)} messages")
-        
-        # Build conversation context for LLM
-        conversation_context = ""
-        if conversation_history:
-            conversation_context = "\n".join([
-                f"{msg['role'].title()}: {msg['content']}"
-                for msg in conversation_history[-6:]  # Last 6 messages
-            ])
-            print(f"📋 Context: {conversation_context[:200]}...")
-        
-        # Simple tool usage detection and execution
+    async def run_tools(self, intent: str, query: str, company: Company, conversation_history: List[Dict[str, str]], tool_span: Span) -> str:
+        """Execute the tools for an intent; returns the tool output for the prompt"""
         query_lower = query.lower()
-        print(f"🔍 Analyzing query for tool selection...")
         
         # Two-stage approach: Metadata first, then detailed chunks
-        if any(phrase in query_lower for phrase in ['what grants', 'available grants', 'all grants', 'list grants', 'grants for']):
-            print(f"🛠️ Tool Selected: get_all_available_grants() [METADATA ONLY]")
-            grants = self.grant_tools.get_all_available_grants()
-            tool_result = f"Available grants (metadata): {json.dumps(grants, indent=2)}"
-            print(f"📊 Tool Result: Found {len(grants)} grants (metadata only)")
+        if intent == "grants":
+            # Precomputed matches first: one indexed lookup, no filtering or scoring per turn
+            grants = self.grant_tools.get_matched_grants(company.id)
+            record_cache("grant_matches", int(bool(grants)), int(not grants))
+            if grants:
+                tool_span.set("tool", "get_matched_grants")
+                tool_result = f"Best-matching grants for this company (metadata): {json.dumps(grants, indent=2)}"
+            else:
+                tool_span.set("tool", "get_all_available_grants")
+                grants = self.grant_tools.get_all_available_grants(grant_ids=self.grant_filter.filter_grants(company))
+                tool_result = f"Available grants (metadata): {json.dumps(grants, indent=2)}"
+            tool_span.set("grants", len(grants))
             
-        elif any(phrase in query_lower for phrase in ['tell me more', 'more details', 'details about', 'more about', 'explain']):
+        elif intent == "details":
             # Stage 2: User wants detailed info - NOW use RAG chunks
-            print(f"🛠️ Tool Selected: get_grant_by_name() [WITH RAG CHUNKS - STAGE 2]")
+            tool_span.set("tool", "get_grant_by_name")
             
             # Extract grant name from query or conversation context
             grant_name = query_lower.replace('tell me more', '').replace('more details', '').replace('details about', '').replace('more about', '').replace('explain', '').strip()
@@ -114,7 +134,7 @@ class ToolBasedChatService:
             # If no specific grant mentioned, check conversation history for last mentioned grants
             if not grant_name or len(grant_name) < 3:
                 # Look for grants mentioned in recent conversation
-                for msg in reversed(conversation_history[-3:]):
+                for msg in reversed(conversation_history):
                     if msg["role"] == "assistant":
                         content = msg["content"].lower()
                         if "dcg" in content and "prime" in content:
@@ -129,28 +149,105 @@ class ToolBasedChatService:
             
             grant_details = self.grant_tools.get_grant_by_name(grant_name)
             tool_result = f"Detailed grant information with RAG content: {json.dumps(grant_details, indent=2)}"
-            print(f"📊 Tool Result: Retrieved '{grant_name}' with {grant_details.get('total_chunks', 0)} RAG chunks")
+            tool_span.set("grant_name", grant_name)
+            tool_span.set("chunks", grant_details.get('total_chunks', 0))
             
-        elif any(word in query_lower for word in ['rm', 'ringgit', 'million', 'thousand']) or any(char.isdigit() for char in query):
-            print(f"🛠️ Tool Selected: search_by_amount() [METADATA ONLY]")
-            grants = self.grant_tools.search_by_amount(min_amount=50000)
+        elif intent == "amount":
+            tool_span.set("tool", "search_by_amount")
+            grants = self.grant_tools.search_by_amount(min_amount=50000, grant_ids=self.grant_filter.filter_grants(company))
             tool_result = f"Grants by amount (metadata): {json.dumps(grants, indent=2)}"
-            print(f"📊 Tool Result: Found {len(grants)} grants by amount (metadata only)")
+            tool_span.set("grants", len(grants))
             
-        elif len(query.split()) <= 3 and any(word in query_lower for word in ['sure', 'yes', 'ok', 'okay', 'continue']):
-            print(f"🛠️ Tool Selected: None (conversational response)")
+        elif intent == "conversational":
+            # No tool needed: the conversation context carries the answer
             tool_result = "No tool needed - conversational response"
-            print(f"💭 Conversational Response: Using context only")
             
         else:
             # Stage 1: General search - METADATA ONLY for recommendations
-            print(f"🛠️ Tool Selected: search_grants() [METADATA ONLY - STAGE 1]")
-            grants = self.grant_tools.search_grants(query, limit=5)
+            tool_span.set("tool", "search_grants")
+            # Structured eligibility narrows the candidates once, before any vector or LLM work
+            eligible_ids = self.grant_filter.filter_grants(company)
+            grants = self.grant_tools.search_grants(query, limit=5, grant_ids=eligible_ids)
             tool_result = f"Grant recommendations (metadata): {json.dumps(grants, indent=2)}"
-            print(f"📊 Tool Result: Found {len(grants)} grant recommendations (metadata only)")
+            tool_span.set("grants", len(grants))
+            
+            # Top-k passages; a passage shared by several grants comes back once with all of them
+            try:
+                with span("embed"):
+                    query_embedding = await self.embedding_service.generate_embedding(query)
+                with span("search_chunks") as search_span:
+                    passages = self.grant_tools.search_chunks(query_embedding, limit=5, grant_ids=eligible_ids)
+                    search_span.set("passages", len(passages))
+                tool_result += f"\n\nRelevant document passages: {json.dumps(passages, indent=2)}"
+            except (ClientError, BotoCoreError, LimiterTimeout) as e:
+                # Bedrock is throttled or down: answer from metadata only
+                tool_span.set("semantic_search_error", e.__class__.__name__)
         
-        # Build prompt for LLM
-        prompt = f"""You are MyFundFinder, a Malaysian SME funding assistant with natural conversation abilities.
+        return tool_result
+    
+    def _invoke_llm(self, body: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """One blocking Nova Pro call; returns the response body and its usage row"""
+        started = time.perf_counter()
+        try:
+            response = self.bedrock.invoke_model(
+                modelId=self.model_id,
+                body=body,
+                contentType='application/json'
+            )
+            response_body = json.loads(response['body'].read())
+        except Exception as e:
+            self.usage.record(self.model_id, "chat", (time.perf_counter() - started) * 1000, error=str(e))
+            raise
+        
+        usage = response_body.get('usage', {})
+        return response_body, self.usage.record(
+            self.model_id,
+            "chat",
+            (time.perf_counter() - started) * 1000,
+            input_tokens=usage.get('inputTokens'),
+            output_tokens=usage.get('outputTokens')
+        )
+    
+    async def generate_response_with_tools(
+        self,
+        query: str,
+        company: Company,
+        session_id: str,
+        current_message_id: Optional[int] = None
+    ) -> str:
+        """Generate response using tools and conversation context"""
+        
+        # Rolling summary plus the messages since, each within a fixed token budget,
+        # so the prompt does not grow with the length of the conversation
+        with span("context") as context_span:
+            session = self.db.get(ChatSession, session_id)
+            context = self.summarizer.build_context(session, current_message_id)
+            conversation_history = context["exchange"]
+            context_span.set("summary", bool(context["summary"]))
+            context_span.set("messages", len(conversation_history))
+        
+        with span("intent") as intent_span:
+            intent = self.classify_intent(query)
+            intent_span.set("intent", intent)
+        
+        with span("tools", intent=intent) as tool_span:
+            tool_result = await self.run_tools(intent, query, company, conversation_history, tool_span)
+        
+        with span("prompt") as prompt_span:
+            # Build conversation context for LLM
+            conversation_context = ""
+            if context["summary"]:
+                conversation_context = f"Summary of earlier conversation: {context['summary']}\n"
+            if conversation_history:
+                conversation_context += "\n".join([
+                    f"{msg['role'].title()}: {msg['content']}"
+                    for msg in conversation_history
+                ])
+            
+            tool_result = self.tokenizer.truncate(tool_result, TOOL_RESULT_TOKENS)
+            
+            # Build prompt for LLM
+            prompt = f"""You are MyFundFinder, a Malaysian SME funding assistant with natural conversation abilities.
 
 Company: {company.company_name} ({company.sector} sector, {company.employees} employees)
 
@@ -177,9 +274,7 @@ RESPONSE STYLE:
 - Conversational: Continue naturally based on context
 
 Respond naturally and conversationally based on the query and conversation context."""
-
-        print(f"🎯 Sending to LLM...")
-        print(f"📤 Prompt length: {len(prompt)} characters")
+            prompt_span.set("characters", len(prompt))
 
         try:
             # Nova Pro uses messages format
@@ -202,22 +297,32 @@ Respond naturally and conversationally based on the query and conversation conte
                 }
             })
             
-            print(f"🚀 Invoking Nova Pro: {self.model_id}")
+            self.last_usage = None
+            with span("llm", model=self.model_id) as llm_span:
+                started = time.perf_counter()
+                (response_body, usage_row), shared = await CHAT_FLIGHT.do(
+                    flight_key(self.model_id, body),
+                    lambda: asyncio.to_thread(self._invoke_llm, body)
+                )
+                if shared:
+                    # Another request made the call (and logged its usage); this one only waited
+                    self.last_usage = {
+                        "input_tokens": None,
+                        "output_tokens": None,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+                    }
+                else:
+                    self.last_usage = usage_row
+                llm_span.set("coalesced", shared)
+                llm_span.set("input_tokens", usage_row["input_tokens"])
+                llm_span.set("output_tokens", usage_row["output_tokens"])
             
-            response = self.bedrock.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                contentType='application/json'
-            )
+            return response_body['output']['message']['content'][0]['text']
             
-            response_body = json.loads(response['body'].read())
-            llm_response = response_body['output']['message']['content'][0]['text']
-            
-            print(f"✅ Nova Pro Response received: {len(llm_response)} characters")
-            print(f"📝 Response preview: {llm_response[:200]}...")
-            
-            return llm_response
-            
-        except Exception as e:
-            print(f"❌ LLM Error: {str(e)}")
-            return f"I apologize, but I'm having trouble accessing the grant information right now. Please try again later. Error: {str(e)}"
+        except ClientError as e:
+            # Throttles go to the caller as "busy"; other errors are on the llm span and in bedrock_usage
+            if is_throttle(e):
+                raise
+            return "I apologize, but I'm having trouble accessing the grant information right now. Please try again later."
+        except BotoCoreError:
+            return "I apologize, but I'm having trouble accessing the grant information right now. Please try again later."
@@ -0,0 +1,88 @@
+import weakref
+from typing import Iterable, Dict, Any, List, Tuple
+import psycopg
+from pgvector.psycopg import register_vector
+from sqlalchemy.orm import Session
+
+STAGING_TABLE = "funding_chunks_staging"
+
+# Connections that already know the vector type's binary dumper
+_registered_connections = weakref.WeakSet()
+
+
+class BulkChunkWriter:
+    """
+    Writes funding chunks with COPY ... FROM STDIN (FORMAT BINARY) into a temp
+    staging table, then merges them into the content-addressed funding_chunks
+    table in one statement. It runs on the session's own connection, so rows
+    commit (or roll back) together with whatever else the session is doing.
+    """
+
+    COLUMNS = ("content_hash", "chunk_text", "embedding")
+    TYPES = ["varchar", "text", "vector"]
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _driver_connection(self) -> psycopg.Connection:
+        connection = self.db.connection().connection.driver_connection
+        if not isinstance(connection, psycopg.Connection):
+            raise RuntimeError("BulkChunkWriter needs the psycopg 3 driver (postgresql+psycopg:// DATABASE_URL)")
+
+        if connection not in _registered_connections:
+            register_vector(connection)
+            _registered_connections.add(connection)
+        return connection
+
+    def _create_staging_table(self, cursor: psycopg.Cursor):
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                content_hash varchar(64),
+                chunk_text text,
+                embedding vector(1024)
+            ) ON COMMIT DELETE ROWS
+        """)
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Stream rows into staging and merge; returns the number of chunks inserted"""
+        connection = self._driver_connection()
+
+        with connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+
+            with cursor.copy(f"COPY {STAGING_TABLE} ({', '.join(self.COLUMNS)}) FROM STDIN (FORMAT BINARY)") as copy:
+                copy.set_types(self.TYPES)
+                for row in rows:
+                    copy.write_row(tuple(row.get(column) for column in self.COLUMNS))
+
+            # Text already stored (by any funding) keeps its existing row and embedding
+            cursor.execute(f"""
+                INSERT INTO funding_chunks (content_hash, chunk_text, embedding, created_at, updated_at)
+                SELECT DISTINCT ON (s.content_hash) s.content_hash, s.chunk_text, s.embedding,
+                       now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+                FROM {STAGING_TABLE} s
+                ON CONFLICT (content_hash) DO NOTHING
+            """)
+            inserted = cursor.rowcount
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        return inserted
+
+    def link(self, funding_id: int, manifest_id: int, placements: List[Tuple[str, int]]) -> int:
+        """Attach stored chunks, given as (content_hash, page_no), to a funding document"""
+        if not placements:
+            return 0
+
+        connection = self._driver_connection()
+        hashes = [content_hash for content_hash, _ in placements]
+        pages = [page_no for _, page_no in placements]
+
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO funding_chunk_links (funding_id, chunk_id, manifest_id, page_no)
+                SELECT %s, c.id, %s, p.page_no
+                FROM unnest(%s::varchar[], %s::int[]) AS p(content_hash, page_no)
+                JOIN funding_chunks c ON c.content_hash = p.content_hash
+                ON CONFLICT (manifest_id, chunk_id) DO UPDATE SET page_no = EXCLUDED.page_no
+            """, (funding_id, manifest_id, hashes, pages))
+            return cursor.rowcount
@@ -0,0 +1,190 @@
+import json
+import os
+import time
+from typing import List, Dict, Optional
+from sqlalchemy.orm import Session
+from ..models.models import ChatSession, ChatMessage
+from .bedrock import bedrock_client
+from .tokenizer import get_tokenizer
+from .usage import UsageLog
+
+# Prompt budget for conversation context, in tokens; fixed however long the chat runs
+SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "400"))
+EXCHANGE_TOKENS = int(os.getenv("CHAT_EXCHANGE_TOKENS", "600"))  # Last user + assistant message
+# Unsummarized messages before the latest exchange are carried verbatim up to this
+# many tokens; crossing it triggers a summary update, so most turns make no summary call
+SUMMARY_TRIGGER_TOKENS = int(os.getenv("CHAT_SUMMARY_TRIGGER_TOKENS", "1200"))
+# Each message folded into the summary is capped too, so one update is bounded
+FOLD_MESSAGE_TOKENS = 800
+RECENT_MESSAGES = 12  # Read per prompt: the message being answered plus what may be carried
+
+
+class ConversationSummarizer:
+    """
+    Keeps a rolling summary on each ChatSession. Once the messages older than
+    the latest exchange that are not yet in the summary reach SUMMARY_TRIGGER_TOKENS,
+    they are folded in with one small LLM call. Prompts carry the summary, those
+    messages and the latest exchange, each truncated to a fixed token budget.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.tokenizer = get_tokenizer()
+        self.model_id = os.getenv("SUMMARY_MODEL_ID", "amazon.nova-lite-v1:0")
+        self._bedrock = None
+        self.usage = UsageLog()
+
+    @property
+    def bedrock(self):
+        # Only background updates call the model; building context never does
+        if self._bedrock is None:
+            self._bedrock = bedrock_client()
+        return self._bedrock
+
+    def latest_messages(self, session_id: str, limit: int) -> List[ChatMessage]:
+        """Newest `limit` messages in chronological order (one index range scan)"""
+        messages = self.db.query(ChatMessage).filter(
+            ChatMessage.session_id == session_id
+        ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit).all()
+        messages.reverse()
+        return messages
+
+    def build_context(self, session: ChatSession, current_message_id: Optional[int] = None) -> Dict[str, object]:
+        """
+        Summary and the messages since, excluding the message being answered.
+        Bounded by SUMMARY_TOKENS + SUMMARY_TRIGGER_TOKENS + EXCHANGE_TOKENS.
+        """
+        recent = [
+            message for message in self.latest_messages(session.id, RECENT_MESSAGES)
+            if message.id != current_message_id
+        ]
+        if session.summary_message_id is not None:
+            recent = [message for message in recent if message.id > session.summary_message_id]
+        earlier, latest = recent[:-2], recent[-2:]
+
+        per_message = EXCHANGE_TOKENS // max(len(latest), 1)
+        exchange = [
+            {"role": message.role, "content": self.tokenizer.truncate(message.content, per_message)}
+            for message in latest
+        ]
+
+        # Not yet in the summary: newest first until the trigger budget is spent
+        budget = SUMMARY_TRIGGER_TOKENS
+        carried = []
+        for message in reversed(earlier):
+            if budget <= 0:
+                break
+            content = self.tokenizer.truncate(message.content, min(budget, FOLD_MESSAGE_TOKENS))
+            budget -= self.tokenizer.count(content)
+            carried.append({"role": message.role, "content": content})
+        carried.reverse()
+
+        return {
+            "summary": self.tokenizer.truncate(session.summary, SUMMARY_TOKENS) if session.summary else "",
+            "exchange": carried + exchange
+        }
+
+    def _unsummarized(self, session: ChatSession) -> List[ChatMessage]:
+        """Messages not yet in the summary, minus the latest exchange (which prompts carry verbatim)"""
+        latest = self.latest_messages(session.id, 2)
+        if not latest:
+            return []
+
+        query = self.db.query(ChatMessage).filter(
+            ChatMessage.session_id == session.id,
+            ChatMessage.id < latest[0].id
+        )
+        if session.summary_message_id is not None:
+            query = query.filter(ChatMessage.id > session.summary_message_id)
+        return query.order_by(ChatMessage.created_at, ChatMessage.id).all()
+
+    def is_due(self, session: ChatSession) -> bool:
+        """True once the unsummarized messages no longer fit the prompt's trigger budget"""
+        pending = self._unsummarized(session)
+        return sum(self.tokenizer.count(message.content) for message in pending) >= SUMMARY_TRIGGER_TOKENS
+
+    def _summarize(self, summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(
+            f"{message['role'].title()}: {self.tokenizer.truncate(message['content'], FOLD_MESSAGE_TOKENS)}"
+            for message in messages
+        )
+        prompt = f"""Update the running summary of a conversation between a Malaysian SME and a funding assistant.
+
+Current summary:
+{summary or "(none yet)"}
+
+New messages:
+{transcript}
+
+Write the updated summary in at most {SUMMARY_TOKENS * 3 // 4} words. Keep the company's goals and constraints, grants already discussed (by name) and what the user decided or still wants to know. Drop pleasantries. Reply with the summary only."""
+
+        body = json.dumps({
+            "messages": [{"role": "user", "content": [{"text": prompt}]}],
+            "inferenceConfig": {
+                "maxTokens": SUMMARY_TOKENS,
+                "temperature": 0.2
+            }
+        })
+        started = time.perf_counter()
+        try:
+            response = self.bedrock.invoke_model(modelId=self.model_id, body=body, contentType='application/json')
+            response_body = json.loads(response['body'].read())
+        except Exception as e:
+            self.usage.record(self.model_id, "summary", (time.perf_counter() - started) * 1000, error=str(e))
+            raise
+
+        usage = response_body.get('usage', {})
+        self.usage.record(
+            self.model_id,
+            "summary",
+            (time.perf_counter() - started) * 1000,
+            input_tokens=usage.get('inputTokens'),
+            output_tokens=usage.get('outputTokens')
+        )
+        return response_body['output']['message']['content'][0]['text'].strip()
+
+    def update(self, session_id: str) -> bool:
+        """
+        Fold pending messages into the session summary. Returns False when there is
+        nothing to fold or a concurrent update folded them first.
+        """
+        session = self.db.get(ChatSession, session_id)
+        if session is None:
+            self.db.rollback()
+            return False
+
+        pending = self._unsummarized(session)
+        if not pending:
+            self.db.rollback()
+            return False
+
+        summary = session.summary
+        folded_through = session.summary_message_id
+        messages = [{"role": message.role, "content": message.content} for message in pending]
+        last_id = pending[-1].id
+        # No transaction, row lock or connection is held across the LLM call
+        self.db.rollback()
+
+        try:
+            summary = self._summarize(summary, messages)
+        except Exception as e:
+            # The messages stay pending and are folded in after a later turn
+            self.usage.flush(self.db, session_id=session_id)
+            self.db.commit()
+            print(f"⚠️ Conversation summary update failed: {e}")
+            return False
+
+        # Written only if no other update moved the summary meanwhile; the first one wins
+        updated = self.db.query(ChatSession).filter(
+            ChatSession.id == session_id,
+            ChatSession.summary_message_id.is_(None) if folded_through is None
+            else ChatSession.summary_message_id == folded_through
+        ).update({
+            ChatSession.summary: self.tokenizer.truncate(summary, SUMMARY_TOKENS),
+            ChatSession.summary_message_id: last_id
+        }, synchronize_session=False)
+        self.usage.flush(self.db, session_id=session_id)
+        self.db.commit()
+        if updated:
+            print(f"🧾 Session {session_id}: folded {len(messages)} messages into the summary")
+        return bool(updated)
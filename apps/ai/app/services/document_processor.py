@@ -1,44 +1,194 @@
 import PyPDF2
-from typing import List
+from PyPDF2.generic import IndirectObject
+from collections import deque
+from typing import List, Dict, Iterator, Iterable, Optional, Tuple, Union, BinaryIO
 import io
+import mmap
+import os
+import re
+from .extractors import get_extractor
+from .ocr import is_scanned, page_content_hash
+from .tokenizer import get_tokenizer
+
+PdfSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+# Sentence ends and bullet markers both start a new unit
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[^a-z])|\s*[•▪●■]\s*")
+_NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[A-Z]\.|[IVX]+\.)\s+\S")
 
 class DocumentProcessor:
-    def __init__(self):
-        self.chunk_size = 500  # tokens per chunk
-    
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        """Extract text from PDF bytes"""
+    def __init__(self, max_tokens: int = 512, min_tokens: int = 128, overlap_tokens: int = 64):
+        # Titan v2 accepts 8k tokens, but retrieval precision peaks around 512
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.overlap_tokens = overlap_tokens
+        self.tokenizer = get_tokenizer()
+
+    def iter_pdf_pages(
+        self,
+        source: PdfSource,
+        ocr_texts: Optional[Dict[int, str]] = None,
+        scanned_pages: Optional[Dict[int, Optional[str]]] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_no, text) per page, 1-based. A path is memory-mapped rather
+        than read, and each page's decoded content stream is dropped from the
+        reader's cache once extracted, so memory stays flat with page count.
+
+        Pages without a text layer take their text from ocr_texts when given;
+        otherwise, if scanned_pages is a dict, it collects {page_no: page hash}
+        for them so the caller can OCR (or look up) just those pages.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from self._iter_pages(buffer, ocr_texts, scanned_pages)
+        elif isinstance(source, (bytes, bytearray)):
+            yield from self._iter_pages(io.BytesIO(source), ocr_texts, scanned_pages)
+        else:
+            yield from self._iter_pages(source, ocr_texts, scanned_pages)
+
+    def _iter_pages(self, stream, ocr_texts=None, scanned_pages=None) -> Iterator[Tuple[int, str]]:
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            pdf_reader = PyPDF2.PdfReader(stream)
+
+            for page_no, page in enumerate(pdf_reader.pages, start=1):
+                text = page.extract_text() or ""
+                if (ocr_texts or scanned_pages is not None) and is_scanned(page, text):
+                    if ocr_texts and page_no in ocr_texts:
+                        text = ocr_texts[page_no]
+                    elif scanned_pages is not None:
+                        scanned_pages[page_no] = page_content_hash(page)
+                self._evict_contents(pdf_reader, page)
+                yield page_no, text
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
-    
+
+    def _evict_contents(self, pdf_reader: PyPDF2.PdfReader, page):
+        """Forget a page's content streams; shared fonts/resources stay cached"""
+        contents = page.get("/Contents")
+        refs = contents if isinstance(contents, list) else [contents]
+        for ref in refs:
+            if isinstance(ref, IndirectObject):
+                pdf_reader.resolved_objects.pop((ref.generation, ref.idnum), None)
+
+    def iter_sections(
+        self,
+        path: Union[str, os.PathLike],
+        ocr_texts: Optional[Dict[int, str]] = None,
+        scanned_pages: Optional[Dict[int, Optional[str]]] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        (section_no, text) records for any supported file: pages for PDFs (with the
+        OCR hooks of iter_pdf_pages), heading-delimited sections for registered
+        extractors such as DOCX and HTML.
+        """
+        if str(path).lower().endswith(".pdf"):
+            yield from self.iter_pdf_pages(path, ocr_texts, scanned_pages)
+        else:
+            yield from get_extractor(path)(str(path))
+
+    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
+        """Extract text from PDF bytes"""
+        return "\n".join(text for _, text in self.iter_pdf_pages(pdf_content)).strip()
+
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        """
+        Chunk a page stream, yielding (page_no, chunk) where page_no is the page
+        the chunk starts on. Each sentence is tokenized once and the window keeps
+        a running token total, so cost is linear in the input. Chunks close at
+        max_tokens, or at a heading/page break once they reach min_tokens; only
+        size-forced splits carry overlap_tokens of trailing context forward.
+        """
+        window = deque()  # (page_no, text, tokens)
+        window_tokens = 0
+        new_units = 0
+
+        for page_no, text in pages:
+            page_start = True
+
+            for unit, tokens, is_heading in self._iter_units(text):
+                boundary = is_heading or page_start
+                page_start = False
+
+                # A new section never inherits overlap; a short chunk absorbs the heading instead
+                if boundary and (window_tokens >= self.min_tokens or not new_units):
+                    if new_units:
+                        yield window[0][0], " ".join(part for _, part, _ in window)
+                    window.clear()
+                    window_tokens = new_units = 0
+
+                if new_units and window_tokens + tokens > self.max_tokens:
+                    yield window[0][0], " ".join(part for _, part, _ in window)
+                    new_units = 0
+                    # Keep a tail of whole sentences as overlap for the next chunk
+                    while window and (window_tokens > self.overlap_tokens or window_tokens + tokens > self.max_tokens):
+                        window_tokens -= window.popleft()[2]
+
+                window.append((page_no, unit, tokens))
+                window_tokens += tokens
+                new_units += 1
+
+        if new_units:
+            yield window[0][0], " ".join(part for _, part, _ in window)
+
     def chunk_text(self, text: str) -> List[str]:
         """Split text into chunks for embedding"""
-        # Simple sentence-based chunking
-        sentences = text.split('. ')
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            # Rough token estimation (words * 1.3)
-            estimated_tokens = len((current_chunk + sentence).split()) * 1.3
-            
-            if estimated_tokens > self.chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
+        return [chunk for _, chunk in self.chunk_pages([(1, text)])]
+
+    def _iter_units(self, text: str) -> Iterator[Tuple[str, int, bool]]:
+        """Yield (text, tokens, is_heading) for each heading and sentence on a page"""
+        paragraph: List[str] = []
+
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                yield from self._iter_sentences(" ".join(paragraph))
+                paragraph = []
+            elif _is_heading(line):
+                yield from self._iter_sentences(" ".join(paragraph))
+                paragraph = []
+                yield line, self.tokenizer.count(line), True
             else:
-                current_chunk += sentence + ". "
-        
-        # Add the last chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
+                paragraph.append(line)
+
+        yield from self._iter_sentences(" ".join(paragraph))
+
+    def _iter_sentences(self, paragraph: str) -> Iterator[Tuple[str, int, bool]]:
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+
+            tokens = self.tokenizer.count(sentence)
+            if tokens <= self.max_tokens:
+                yield sentence, tokens, False
+            else:
+                yield from self._split_long(sentence)
+
+    def _split_long(self, sentence: str) -> Iterator[Tuple[str, int, bool]]:
+        """Break a run-on sentence (tables, lists without punctuation) at word boundaries"""
+        words: List[str] = []
+        total = 0
+        for word in sentence.split():
+            tokens = self.tokenizer.count(word) + 1
+            if words and total + tokens > self.max_tokens:
+                yield " ".join(words), total, False
+                words, total = [], 0
+            words.append(word)
+            total += tokens
+        if words:
+            yield " ".join(words), total, False
+
+
+def _is_heading(line: str) -> bool:
+    """Short unpunctuated lines that are numbered, ALL CAPS or Title Case"""
+    if len(line) > 80 or line[-1] in ".,;:!?":
+        return False
+    if _NUMBERED_HEADING.match(line):
+        return True
+    words = line.split()
+    if len(words) > 10:
+        return False
+    if line.isupper() and any(c.isalpha() for c in line):
+        return True
+    return all(word[0].isupper() or not word[0].isalpha() for word in words)
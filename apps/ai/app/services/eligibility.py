@@ -0,0 +1,95 @@
+import re
+from typing import List, Dict, Any, Optional
+
+# Industry sectors a grant can be restricted to, matched on word boundaries.
+# Funding purposes ("SME Financing", "Automation", "Digitalisation", "Low Carbon")
+# apply to companies in any sector, so they are deliberately not tags.
+SECTOR_TAGS = {
+    "technology": [r"technology", r"tech", r"ict", r"software", r"digital (economy|content)", r"it services", r"msc"],
+    "creative": [r"creative", r"digital content", r"animation", r"games?", r"film", r"media", r"digital comics?"],
+    "tourism": [r"tourism", r"hospitality", r"travel", r"hotels?"],
+    "manufacturing": [r"manufactur\w*", r"factory", r"industrial"],
+    "agriculture": [r"agricultur\w*", r"agro\w*", r"farming", r"plantation", r"fisher\w*"],
+    "services": [r"professional services", r"retail", r"trading", r"wholesale"],
+    "construction": [r"construction", r"property"],
+}
+
+_SECTOR_PATTERNS = {
+    tag: re.compile(r"\b(" + "|".join(patterns) + r")\b", re.IGNORECASE)
+    for tag, patterns in SECTOR_TAGS.items()
+}
+
+_ALL_SECTORS = re.compile(r"\b(all|any) (economic )?sectors\b", re.IGNORECASE)
+
+_UPPER_BOUND = r"(?:≤|<=|<|not exceeding|not more than|no more than|up to|below|under|less than|fewer than|maximum of|max\.?)"
+
+_MULTIPLIERS = {"k": 1e3, "m": 1e6, "mil": 1e6, "million": 1e6, "b": 1e9, "bil": 1e9, "billion": 1e9}
+
+_REVENUE_CAP = re.compile(
+    r"\b(?:revenue|turnover|sales)\b[^.;]{0,40}?" + _UPPER_BOUND + r"\s*RM\s*([\d.,]+)\s*(k|m|mil|million|b|bil|billion)?\b",
+    re.IGNORECASE
+)
+
+_EMPLOYEE_CAP = re.compile(
+    _UPPER_BOUND + r"\s*(\d[\d,]*)\s*(?:full[- ]time\s+)?(?:employees|workers|staff)\b"
+    r"|(\d[\d,]*)\s*(?:full[- ]time\s+)?(?:employees|workers|staff)\s*(?:or fewer|or less|and below)",
+    re.IGNORECASE
+)
+
+_MALAYSIAN_EQUITY = re.compile(
+    r"(?:≥|>=|at least|minimum of|min\.?)?\s*(\d{2,3})\s*%\s*(?:Malaysian|local|Bumiputera)\s*(?:equity|owned|ownership|shareholding)",
+    re.IGNORECASE
+)
+
+_MIN_AMOUNT = re.compile(
+    r"\b(?:minimum|min\.?)\s*(?:financing|grant|loan|funding|facility)\s*(?:amount|size)?\s*(?:of|is)?\s*RM\s*([\d.,]+)\s*(k|m|mil|million|b|bil|billion)?\b",
+    re.IGNORECASE
+)
+
+
+def _ringgit(number: str, unit: Optional[str]) -> float:
+    return float(number.replace(",", "").rstrip(".")) * _MULTIPLIERS.get((unit or "").lower(), 1)
+
+
+def sector_tags(text: Optional[str]) -> List[str]:
+    """Normalise a free-text sector description into SECTOR_TAGS keys"""
+    if not text:
+        return []
+    return sorted(tag for tag, pattern in _SECTOR_PATTERNS.items() if pattern.search(text))
+
+
+def extract_criteria(
+    sector: Optional[str],
+    eligibility: Optional[str],
+    min_amount: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Pull filterable constraints out of a grant's sector and eligibility text.
+    None means "no restriction found", so a grant is only ever excluded by
+    a constraint that is stated explicitly.
+    """
+    text = eligibility or ""
+
+    # "SMEs in all sectors" overrides whatever the sector field lists
+    sectors = None if _ALL_SECTORS.search(text) else (sector_tags(sector) or None)
+
+    revenue_caps = [_ringgit(number, unit) for number, unit in _REVENUE_CAP.findall(text)]
+    employee_caps = [int((bounded or trailing).replace(",", "")) for bounded, trailing in _EMPLOYEE_CAP.findall(text)]
+
+    # Only a requirement when no foreign-owned route is offered alongside it
+    equity = [int(share) for share in _MALAYSIAN_EQUITY.findall(text)]
+    malaysian_owned = bool(equity) and max(equity) > 50 and not re.search(r"\bforeign[- ]", text, re.IGNORECASE)
+    if re.search(r"\bMalaysian[- ]owned\b", text, re.IGNORECASE):
+        malaysian_owned = True
+
+    if min_amount is None:
+        match = _MIN_AMOUNT.search(text)
+        min_amount = _ringgit(*match.groups()) if match else None
+
+    return {
+        "sectors": sectors,
+        "max_revenue": max(revenue_caps) if revenue_caps else None,
+        "max_employees": max(employee_caps) if employee_caps else None,
+        "malaysian_owned": malaysian_owned,
+        "min_amount": min_amount,
+    }
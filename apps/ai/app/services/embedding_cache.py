@@ -0,0 +1,80 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..models.models import EmbeddingCacheEntry
+from ..utils.metrics import record_cache
+
+LOOKUP_BATCH = 1000
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 of a text; the same key funding_chunks.content_hash uses"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent memo of embeddings in `embedding_cache`, scoped to one model id and
+    dimension count. Rows for other models are never returned, so switching models
+    misses cleanly; `purge_other_models` reclaims their space.
+    Nothing here commits: writes join the caller's transaction.
+    """
+
+    def __init__(self, db: Session, model_id: str, dims: int):
+        self.db = db
+        self.model_id = model_id
+        self.dims = dims
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, text_hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Cached vectors for the given hashes, in batched lookups"""
+        text_hashes = list(dict.fromkeys(text_hashes))
+        found = {}
+
+        for i in range(0, len(text_hashes), LOOKUP_BATCH):
+            batch = text_hashes[i:i + LOOKUP_BATCH]
+            rows = self.db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.vector).filter(
+                EmbeddingCacheEntry.model_id == self.model_id,
+                EmbeddingCacheEntry.dims == self.dims,
+                EmbeddingCacheEntry.text_hash.in_(batch)
+            )
+            found.update((text_hash, vector) for text_hash, vector in rows)
+
+        self.hits += len(found)
+        self.misses += len(text_hashes) - len(found)
+        record_cache("embedding", len(found), len(text_hashes) - len(found))
+        return found
+
+    def get(self, text_hash: str):
+        return self.get_many([text_hash]).get(text_hash)
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> int:
+        """Insert vectors in one multi-row statement; existing entries are left alone"""
+        rows = [
+            {
+                "text_hash": text_hash,
+                "model_id": self.model_id,
+                "dims": self.dims,
+                "vector": vector,
+                "created_at": datetime.utcnow()
+            }
+            for text_hash, vector in vectors.items() if vector is not None
+        ]
+        if not rows:
+            return 0
+
+        statement = insert(EmbeddingCacheEntry).on_conflict_do_nothing(
+            index_elements=["text_hash", "model_id", "dims"]
+        )
+        self.db.execute(statement, rows)
+        return len(rows)
+
+    def purge_other_models(self) -> int:
+        """Delete entries written by any other model id or dimension count"""
+        return self.db.query(EmbeddingCacheEntry).filter(
+            or_(EmbeddingCacheEntry.model_id != self.model_id, EmbeddingCacheEntry.dims != self.dims)
+        ).delete(synchronize_session=False)
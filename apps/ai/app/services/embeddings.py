@@ -1,35 +1,105 @@
-import boto3
+import asyncio
 import json
-from typing import List
+import time
+from sqlalchemy.orm import Session
+from typing import List, Dict, Optional
+from .bedrock import bedrock_client
+from .embedding_cache import EmbeddingCache, hash_text
+from .usage import UsageLog
+from ..utils.singleflight import SingleFlight, flight_key
 import os
 
+# Shared by every EmbeddingService in the process, so concurrent requests embedding
+# the same text (a burst of identical questions) make one Bedrock call
+EMBEDDING_FLIGHT = SingleFlight("embedding")
+
 class EmbeddingService:
-    def __init__(self):
-        # Use permanent AWS credentials from environment
-        self.bedrock = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
-        self.model_id = "amazon.titan-embed-text-v2:0"
+    def __init__(self, db: Optional[Session] = None):
+        # Enough pooled connections for concurrent ingestion workers
+        self.bedrock = bedrock_client(max_pool_connections=int(os.getenv('BEDROCK_MAX_CONNECTIONS', '32')))
+        self.model_id = os.getenv('EMBEDDING_MODEL_ID', "amazon.titan-embed-text-v2:0")
+        self.dimensions = 1024  # Matches the funding_chunks vector column
+        # With a session, embeddings are looked up in (and added to) the persistent cache first
+        self.cache = EmbeddingCache(db, self.model_id, self.dimensions) if db is not None else None
+        self.bedrock_calls = 0
+        self.usage = UsageLog()
     
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding using Bedrock Titan v2"""
+    def _invoke(self, text: str) -> List[float]:
+        body = json.dumps({
+            "inputText": text,
+            "dimensions": self.dimensions
+        })
+        
+        started = time.perf_counter()
         try:
-            body = json.dumps({
-                "inputText": text
-            })
-            
             response = self.bedrock.invoke_model(
                 modelId=self.model_id,
                 body=body,
                 contentType='application/json'
             )
-            
             response_body = json.loads(response['body'].read())
-            return response_body['embedding']
+        except Exception as e:
+            self.usage.record(self.model_id, "embedding", (time.perf_counter() - started) * 1000, error=str(e))
+            raise
+        
+        self.usage.record(
+            self.model_id,
+            "embedding",
+            (time.perf_counter() - started) * 1000,
+            input_tokens=response_body.get('inputTextTokenCount')
+        )
+        return response_body['embedding']
+    
+    async def _call(self, text: str) -> List[float]:
+        # boto3 is blocking; run it off the event loop so calls can overlap
+        self.bedrock_calls += 1
+        return await asyncio.to_thread(self._invoke, text)
+    
+    async def embed_uncached(self, text: str) -> List[float]:
+        """
+        Call Bedrock Titan v2, bypassing the cache. An identical call already in
+        flight is awaited instead; its usage is recorded by the service that made it.
+        """
+        try:
+            key = flight_key(self.model_id, str(self.dimensions), text)
+            embedding, _ = await EMBEDDING_FLIGHT.do(key, lambda: self._call(text))
+            return embedding
             
         except Exception as e:
             print(f"❌ Bedrock embedding error: {e}")
             raise e
+    
+    async def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding using Bedrock Titan v2, unless it is already cached"""
+        if self.cache is None:
+            return await self.embed_uncached(text)
+        
+        text_hash = hash_text(text)
+        embedding = self.cache.get(text_hash)
+        if embedding is None:
+            embedding = await self.embed_uncached(text)
+            self.cache.put_many({text_hash: embedding})
+            self.usage.flush(self.cache.db)
+        return embedding
+    
+    async def generate_embeddings(self, texts: List[str], concurrency: int = 8) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with at most `concurrency` calls in flight.
+        Cached texts are looked up in one batch and misses are written back in one batch.
+        """
+        hashes = [hash_text(text) for text in texts]
+        cached: Dict[str, List[float]] = self.cache.get_many(hashes) if self.cache is not None else {}
+        missing = {text_hash: text for text_hash, text in zip(hashes, texts) if text_hash not in cached}
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def embed(text: str) -> List[float]:
+            async with semaphore:
+                return await self.embed_uncached(text)
+        
+        fresh = dict(zip(missing.keys(), await asyncio.gather(*(embed(text) for text in missing.values()))))
+        if self.cache is not None:
+            # Usage rows join the caller's transaction along with the new cache entries
+            self.cache.put_many(fresh)
+            self.usage.flush(self.cache.db)
+        
+        return [cached[text_hash] if text_hash in cached else fresh[text_hash] for text_hash in hashes]
@@ -0,0 +1,136 @@
+import os
+import zipfile
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Tuple
+from xml.etree import ElementTree
+
+# Every extractor streams (section_no, text) records, 1-based, like PDF pages.
+# A section starts at each heading, so chunks never straddle two of them.
+Extractor = Callable[[str], Iterator[Tuple[int, str]]]
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+READ_BLOCK = 64 * 1024
+
+
+def register_extractor(*suffixes: str):
+    """Register a (section_no, text) extractor for file suffixes such as ".docx" """
+    def register(extractor: Extractor) -> Extractor:
+        for suffix in suffixes:
+            EXTRACTORS[suffix.lower()] = extractor
+        return extractor
+    return register
+
+
+def get_extractor(path: str) -> Extractor:
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix not in EXTRACTORS:
+        raise ValueError(f"No extractor for '{suffix}' files")
+    return EXTRACTORS[suffix]
+
+
+@register_extractor(".docx")
+def iter_docx_sections(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Stream a Word document's body with iterparse, clearing each element once read,
+    so memory stays flat however long the document is. Table rows become
+    " | "-joined lines; Title/Heading styles start a new section.
+    """
+    section_no = 0
+    lines: List[str] = []
+    table_depth = 0
+
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as document:
+        for event, element in ElementTree.iterparse(document, events=("start", "end")):
+            if element.tag == f"{_W}tbl":
+                table_depth += 1 if event == "start" else -1
+                continue
+            if event != "end":
+                continue
+
+            if element.tag == f"{_W}tr":
+                cells = [
+                    " ".join("".join(t.text or "" for t in cell.iter(f"{_W}t")).split())
+                    for cell in element.iter(f"{_W}tc")
+                ]
+                if any(cells):
+                    lines.append(" | ".join(cells))
+                element.clear()
+
+            elif element.tag == f"{_W}p" and table_depth == 0:
+                text = "".join(t.text or "" for t in element.iter(f"{_W}t")).strip()
+                style = element.find(f"{_W}pPr/{_W}pStyle")
+                style_name = style.get(f"{_W}val", "") if style is not None else ""
+
+                if text and style_name.startswith(("Heading", "Title")):
+                    if lines:
+                        section_no += 1
+                        yield section_no, "\n".join(lines)
+                    lines = []
+                if text:
+                    lines.append(text)
+                element.clear()
+
+    if lines:
+        yield section_no + 1, "\n".join(lines)
+
+
+class _HtmlSections(HTMLParser):
+    """Collects visible text, with line breaks at block elements and a new section per h1-h3"""
+
+    SKIP = {"script", "style", "noscript", "template", "head", "svg"}
+    BLOCKS = {"p", "div", "li", "tr", "br", "section", "article", "h4", "h5", "h6", "dt", "dd", "blockquote", "pre", "table"}
+    SECTIONS = {"h1", "h2", "h3"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.parts: List[str] = []
+        self.sections: List[str] = []
+
+    def _close_section(self):
+        lines = (" ".join(line.split()).strip("| ") for line in "".join(self.parts).splitlines())
+        text = "\n".join(line for line in lines if line)
+        if text:
+            self.sections.append(text)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip_depth += 1
+        elif tag in self.SECTIONS:
+            self._close_section()
+        elif tag in self.BLOCKS or tag in ("td", "th"):
+            self.parts.append(" | " if tag in ("td", "th") else "\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in self.BLOCKS or tag in self.SECTIONS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+@register_extractor(".html", ".htm")
+def iter_html_sections(path: str) -> Iterator[Tuple[int, str]]:
+    """Feed an HTML file to the parser in 64 KB blocks, yielding each section as soon as it closes"""
+    parser = _HtmlSections()
+    section_no = 0
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), ""):
+            parser.feed(block)
+            for text in parser.sections:
+                section_no += 1
+                yield section_no, text
+            parser.sections = []
+
+    parser.close()
+    parser._close_section()
+    for text in parser.sections:
+        section_no += 1
+        yield section_no, text
@@ -1,8 +1,10 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from datetime import datetime
+from sqlalchemy import and_, or_, select
+from sqlalchemy.sql.elements import ColumnElement
 from ..models.models import Funding, Company
+from .eligibility import sector_tags
+from ..utils.tracing import span
 import json
 
 class GrantFilterService:
@@ -61,17 +63,11 @@ class GrantFilterService:
         for key in keywords:
             keywords[key] = list(set(keywords[key]))
         
-        print(f"🔍 Extracted keywords: {keywords}")
         return keywords
     
     def filter_grants_by_keywords(self, keywords: Dict[str, List[str]]) -> List[int]:
         """Filter grants based on extracted keywords"""
-        base_query = self.db.query(Funding).filter(
-            or_(
-                Funding.deadline.is_(None),
-                Funding.deadline > datetime.now()
-            )
-        )
+        base_query = self.db.query(Funding).filter(Funding.is_active)
         
         conditions = []
         
@@ -118,14 +114,18 @@ class GrantFilterService:
                     Funding.description.ilike('%marketing%')
                 ])
         
-        if conditions:
-            grants = base_query.filter(or_(*conditions)).all()
-        else:
-            grants = base_query.all()
-        
-        print(f"🎯 Found {len(grants)} grants matching keywords")
-        for grant in grants[:3]:
-            print(f"   - {grant.title}")
+        with span("keyword_filter") as filter_span:
+            for key, values in keywords.items():
+                if values:
+                    filter_span.set(key, sorted(values))
+            
+            if conditions:
+                grants = base_query.filter(or_(*conditions)).all()
+            else:
+                grants = base_query.all()
+            
+            filter_span.set("grants", len(grants))
+            filter_span.set("top_grants", [grant.title for grant in grants[:3]])
         
         return [grant.id for grant in grants]
     
@@ -139,6 +139,50 @@ class GrantFilterService:
         
         return grant_ids
     
-    def filter_grants(self, company: Company) -> List[int]:
-        """Filter grants based on company profile - DEPRECATED"""
-        return self.filter_grants_by_query("")
+    def eligibility_predicate(
+        self,
+        company: Company,
+        malaysian_owned: Optional[bool] = None,
+        amount: Optional[float] = None
+    ) -> ColumnElement:
+        """
+        One WHERE clause over the structured eligibility columns. Each constraint
+        only excludes a grant when both the grant states it and the company's
+        value is known, so sparse profiles still see every grant they might fit.
+        """
+        # Expired grants are excluded by flag, which the partial indexes are built on
+        conditions = [Funding.is_active]
+        
+        tags = sector_tags(company.sector)
+        if tags:
+            # GIN index on sectors
+            conditions.append(or_(Funding.sectors.is_(None), Funding.sectors.overlap(tags)))
+        
+        if company.employees is not None:
+            conditions.append(or_(Funding.max_employees.is_(None), Funding.max_employees >= company.employees))
+        
+        if company.revenue is not None:
+            conditions.append(or_(Funding.max_revenue.is_(None), Funding.max_revenue >= company.revenue))
+        
+        if malaysian_owned is False:
+            conditions.append(Funding.malaysian_owned.is_(False))
+        
+        if amount is not None:
+            conditions.append(or_(Funding.amount.is_(None), Funding.amount >= amount))
+            conditions.append(or_(Funding.min_amount.is_(None), Funding.min_amount <= amount))
+        
+        return and_(*conditions)
+    
+    def filter_grants(
+        self,
+        company: Company,
+        malaysian_owned: Optional[bool] = None,
+        amount: Optional[float] = None
+    ) -> List[int]:
+        """Ids of grants the company is not ruled out of; run before any vector or LLM work"""
+        with span("eligibility") as eligibility_span:
+            grant_ids = list(self.db.scalars(
+                select(Funding.id).where(self.eligibility_predicate(company, malaysian_owned, amount))
+            ))
+            eligibility_span.set("grants", len(grant_ids))
+        return grant_ids
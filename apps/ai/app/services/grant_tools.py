@@ -1,17 +1,17 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from ..models.models import Funding, FundingChunk
-from datetime import datetime
+from sqlalchemy import or_, and_, select
+from ..models.models import Funding, FundingChunk, FundingChunkLink, CompanyGrantMatch
 
 class GrantTools:
     def __init__(self, db: Session):
         self.db = db
     
-    def search_grants(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def search_grants(self, query: str, limit: int = 10, grant_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """
         Search for grants based on query keywords.
         LLM can call this tool to find relevant grants.
+        grant_ids (from GrantFilterService.filter_grants) limits the search to eligible grants.
         """
         query_lower = query.lower()
         
@@ -35,15 +35,15 @@ class GrantTools:
                 ])
         
         # Execute search
-        grants = self.db.query(Funding).filter(
+        grants_query = self.db.query(Funding).filter(
             and_(
-                or_(
-                    Funding.deadline.is_(None),
-                    Funding.deadline > datetime.now()
-                ),
+                Funding.is_active,
                 or_(*conditions)
             )
-        ).limit(limit).all()
+        )
+        if grant_ids is not None:
+            grants_query = grants_query.filter(Funding.id.in_(grant_ids))
+        grants = grants_query.limit(limit).all()
         
         # Return structured data for LLM
         results = []
@@ -70,10 +70,12 @@ class GrantTools:
         if not grant:
             return {"error": "Grant not found"}
         
-        # Get all chunks for this grant (RAG content)
-        chunks = self.db.query(FundingChunk).filter(
-            FundingChunk.funding_id == grant_id
-        ).all()
+        # Get all chunks for this grant (RAG content); shared chunks are linked, not copied
+        chunks = self.db.query(FundingChunk.chunk_text, FundingChunkLink.page_no).join(
+            FundingChunkLink.chunk
+        ).filter(
+            FundingChunkLink.funding_id == grant_id
+        ).order_by(FundingChunkLink.manifest_id, FundingChunkLink.page_no).all()
         
         result = {
             "id": grant.id,
@@ -86,20 +88,77 @@ class GrantTools:
             "deadline": grant.deadline.isoformat() if grant.deadline else None,
             "detailed_content": [
                 {
-                    "text": chunk.chunk_text,
-                    "page": chunk.page_no
+                    "text": chunk_text,
+                    "page": page_no
                 }
-                for chunk in chunks
+                for chunk_text, page_no in chunks
             ],
             "total_chunks": len(chunks)
         }
         
         return result
     
-    def search_grants_with_chunks(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+    def search_chunks(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        grant_ids: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Vector search over stored chunks. A chunk shared by several grants
+        (e.g. the common DCG briefing slides) is returned once, with every
+        grant it belongs to attached. With grant_ids, only chunks linked to
+        those grants are ranked and only those grants are attached.
+        """
+        # is_active matches the partial HNSW index, so chunks of expired grants are never ranked
+        query = self.db.query(FundingChunk).filter(
+            FundingChunk.is_active,
+            FundingChunk.embedding.isnot(None)
+        )
+        if grant_ids is not None:
+            query = query.filter(FundingChunk.id.in_(
+                select(FundingChunkLink.chunk_id).where(FundingChunkLink.funding_id.in_(grant_ids))
+            ))
+        
+        chunks = query.order_by(
+            FundingChunk.embedding.cosine_distance(query_embedding)
+        ).limit(limit).all()
+        
+        if not chunks:
+            return []
+        
+        links = self.db.query(FundingChunkLink.chunk_id, FundingChunkLink.page_no, Funding.id, Funding.title).join(
+            Funding, Funding.id == FundingChunkLink.funding_id
+        ).filter(
+            FundingChunkLink.chunk_id.in_([chunk.id for chunk in chunks]),
+            Funding.is_active
+        )
+        if grant_ids is not None:
+            links = links.filter(Funding.id.in_(grant_ids))
+        links = links.order_by(FundingChunkLink.chunk_id, Funding.id, FundingChunkLink.page_no).all()
+        
+        # One entry per grant per chunk, even when a grant links it from several documents
+        grants_by_chunk: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        for chunk_id, page_no, grant_id, title in links:
+            grants_by_chunk.setdefault(chunk_id, {}).setdefault(grant_id, {
+                "id": grant_id,
+                "title": title,
+                "page": page_no
+            })
+        
+        return [
+            {
+                "text": chunk.chunk_text,
+                "grants": list(grants_by_chunk.get(chunk.id, {}).values())
+            }
+            for chunk in chunks
+        ]
+    
+    def search_grants_with_chunks(self, query: str, limit: int = 3, grant_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """
         Search grants and include RAG chunks for detailed content.
         Returns fewer grants but with full PDF content.
+        grant_ids (from GrantFilterService.filter_grants) limits the search to eligible grants.
         """
         query_lower = query.lower()
         
@@ -121,15 +180,15 @@ class GrantTools:
                 ])
         
         # Execute search
-        grants = self.db.query(Funding).filter(
+        grants_query = self.db.query(Funding).filter(
             and_(
-                or_(
-                    Funding.deadline.is_(None),
-                    Funding.deadline > datetime.now()
-                ),
+                Funding.is_active,
                 or_(*conditions)
             )
-        ).limit(limit).all()
+        )
+        if grant_ids is not None:
+            grants_query = grants_query.filter(Funding.id.in_(grant_ids))
+        grants = grants_query.limit(limit).all()
         
         # Get detailed info with chunks for each grant
         results = []
@@ -174,24 +233,27 @@ class GrantTools:
         # Return with full RAG content
         return self.get_grant_details_with_chunks(grant.id)
     
-    def search_by_amount(self, min_amount: float = None, max_amount: float = None) -> List[Dict[str, Any]]:
+    def search_by_amount(
+        self,
+        min_amount: float = None,
+        max_amount: float = None,
+        grant_ids: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search grants by funding amount range.
         LLM can use this for budget-specific queries.
         """
         query = self.db.query(Funding)
         
+        if grant_ids is not None:
+            query = query.filter(Funding.id.in_(grant_ids))
+        
         if min_amount:
             query = query.filter(Funding.amount >= min_amount)
         if max_amount:
             query = query.filter(Funding.amount <= max_amount)
         
-        grants = query.filter(
-            or_(
-                Funding.deadline.is_(None),
-                Funding.deadline > datetime.now()
-            )
-        ).all()
+        grants = query.filter(Funding.is_active).all()
         
         return [
             {
@@ -204,17 +266,15 @@ class GrantTools:
             for grant in grants
         ]
     
-    def get_all_available_grants(self) -> List[Dict[str, Any]]:
+    def get_all_available_grants(self, grant_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """
         Get overview of all available grants.
         LLM can use this for general "what grants are available" queries.
         """
-        grants = self.db.query(Funding).filter(
-            or_(
-                Funding.deadline.is_(None),
-                Funding.deadline > datetime.now()
-            )
-        ).all()
+        query = self.db.query(Funding).filter(Funding.is_active)
+        if grant_ids is not None:
+            query = query.filter(Funding.id.in_(grant_ids))
+        grants = query.all()
         
         return [
             {
@@ -226,3 +286,28 @@ class GrantTools:
             }
             for grant in grants
         ]
+    
+    def get_matched_grants(self, company_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Precomputed best-fit grants for a company (see match.py), best first.
+        One index lookup on (company_id, rank); empty until the first match refresh.
+        """
+        matches = self.db.query(CompanyGrantMatch.score, Funding).join(
+            Funding, Funding.id == CompanyGrantMatch.funding_id
+        ).filter(
+            CompanyGrantMatch.company_id == company_id,
+            # Grants that expired since the last match refresh are skipped, not served
+            Funding.is_active
+        ).order_by(CompanyGrantMatch.rank).limit(limit).all()
+        
+        return [
+            {
+                "id": grant.id,
+                "title": grant.title,
+                "sector": grant.sector,
+                "amount": grant.amount,
+                "match_score": round(score, 3),
+                "description": grant.description[:200] + "..." if grant.description and len(grant.description) > 200 else grant.description
+            }
+            for score, grant in matches
+        ]
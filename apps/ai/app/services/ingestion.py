@@ -0,0 +1,657 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from ..models.models import Funding, FundingChunk, FundingChunkLink, IngestionManifest, OcrPageCache
+from .active_grants import ActiveGrantService, parse_deadline
+from .chunk_writer import BulkChunkWriter
+from .document_processor import DocumentProcessor
+from .embedding_cache import EmbeddingCache, hash_text
+from .eligibility import extract_criteria
+from .embeddings import EmbeddingService
+from .extractors import EXTRACTORS
+from .ocr import OCR_ENGINE, ocr_page
+from ..utils.metrics import record_cache
+
+SUPPORTED_SUFFIXES = {".pdf", *EXTRACTORS}
+MIN_CHUNK_CHARS = 50  # Skip very short chunks (page numbers, headers)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_document(path: str, ocr_texts: Optional[Dict[int, str]] = None) -> Dict[str, Any]:
+    """
+    Extract and chunk a single document (PDF page by page, DOCX/HTML section by
+    section) into (page_no, chunk) records. Runs inside a worker process.
+    Pages without a text layer are listed in "scanned_pages" ({page_no: page hash or None});
+    a second call with their OCR text in ocr_texts chunks them in place.
+    """
+    processor = DocumentProcessor()
+    extract_seconds = 0.0
+    scanned_pages: Dict[int, Optional[str]] = {}
+
+    def timed_pages():
+        # Pages are pulled lazily by the chunker; time only the extraction side
+        nonlocal extract_seconds
+        pages = processor.iter_sections(
+            path,
+            ocr_texts=ocr_texts,
+            scanned_pages=scanned_pages if ocr_texts is None else None
+        )
+        while True:
+            page_started = time.time()
+            page = next(pages, None)
+            extract_seconds += time.time() - page_started
+            if page is None:
+                return
+            yield page
+
+    # Wall-clock timestamps so the parent can place worker time on its own timeline
+    started = time.time()
+    chunks = [
+        (page_no, chunk) for page_no, chunk in processor.chunk_pages(timed_pages())
+        if len(chunk.strip()) > MIN_CHUNK_CHARS
+    ]
+    finished = time.time()
+
+    return {
+        "path": path,
+        "chunks": chunks,
+        "scanned_pages": scanned_pages,
+        "timings": (started, started + extract_seconds, finished)
+    }
+
+
+class StageStats:
+    """Item count and wall-clock window for one pipeline stage"""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def record(self, items: int, started_at: float, finished_at: float):
+        self.items += items
+        self.busy_seconds += finished_at - started_at
+        self.started_at = started_at if self.started_at is None else min(self.started_at, started_at)
+        self.finished_at = finished_at if self.finished_at is None else max(self.finished_at, finished_at)
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Items per second over the stage's wall-clock window"""
+        return self.items / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "unit": self.unit,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "per_second": round(self.throughput, 2)
+        }
+
+
+class IngestionPipeline:
+    """
+    Single ingestion path for the data/ catalog:
+    discover → extract (process pool, OCR for scanned pages) → chunk → embed (bounded async) → bulk write.
+
+    Runs are incremental: documents are keyed by SHA-256 in `ingestion_manifest`
+    and chunks by SHA-256 of their text, so only changed content is re-embedded.
+    Chunks are content-addressed and linked to fundings, so a file shipped by
+    several fundings is extracted once and its chunks are stored and embedded once.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        data_dir: str = "data",
+        workers: Optional[int] = None,
+        embed_concurrency: int = 8,
+        embed: bool = True
+    ):
+        self.db = db
+        self.data_dir = Path(data_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.embed_concurrency = embed_concurrency
+        self.embed = embed
+        self.embedding_service = EmbeddingService(db) if embed else None
+        self.active_grants = ActiveGrantService(db)
+        self.stats = {
+            "discover": StageStats("discover", "fundings"),
+            "extract": StageStats("extract", "documents"),
+            "ocr": StageStats("ocr", "pages"),
+            "chunk": StageStats("chunk", "chunks"),
+            "embed": StageStats("embed", "chunks"),
+            "write": StageStats("write", "rows")
+        }
+        self.counters = {
+            "documents_unchanged": 0,
+            "documents_shared": 0,
+            "documents_removed": 0,
+            "ocr_pages_cached": 0,
+            "chunks_reused": 0,
+            "embeddings_cached": 0,
+            "chunks_removed": 0,
+            "links_removed": 0
+        }
+        # Per-run dedupe: file hash -> chunk placements, chunk hash -> embedding
+        self.pending_documents: Dict[str, asyncio.Future] = {}
+        self.pending_embeddings: Dict[str, asyncio.Future] = {}
+        self.ocr_warned = False
+
+    def discover(self) -> List[Dict[str, Any]]:
+        """Read every funding folder's metadata once and list its documents"""
+        started = time.time()
+        grants = []
+
+        for folder in sorted(self.data_dir.iterdir()):
+            if not folder.is_dir() or folder.name.startswith('.'):
+                continue
+
+            json_files = sorted((folder / "metadata").glob("*.json"))
+            if not json_files:
+                print(f"   ⚠️ No metadata JSON found for {folder.name}")
+                continue
+
+            with open(json_files[0], 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+
+            docs_dir = folder / "relevant_docs"
+            documents = sorted(
+                str(path) for path in docs_dir.iterdir()
+                if path.is_file() and not path.name.startswith('.') and path.suffix.lower() in SUPPORTED_SUFFIXES
+            ) if docs_dir.exists() else []
+
+            grants.append({
+                "folder": folder.name,
+                "metadata": metadata,
+                "documents": documents
+            })
+
+        self.stats["discover"].record(len(grants), started, time.time())
+        return grants
+
+    def upsert_funding(self, metadata: Dict[str, Any]) -> Funding:
+        """Create or update the funding row for a metadata record, matched by title"""
+        now = datetime.utcnow()
+        funding = self.db.query(Funding).filter(Funding.title == metadata["title"]).first()
+
+        if not funding:
+            funding = Funding(title=metadata["title"], created_at=now)
+            self.db.add(funding)
+
+        funding.description = metadata.get("description")
+        funding.sector = metadata.get("sector")
+        funding.deadline = parse_deadline(metadata.get("deadline"))
+        funding.is_active = funding.deadline is None or funding.deadline > now
+        funding.amount = metadata.get("amount")
+        funding.eligibility = metadata.get("eligibility")
+        funding.required_docs = metadata.get("requiredDocs")
+        for column, value in extract_criteria(funding.sector, funding.eligibility, metadata.get("minAmount")).items():
+            setattr(funding, column, value)
+        funding.updated_at = now
+
+        self.db.commit()
+        self.db.refresh(funding)
+        return funding
+
+    async def embed_chunks(
+        self,
+        chunks: Dict[str, str],
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Dict[str, Optional[List[float]]], Dict[str, List[float]]]:
+        """
+        Embed chunk texts keyed by hash, sharing one concurrency limit across documents.
+        The embedding cache is checked in one batch first; a hash already being embedded
+        for another document in this run is awaited, not re-sent.
+        Returns (all embeddings, those that came from Bedrock and should be cached).
+        """
+        if not self.embed:
+            return {chunk_hash: None for chunk_hash in chunks}, {}
+
+        cached = self.embedding_service.cache.get_many(chunks.keys())
+        self.counters["embeddings_cached"] += len(cached)
+
+        async def embed(text: str) -> List[float]:
+            async with semaphore:
+                started = time.time()
+                embedding = await self.embedding_service.embed_uncached(text)
+                self.stats["embed"].record(1, started, time.time())
+                return embedding
+
+        futures = {}
+        for chunk_hash, text in chunks.items():
+            if chunk_hash in cached:
+                continue
+            if chunk_hash not in self.pending_embeddings:
+                self.pending_embeddings[chunk_hash] = asyncio.ensure_future(embed(text))
+            futures[chunk_hash] = self.pending_embeddings[chunk_hash]
+
+        fresh = dict(zip(futures.keys(), await asyncio.gather(*futures.values())))
+        return {**cached, **fresh}, fresh
+
+    async def ocr_pages(self, path: str, scanned_pages: Dict[int, Optional[str]], submit: Callable[..., asyncio.Future]) -> Dict[int, str]:
+        """
+        OCR text for scanned pages. Pages seen before (same image content, any file)
+        come from ocr_page_cache; the rest are OCR'd in parallel on the worker pool
+        and cached, including pages that yield no text, so they are never OCR'd twice.
+        """
+        # Pages without a content hash are OCR'd every time, keyed by page number
+        keys = {page_no: page_hash or ("page", page_no) for page_no, page_hash in scanned_pages.items()}
+        hashes = {page_hash for page_hash in scanned_pages.values() if page_hash}
+        texts = dict(
+            self.db.query(OcrPageCache.page_hash, OcrPageCache.text).filter(
+                OcrPageCache.engine == OCR_ENGINE,
+                OcrPageCache.page_hash.in_(hashes)
+            )
+        )
+        self.counters["ocr_pages_cached"] += sum(1 for key in keys.values() if key in texts)
+        record_cache("ocr_page", len(texts), len(hashes) - len(texts))
+
+        # One OCR per distinct page content
+        missing = {}
+        for page_no, key in keys.items():
+            if key not in texts:
+                missing.setdefault(key, page_no)
+
+        if missing:
+            started = time.time()
+            results = await asyncio.gather(
+                *(submit(ocr_page, path, page_no) for page_no in missing.values()),
+                return_exceptions=True
+            )
+            self.stats["ocr"].record(len(missing), started, time.time())
+
+            fresh = {}
+            for key, result in zip(missing.keys(), results):
+                if isinstance(result, Exception):
+                    # Not cached, so the page is retried once OCR is available
+                    if not self.ocr_warned:
+                        print(f"   ⚠️ OCR unavailable, scanned pages stay empty: {result}")
+                        self.ocr_warned = True
+                    continue
+                fresh[key] = result
+
+            cacheable = [
+                {"page_hash": key, "engine": OCR_ENGINE, "text": text, "created_at": datetime.utcnow()}
+                for key, text in fresh.items() if key in hashes
+            ]
+            if cacheable:
+                self.db.execute(
+                    insert(OcrPageCache).on_conflict_do_nothing(index_elements=["page_hash", "engine"]),
+                    cacheable
+                )
+                self.db.commit()
+            texts.update(fresh)
+
+        return {
+            page_no: texts[key]
+            for page_no, key in keys.items()
+            if texts.get(key, "").strip()
+        }
+
+    async def extract_chunks(self, path: str, submit: Callable[..., asyncio.Future]) -> Dict[str, Tuple[int, str]]:
+        """Extract a document on the worker pool, OCR its scanned pages, and key its chunks by text hash"""
+        result = await submit(extract_document, path)
+        started, extracted, chunked = result["timings"]
+        self.stats["extract"].record(1, started, extracted)
+
+        if result["scanned_pages"]:
+            ocr_texts = await self.ocr_pages(path, result["scanned_pages"], submit)
+            if ocr_texts:
+                # Re-chunk with the OCR text in place so chunks keep page order and page numbers
+                result = await submit(extract_document, path, ocr_texts)
+                started, extracted, chunked = result["timings"]
+                self.stats["extract"].record(0, started, extracted)
+
+        self.stats["chunk"].record(len(result["chunks"]), extracted, chunked)
+
+        # Identical chunk text within a document collapses to one link (first page wins)
+        chunks: Dict[str, Tuple[int, str]] = {}
+        for page_no, text in result["chunks"]:
+            chunks.setdefault(hash_text(text), (page_no, text))
+        return chunks
+
+    async def copy_chunks(self, source: IngestionManifest) -> Dict[str, Tuple[int, str]]:
+        """Chunks of an already-ingested copy of the same file, instead of extracting it again"""
+        return {
+            chunk_hash: (page_no, text)
+            for chunk_hash, page_no, text in (
+                self.db.query(FundingChunk.content_hash, FundingChunkLink.page_no, FundingChunk.chunk_text)
+                .join(FundingChunkLink.chunk)
+                .filter(FundingChunkLink.manifest_id == source.id)
+            )
+        }
+
+    def write_document(
+        self,
+        db: Session,
+        funding_id: int,
+        source_path: str,
+        content_hash: str,
+        entry: Optional[IngestionManifest],
+        chunks: Dict[str, Tuple[int, str]],
+        stale_link_ids: List[int],
+        embeddings: Dict[str, Optional[List[float]]],
+        fresh_embeddings: Dict[str, List[float]]
+    ) -> int:
+        """
+        Apply one document's chunk delta, its links and its manifest row in a single
+        transaction on the document's own session. The manifest hash only moves once
+        everything is committed, so an interrupted run leaves each document either
+        fully ingested or untouched.
+        """
+        started = time.time()
+        now = datetime.utcnow()
+
+        if entry is None:
+            entry = IngestionManifest(
+                funding_id=funding_id,
+                source_path=source_path,
+                content_hash=content_hash,
+                created_at=now,
+                updated_at=now
+            )
+            db.add(entry)
+            db.flush()
+        else:
+            entry = db.get(IngestionManifest, entry.id)
+
+        if stale_link_ids:
+            db.query(FundingChunkLink).filter(FundingChunkLink.id.in_(stale_link_ids)).delete(synchronize_session=False)
+
+        rows = (
+            {
+                "content_hash": chunk_hash,
+                "chunk_text": chunks[chunk_hash][1],
+                "embedding": embedding
+            }
+            for chunk_hash, embedding in embeddings.items()
+        )
+        chunk_writer = BulkChunkWriter(db)
+        written = chunk_writer.write(rows) if embeddings else 0
+        if fresh_embeddings:
+            EmbeddingCache(db, self.embedding_service.model_id, self.embedding_service.dimensions).put_many(fresh_embeddings)
+        if self.embed:
+            self.embedding_service.usage.flush(db)
+        chunk_writer.link(
+            funding_id,
+            entry.id,
+            [(chunk_hash, page_no) for chunk_hash, (page_no, _) in chunks.items()]
+        )
+        # New chunks default to active; shared ones may have been linked only to expired grants
+        ActiveGrantService(db).sync_chunks([funding_id])
+
+        entry.content_hash = content_hash
+        entry.chunk_count = len(chunks)
+        entry.updated_at = now
+        db.commit()
+
+        self.stats["write"].record(written, started, time.time())
+        return written
+
+    async def process_document(
+        self,
+        funding_id: int,
+        source_path: str,
+        content_hash: str,
+        entry: Optional[IngestionManifest],
+        document_chunks: asyncio.Future,
+        semaphore: asyncio.Semaphore
+    ) -> int:
+        """
+        Embed only chunk text that isn't stored yet, then link the document's chunks.
+        Documents run concurrently, so each gets its own session: a failed write rolls
+        back that document alone instead of aborting the others' shared transaction.
+        """
+        chunks = await document_chunks
+
+        db = Session(bind=self.db.get_bind())
+        try:
+            return await self._process_document(db, funding_id, source_path, content_hash, entry, chunks, semaphore)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _process_document(
+        self,
+        db: Session,
+        funding_id: int,
+        source_path: str,
+        content_hash: str,
+        entry: Optional[IngestionManifest],
+        chunks: Dict[str, Tuple[int, str]],
+        semaphore: asyncio.Semaphore
+    ) -> int:
+        linked = {}
+        if entry is not None:
+            linked = dict(
+                db.query(FundingChunk.content_hash, FundingChunkLink.id)
+                .join(FundingChunkLink.chunk)
+                .filter(FundingChunkLink.manifest_id == entry.id)
+                .all()
+            )
+
+        stale_link_ids = [link_id for chunk_hash, link_id in linked.items() if chunk_hash not in chunks]
+        unlinked = [chunk_hash for chunk_hash in chunks if chunk_hash not in linked]
+
+        # Text stored for any funding (or any earlier version of this file) keeps its embedding
+        stored = set()
+        if unlinked:
+            stored = {
+                chunk_hash for (chunk_hash,) in
+                db.query(FundingChunk.content_hash).filter(FundingChunk.content_hash.in_(unlinked))
+            }
+        # End the read transaction so no pooled connection is held while embedding
+        db.commit()
+        new_chunks = {chunk_hash: chunks[chunk_hash][1] for chunk_hash in unlinked if chunk_hash not in stored}
+
+        self.counters["chunks_reused"] += len(chunks) - len(new_chunks)
+        self.counters["links_removed"] += len(stale_link_ids)
+        print(f"   📄 {source_path}: {len(chunks)} chunks ({len(new_chunks)} new, {len(stale_link_ids)} unlinked)")
+
+        embeddings, fresh_embeddings = await self.embed_chunks(new_chunks, semaphore)
+        return self.write_document(
+            db, funding_id, source_path, content_hash, entry, chunks, stale_link_ids, embeddings, fresh_embeddings
+        )
+
+    def remove_document(self, entry: IngestionManifest):
+        """Drop a document that is no longer in the catalog, with its chunk links"""
+        removed = self.db.query(FundingChunkLink).filter(FundingChunkLink.manifest_id == entry.id).delete(synchronize_session=False)
+        self.db.delete(entry)
+        self.db.commit()
+        self.counters["documents_removed"] += 1
+        self.counters["links_removed"] += removed
+        print(f"   🗑️ {entry.source_path}: removed ({removed} chunk links)")
+
+    def remove_untracked_links(self, funding_id: int):
+        """Drop chunk links written before the manifest existed; they are re-ingested with hashes"""
+        removed = self.db.query(FundingChunkLink).filter(
+            FundingChunkLink.funding_id == funding_id,
+            FundingChunkLink.manifest_id.is_(None)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        self.counters["links_removed"] += removed
+
+    def remove_orphan_chunks(self):
+        """Delete stored chunks that no funding links to any more"""
+        removed = self.db.query(FundingChunk).filter(~FundingChunk.links.any()).delete(synchronize_session=False)
+        self.db.commit()
+        self.counters["chunks_removed"] += removed
+
+    def changed_documents(
+        self,
+        grants: List[Dict[str, Any]]
+    ) -> Iterator[Tuple[int, str, str, str, Optional[IngestionManifest]]]:
+        """
+        Upsert each discovered funding and yield (funding_id, source_path, path,
+        content_hash, manifest entry) for its new or changed documents. Unchanged
+        documents are counted and documents gone from the catalog are removed.
+        """
+        for grant in grants:
+            funding = self.upsert_funding(grant["metadata"])
+            self.remove_untracked_links(funding.id)
+
+            manifest = {
+                entry.source_path: entry
+                for entry in self.db.query(IngestionManifest).filter(IngestionManifest.funding_id == funding.id)
+            }
+
+            current = set()
+            for path in grant["documents"]:
+                source_path = Path(path).relative_to(self.data_dir).as_posix()
+                content_hash = hash_file(path)
+                current.add(source_path)
+
+                entry = manifest.get(source_path)
+                if entry is not None and entry.content_hash == content_hash:
+                    self.counters["documents_unchanged"] += 1
+                    continue
+
+                yield funding.id, source_path, path, content_hash, entry
+
+            for source_path, entry in manifest.items():
+                if source_path not in current:
+                    self.remove_document(entry)
+
+    def document_chunks(self, content_hash: str, path: str, submit: Callable[..., asyncio.Future]) -> asyncio.Future:
+        """
+        Chunks for a file: shared with an identical file already pending in this run or
+        already ingested (for any funding), otherwise extracted with `submit(fn, *args)`.
+        """
+        document_chunks = self.pending_documents.get(content_hash)
+        if document_chunks is not None:
+            self.counters["documents_shared"] += 1
+            return document_chunks
+
+        source = self.db.query(IngestionManifest).filter(IngestionManifest.content_hash == content_hash).first()
+        if source is not None:
+            self.counters["documents_shared"] += 1
+            document_chunks = asyncio.ensure_future(self.copy_chunks(source))
+        else:
+            document_chunks = asyncio.ensure_future(self.extract_chunks(path, submit))
+
+        self.pending_documents[content_hash] = document_chunks
+        return document_chunks
+
+    async def ingest_file(self, funding_id: int, source_path: str, path: str) -> int:
+        """
+        Ingest one document outside a catalog run (uploads, queued jobs), with the same
+        manifest, chunk dedupe, embedding cache and bulk write as `run`. Returns new chunks.
+        """
+        content_hash = hash_file(path)
+        entry = self.db.query(IngestionManifest).filter(
+            IngestionManifest.funding_id == funding_id,
+            IngestionManifest.source_path == source_path
+        ).first()
+
+        if entry is not None and entry.content_hash == content_hash:
+            self.counters["documents_unchanged"] += 1
+            return 0
+
+        # One document: extract in threads rather than paying for a process pool;
+        # OCR still runs in parallel since each page is its own tesseract process
+        loop = asyncio.get_running_loop()
+        document_chunks = self.document_chunks(
+            content_hash,
+            path,
+            lambda fn, *args: loop.run_in_executor(None, fn, *args)
+        )
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        return await self.process_document(funding_id, source_path, content_hash, entry, document_chunks, semaphore)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the pipeline over whatever changed since the last run and return per-stage throughput"""
+        run_started = time.time()
+        grants = self.discover()
+        print(f"📁 Found {len(grants)} fundings, {sum(len(g['documents']) for g in grants)} documents")
+
+        if self.embed:
+            # Vectors from a previous model can never be hit again
+            purged = self.embedding_service.cache.purge_other_models()
+            self.db.commit()
+            if purged:
+                print(f"🧹 Purged {purged} cached embeddings from other models")
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        total_chunks = 0
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            tasks = []
+            for funding_id, source_path, path, content_hash, entry in self.changed_documents(grants):
+                document_chunks = self.document_chunks(
+                    content_hash,
+                    path,
+                    lambda fn, *args: loop.run_in_executor(pool, fn, *args)
+                )
+                tasks.append(self.process_document(funding_id, source_path, content_hash, entry, document_chunks, semaphore))
+
+            for count in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(count, Exception):
+                    # Already rolled back on the document's own session
+                    print(f"   ❌ Error processing document: {count}")
+                    continue
+                total_chunks += count
+
+        self.remove_orphan_chunks()
+        self.active_grants.sync_chunks()
+        if self.embed:
+            # Calls for documents that failed before their write
+            self.embedding_service.usage.flush(self.db)
+        self.db.commit()
+
+        return {
+            "fundings": len(grants),
+            "chunks": total_chunks,
+            "elapsed_seconds": round(time.time() - run_started, 3),
+            "bedrock_calls": self.embedding_service.bedrock_calls if self.embed else 0,
+            "embedding_input_tokens": self.embedding_service.usage.input_tokens if self.embed else 0,
+            **self.counters,
+            "stages": [stage.to_dict() for stage in self.stats.values()]
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print per-stage throughput as a table"""
+    print(f"\n📊 Ingested {report['fundings']} fundings, {report['chunks']} new chunks in {report['elapsed_seconds']}s")
+    print(
+        f"   {report['documents_unchanged']} documents unchanged, {report['documents_shared']} shared, "
+        f"{report['documents_removed']} removed; {report['chunks_reused']} chunks reused, "
+        f"{report['chunks_removed']} removed, {report['links_removed']} links removed"
+    )
+    print(f"   {report['embeddings_cached']} embeddings from cache, {report['bedrock_calls']} Bedrock calls ({report['embedding_input_tokens']} input tokens)")
+    print(f"   {report['ocr_pages_cached']} OCR pages from cache")
+    print(f"   {'stage':<10} {'items':>8} {'unit':<10} {'wall s':>9} {'busy s':>9} {'per s':>9}")
+    for stage in report["stages"]:
+        print(
+            f"   {stage['stage']:<10} {stage['items']:>8} {stage['unit']:<10} "
+            f"{stage['wall_seconds']:>9} {stage['busy_seconds']:>9} {stage['per_second']:>9}"
+        )
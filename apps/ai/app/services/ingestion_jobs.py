@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import os
+import socket
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, BinaryIO, Optional, Tuple
+from fastapi import UploadFile
+from sqlalchemy import and_, func, or_, DateTime
+from sqlalchemy.orm import Session
+from ..models.models import IngestionJob
+from .ingestion import IngestionPipeline
+from .s3_service import S3Service
+
+SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", tempfile.gettempdir())
+SPOOL_BLOCK = 1024 * 1024
+VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("INGESTION_VISIBILITY_TIMEOUT", "300"))
+RETRY_BACKOFF_SECONDS = 30
+
+
+def _spool(source: BinaryIO, suffix: str) -> Tuple[str, str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=SPOOL_DIR, suffix=suffix, delete=False) as spool:
+        for block in iter(lambda: source.read(SPOOL_BLOCK), b''):
+            digest.update(block)
+            spool.write(block)
+            size += len(block)
+    return spool.name, digest.hexdigest(), size
+
+
+async def spool_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Copy an upload to a file on disk in 1 MB blocks, hashing it on the way.
+    The file outlives the request (Starlette closes UploadFiles when it ends)
+    and lets S3 read multipart parts in parallel straight from disk.
+    """
+    await file.seek(0)
+    path, content_hash, size = await asyncio.to_thread(_spool, file.file, Path(file.filename or "").suffix)
+    return {
+        "path": path,
+        "content_hash": content_hash,
+        "size": size
+    }
+
+
+def _db_now():
+    """UTC from the database clock; leases are compared across nodes, so never the local clock"""
+    return func.timezone('utc', func.now(), type_=DateTime)
+
+
+class IngestionJobService:
+    """
+    Postgres-backed job queue. Any number of workers on any number of nodes claim
+    jobs with SELECT ... FOR UPDATE SKIP LOCKED, so they never block on or double
+    up a row. A claim is a lease: the worker extends it while running, and a job
+    whose lease expires (worker died) is claimed again. Failures retry with
+    exponential backoff until max_attempts.
+    """
+
+    def __init__(self, db: Session, worker_id: Optional[str] = None, visibility_seconds: int = VISIBILITY_TIMEOUT_SECONDS):
+        self.db = db
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_seconds = visibility_seconds
+
+    def enqueue(
+        self,
+        funding_id: int,
+        s3_key: Optional[str] = None,
+        source_path: Optional[str] = None,
+        filename: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        size: Optional[int] = None,
+        max_attempts: int = 3,
+        status: str = "queued"
+    ) -> IngestionJob:
+        """
+        Queue a document in S3 (s3_key) or in the catalog (source_path); an identical
+        pending job is reused. status="uploading" holds an upload job back from workers
+        until mark_uploaded() confirms its object is in S3.
+        """
+        existing = self.db.query(IngestionJob).filter(
+            IngestionJob.funding_id == funding_id,
+            IngestionJob.s3_key.is_(None) if s3_key is None else IngestionJob.s3_key == s3_key,
+            IngestionJob.source_path.is_(None) if source_path is None else IngestionJob.source_path == source_path,
+            IngestionJob.content_hash == content_hash,
+            IngestionJob.status.in_(["uploading", "queued", "running"])
+        ).first()
+        if existing:
+            return existing
+
+        now = datetime.utcnow()
+        job = IngestionJob(
+            funding_id=funding_id,
+            s3_key=s3_key,
+            source_path=source_path,
+            filename=filename,
+            content_hash=content_hash,
+            size_bytes=size,
+            status=status,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=now,
+            chunks_created=0,
+            created_at=now,
+            updated_at=now
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def mark_uploaded(self, job_id: int, size: Optional[int] = None) -> bool:
+        """Make an uploading job claimable now that its object is in S3; False if it was not uploading"""
+        values = {"status": "queued", "run_after": _db_now(), "updated_at": datetime.utcnow()}
+        if size is not None:
+            values["size_bytes"] = size
+        updated = self.db.query(IngestionJob).filter(
+            IngestionJob.id == job_id,
+            IngestionJob.status == "uploading"
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
+
+    def fail_upload(self, job_id: int, error: str) -> bool:
+        """The document never reached S3, so there is nothing for a retry to read"""
+        updated = self.db.query(IngestionJob).filter(
+            IngestionJob.id == job_id,
+            IngestionJob.status == "uploading"
+        ).update({"status": "failed", "error": error, "updated_at": datetime.utcnow()}, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
+
+    def get_job(self, job_id: int) -> Optional[IngestionJob]:
+        return self.db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+    def claim(self, job_id: Optional[int] = None, uploads_only: bool = False) -> Optional[IngestionJob]:
+        """Lease the next runnable job (or a specific one); None when nothing is claimable"""
+        while True:
+            query = self.db.query(IngestionJob).filter(
+                or_(
+                    and_(IngestionJob.status == "queued", IngestionJob.run_after <= _db_now()),
+                    and_(IngestionJob.status == "running", IngestionJob.locked_until < _db_now())
+                )
+            )
+            if job_id is not None:
+                query = query.filter(IngestionJob.id == job_id)
+            if uploads_only:
+                # Workers without the catalog on disk leave catalog jobs to those with it
+                query = query.filter(IngestionJob.s3_key.isnot(None))
+
+            job = query.order_by(IngestionJob.run_after, IngestionJob.id).with_for_update(skip_locked=True).first()
+            if job is None:
+                self.db.commit()
+                return None
+
+            # The previous holder died on the final attempt
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                job.status = "failed"
+                job.error = f"Lease expired on attempt {job.attempts} of {job.max_attempts}"
+                job.locked_by = None
+                job.locked_until = None
+                job.updated_at = datetime.utcnow()
+                self.db.commit()
+                continue
+
+            job.status = "running"
+            job.attempts += 1
+            job.locked_by = self.worker_id
+            job.locked_until = _db_now() + timedelta(seconds=self.visibility_seconds)
+            job.updated_at = datetime.utcnow()
+            self.db.commit()
+            return job
+
+    def extend_lease(self, job_id: int) -> bool:
+        """Push locked_until forward; False if another worker has taken the job over"""
+        updated = self.db.query(IngestionJob).filter(
+            IngestionJob.id == job_id,
+            IngestionJob.locked_by == self.worker_id,
+            IngestionJob.status == "running"
+        ).update(
+            {"locked_until": _db_now() + timedelta(seconds=self.visibility_seconds)},
+            synchronize_session=False
+        )
+        self.db.commit()
+        return updated == 1
+
+    def _finish(self, job: IngestionJob, values: Dict[str, Any]) -> bool:
+        """Release the lease with a final update, only while this worker still holds it"""
+        values.update({"locked_by": None, "locked_until": None, "updated_at": datetime.utcnow()})
+        updated = self.db.query(IngestionJob).filter(
+            IngestionJob.id == job.id,
+            IngestionJob.locked_by == self.worker_id
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+
+        if not updated:
+            print(f"⚠️ Ingestion job {job.id}: lease lost to another worker, result discarded")
+        return updated == 1
+
+    def complete(self, job: IngestionJob, chunks_created: int) -> bool:
+        return self._finish(job, {"status": "succeeded", "chunks_created": chunks_created, "error": None})
+
+    def fail(self, job: IngestionJob, error: str) -> bool:
+        """Requeue with exponential backoff, or give up after max_attempts"""
+        if job.attempts >= job.max_attempts:
+            return self._finish(job, {"status": "failed", "error": error})
+
+        delay = RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        return self._finish(job, {
+            "status": "queued",
+            "error": error,
+            "run_after": _db_now() + timedelta(seconds=delay)
+        })
+
+    async def _heartbeat(self, job_id: int):
+        """Extend the lease at a third of the visibility timeout, on a session of its own"""
+        heartbeat = IngestionJobService(Session(bind=self.db.get_bind()), self.worker_id, self.visibility_seconds)
+        try:
+            while True:
+                await asyncio.sleep(self.visibility_seconds / 3)
+                if not heartbeat.extend_lease(job_id):
+                    return
+        finally:
+            heartbeat.db.close()
+
+    async def run_job(self, job: IngestionJob, data_dir: str = "data", local_path: Optional[str] = None) -> bool:
+        """
+        Ingest a claimed job. Catalog jobs read from data_dir; upload jobs use the
+        spooled copy when this process still has it, otherwise download from S3.
+        Returns True on success.
+        """
+        heartbeat = asyncio.ensure_future(self._heartbeat(job.id))
+        temporary = None
+
+        try:
+            if job.source_path:
+                path = str(Path(data_dir) / job.source_path)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"{job.source_path} not found under {data_dir}")
+            elif local_path and os.path.exists(local_path):
+                path = temporary = local_path
+            else:
+                fd, temporary = tempfile.mkstemp(dir=SPOOL_DIR, suffix=Path(job.s3_key).suffix)
+                os.close(fd)
+                path = await asyncio.to_thread(S3Service().download_path, job.s3_key, temporary)
+
+            pipeline = IngestionPipeline(self.db, data_dir=data_dir)
+            chunks_created = await pipeline.ingest_file(job.funding_id, job.s3_key or job.source_path, path)
+            self.complete(job, chunks_created)
+            print(f"✅ Ingestion job {job.id}: {job.s3_key or job.source_path} ({chunks_created} new chunks)")
+            return True
+
+        except Exception as e:
+            self.db.rollback()
+            self.fail(job, str(e))
+            print(f"❌ Ingestion job {job.id} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+            return False
+
+        finally:
+            heartbeat.cancel()
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
+
+    async def work(
+        self,
+        data_dir: str = "data",
+        drain: bool = False,
+        max_jobs: Optional[int] = None,
+        poll_interval: float = 5.0,
+        uploads_only: bool = False,
+        stop_claiming_at: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Claim and run jobs until the queue is empty (drain) or forever; returns counts.
+        stop_claiming_at (time.monotonic()) bounds a worker with a hard time limit.
+        """
+        counts = {"succeeded": 0, "failed": 0}
+
+        while max_jobs is None or sum(counts.values()) < max_jobs:
+            if stop_claiming_at is not None and time.monotonic() >= stop_claiming_at:
+                break
+            job = self.claim(uploads_only=uploads_only)
+            if job is None:
+                if drain:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            print(f"🛠️ {self.worker_id} claimed job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+            succeeded = await self.run_job(job, data_dir=data_dir)
+            counts["succeeded" if succeeded else "failed"] += 1
+
+        return counts
@@ -0,0 +1,321 @@
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from ..models.models import Company, Funding, CompanyGrantMatch, MatchRefreshState
+from .active_grants import ActiveGrantService
+from .eligibility import SECTOR_TAGS, sector_tags
+from .embeddings import EmbeddingService
+
+TOP_N = int(os.getenv("MATCH_TOP_N", "20"))
+BLOCK_SIZE = int(os.getenv("MATCH_BLOCK_SIZE", "2048"))
+STATE_NAME = "company_grant_matches"
+
+# One bit per sector tag, so sector overlap is a single bitwise AND per pair
+SECTOR_BITS = {tag: 1 << i for i, tag in enumerate(SECTOR_TAGS)}
+
+
+def sector_mask(tags: Optional[List[str]]) -> int:
+    """Bitmask of sector tags; 0 means unrestricted (grant) or unknown (company)"""
+    mask = 0
+    for tag in tags or []:
+        mask |= SECTOR_BITS.get(tag, 0)
+    return mask
+
+
+def company_profile(company) -> str:
+    """
+    Text embedded for a company. Size and revenue are left out: they are hard
+    eligibility checks, not similarity, and leaving them out lets companies in
+    the same sector and location share one cached embedding.
+    """
+    profile = f"{company.sector or 'General'} company"
+    if company.location:
+        profile += f" based in {company.location}"
+    return profile
+
+
+def grant_profile(funding) -> str:
+    """Text embedded for a grant"""
+    return "\n".join(part for part in (funding.title, funding.sector, funding.description, funding.eligibility) if part)
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class GrantMatrix:
+    """Active grants as column arrays: unit vectors plus the structured eligibility columns"""
+
+    def __init__(self, ids, vectors, max_employees, max_revenue, sector_bits, updated_at):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = np.asarray(vectors, dtype=np.float32).reshape(len(self.ids), -1)
+        self.max_employees = np.asarray(max_employees, dtype=np.float64)  # NaN = no cap
+        self.max_revenue = np.asarray(max_revenue, dtype=np.float64)
+        self.sector_bits = np.asarray(sector_bits, dtype=np.int64)
+        self.updated_at = list(updated_at)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def subset(self, indices) -> "GrantMatrix":
+        return GrantMatrix(
+            self.ids[indices],
+            self.vectors[indices],
+            self.max_employees[indices],
+            self.max_revenue[indices],
+            self.sector_bits[indices],
+            [self.updated_at[i] for i in indices]
+        )
+
+
+def eligibility_mask(employees: np.ndarray, revenue: np.ndarray, sector_bits: np.ndarray, grants: GrantMatrix) -> np.ndarray:
+    """
+    companies × grants boolean matrix with GrantFilterService.eligibility_predicate's
+    semantics: a check only fails when both the grant's cap and the company's value are known.
+    """
+    employees = employees[:, None]
+    revenue = revenue[:, None]
+    sector_bits = sector_bits[:, None]
+
+    mask = np.isnan(employees) | np.isnan(grants.max_employees) | (employees <= grants.max_employees)
+    mask &= np.isnan(revenue) | np.isnan(grants.max_revenue) | (revenue <= grants.max_revenue)
+    mask &= (sector_bits == 0) | (grants.sector_bits == 0) | ((sector_bits & grants.sector_bits) != 0)
+    return mask
+
+
+def top_matches(scores: np.ndarray, mask: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best `top_n` eligible columns per row, best first: (column indices, scores).
+    Slots beyond a row's eligible grants hold -inf.
+    """
+    k = min(top_n, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=scores.dtype)
+
+    scores = np.where(mask, scores, -np.inf)
+    # argpartition is O(grants) per row; only the k survivors are sorted
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class GrantMatcher:
+    """
+    Scores companies against every active grant in blocks of `block_size`
+    companies: one matrix product for similarity, one boolean matrix for
+    eligibility, argpartition for the top N. Results replace the block's rows
+    in company_grant_matches. `refresh` only rescores what changed since the
+    last run, tracked by updated_at watermarks in match_refresh_state.
+    """
+
+    def __init__(self, db: Session, top_n: int = TOP_N, block_size: int = BLOCK_SIZE, concurrency: int = 8):
+        self.db = db
+        self.top_n = top_n
+        self.block_size = block_size
+        self.concurrency = concurrency
+        self.embedding_service = EmbeddingService(db)
+        self.counters = {
+            "companies_scored": 0,
+            "companies_merged": 0,
+            "grants_changed": 0,
+            "matches_written": 0,
+        }
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed profile texts; repeats and previously seen texts come from the embedding cache"""
+        if not texts:
+            return np.empty((0, self.embedding_service.dimensions), dtype=np.float32)
+        vectors = await self.embedding_service.generate_embeddings(texts, concurrency=self.concurrency)
+        self.db.commit()  # Keep the cache entries even if a later block fails
+        return normalise(np.asarray(vectors, dtype=np.float32))
+
+    async def load_grants(self) -> GrantMatrix:
+        fundings = self.db.query(Funding).filter(Funding.is_active).order_by(Funding.id).all()
+        vectors = await self.embed([grant_profile(funding) for funding in fundings])
+        return GrantMatrix(
+            [funding.id for funding in fundings],
+            vectors,
+            [np.nan if funding.max_employees is None else funding.max_employees for funding in fundings],
+            [np.nan if funding.max_revenue is None else funding.max_revenue for funding in fundings],
+            [sector_mask(funding.sectors) for funding in fundings],
+            [funding.updated_at for funding in fundings]
+        )
+
+    def company_blocks(self, company_ids: Optional[List[int]] = None) -> Iterator[List[Any]]:
+        """
+        All companies (keyset-paginated by id) or the given ids, `block_size` at a time.
+        Plain rows, not ORM objects, so 100k companies never pile up in the identity map.
+        """
+        columns = (Company.id, Company.sector, Company.location, Company.employees, Company.revenue)
+        if company_ids is not None:
+            for i in range(0, len(company_ids), self.block_size):
+                yield self.db.query(*columns).filter(Company.id.in_(company_ids[i:i + self.block_size])).all()
+            return
+
+        last_id = None
+        while True:
+            query = self.db.query(*columns).order_by(Company.id)
+            if last_id is not None:
+                query = query.filter(Company.id > last_id)
+            block = query.limit(self.block_size).all()
+            if not block:
+                return
+            yield block
+            last_id = block[-1].id
+
+    async def score_block(
+        self,
+        companies: List[Any],
+        grants: GrantMatrix,
+        top_n: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-N (grant column indices, scores) for each company in the block"""
+        vectors = await self.embed([company_profile(company) for company in companies])
+        mask = eligibility_mask(
+            np.array([np.nan if c.employees is None else c.employees for c in companies], dtype=np.float64),
+            np.array([np.nan if c.revenue is None else c.revenue for c in companies], dtype=np.float64),
+            np.array([sector_mask(sector_tags(c.sector)) for c in companies], dtype=np.int64),
+            grants
+        )
+        return top_matches(vectors @ grants.vectors.T, mask, top_n or self.top_n)
+
+    def write_matches(self, matches: Dict[str, List[Tuple[int, float]]]):
+        """Replace the stored matches of each company with its (funding_id, score) list, best first"""
+        if not matches:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {"company_id": company_id, "funding_id": funding_id, "score": score, "rank": rank, "computed_at": now}
+            for company_id, ranked in matches.items()
+            for rank, (funding_id, score) in enumerate(ranked, start=1)
+        ]
+        self.db.execute(delete(CompanyGrantMatch).where(CompanyGrantMatch.company_id.in_(list(matches))))
+        if rows:
+            self.db.execute(CompanyGrantMatch.__table__.insert(), rows)
+        self.db.commit()
+        self.counters["matches_written"] += len(rows)
+
+    async def rescore(self, grants: GrantMatrix, company_ids: Optional[List[int]] = None):
+        """Full top-N for the given companies (default: all of them) against all active grants"""
+        for companies in self.company_blocks(company_ids):
+            columns, scores = await self.score_block(companies, grants)
+            self.write_matches({
+                company.id: [
+                    (int(grants.ids[column]), float(score))
+                    for column, score in zip(columns[row], scores[row]) if np.isfinite(score)
+                ]
+                for row, company in enumerate(companies)
+            })
+            self.counters["companies_scored"] += len(companies)
+
+    async def merge_changed_grants(self, grants: GrantMatrix, changed: List[int], skip: Set[str]) -> Set[str]:
+        """
+        Score every company against only the changed grants and merge into its stored
+        top N. A company whose stored list held a changed grant that now scores lower
+        (or is no longer eligible) may have lost a place to a grant that was never
+        stored, so it is returned for a full rescore instead of being merged.
+        """
+        changed_grants = grants.subset(changed)
+        changed_ids = set(int(funding_id) for funding_id in changed_grants.ids)
+        needs_rescore = set()
+
+        for companies in self.company_blocks():
+            companies = [company for company in companies if company.id not in skip]
+            if not companies:
+                continue
+
+            # All changed grants are kept as candidates, not just the top N of them
+            columns, scores = await self.score_block(companies, changed_grants, top_n=len(changed_grants))
+            stored: Dict[str, Dict[int, float]] = {}
+            for company_id, funding_id, score in self.db.query(
+                CompanyGrantMatch.company_id, CompanyGrantMatch.funding_id, CompanyGrantMatch.score
+            ).filter(CompanyGrantMatch.company_id.in_([company.id for company in companies])):
+                stored.setdefault(company_id, {})[funding_id] = score
+
+            merged = {}
+            for row, company in enumerate(companies):
+                fresh = {
+                    int(changed_grants.ids[column]): float(score)
+                    for column, score in zip(columns[row], scores[row]) if np.isfinite(score)
+                }
+                current = stored.get(company.id, {})
+                if any(fresh.get(funding_id, -np.inf) < score for funding_id, score in current.items() if funding_id in changed_ids):
+                    needs_rescore.add(company.id)
+                    continue
+
+                candidates = {funding_id: score for funding_id, score in current.items() if funding_id not in changed_ids}
+                candidates.update(fresh)
+                ranked = sorted(candidates.items(), key=lambda item: -item[1])[:self.top_n]
+                if ranked != sorted(current.items(), key=lambda item: -item[1]):
+                    merged[company.id] = ranked
+
+            self.write_matches(merged)
+            self.counters["companies_merged"] += len(companies)
+
+        return needs_rescore
+
+    async def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """Bring company_grant_matches up to date; a first run (or full=True) scores everything"""
+        started = time.time()
+        state = self.db.get(MatchRefreshState, STATE_NAME)
+        full = full or state is None
+
+        # Read before scoring: rows changed while the job runs are picked up next time
+        companies_watermark = self.db.scalar(select(func.max(Company.updated_at)))
+        fundings_watermark = self.db.scalar(select(func.max(Funding.updated_at)))
+
+        # Score against current flags, even if the scheduled refresh has not run yet
+        ActiveGrantService(self.db).refresh()
+        self.db.commit()
+        grants = await self.load_grants()
+        print(f"📋 {len(grants)} active grants")
+
+        if full:
+            await self.rescore(grants)
+        else:
+            # Expired or deleted grants leave a gap only a full rescore can fill
+            expired = self.db.execute(
+                delete(CompanyGrantMatch).where(
+                    CompanyGrantMatch.funding_id.not_in(select(Funding.id).where(Funding.is_active))
+                ).returning(CompanyGrantMatch.company_id)
+            ).scalars().all()
+            self.db.commit()
+
+            changed_query = select(Company.id)
+            if state.companies_watermark is not None:
+                changed_query = changed_query.where(Company.updated_at > state.companies_watermark)
+            changed_companies = self.db.scalars(changed_query).all()
+            rescore_ids = set(expired) | set(changed_companies)
+
+            changed = [
+                i for i, updated_at in enumerate(grants.updated_at)
+                if state.fundings_watermark is None or updated_at > state.fundings_watermark
+            ]
+            self.counters["grants_changed"] = len(changed)
+            if changed:
+                rescore_ids |= await self.merge_changed_grants(grants, changed, skip=rescore_ids)
+
+            await self.rescore(grants, sorted(rescore_ids))
+
+        if state is None:
+            state = MatchRefreshState(name=STATE_NAME)
+            self.db.add(state)
+        state.companies_watermark = companies_watermark
+        state.fundings_watermark = fundings_watermark
+        state.refreshed_at = datetime.utcnow()
+        self.db.commit()
+
+        return {
+            "mode": "full" if full else "incremental",
+            "grants": len(grants),
+            **self.counters,
+            "bedrock_calls": self.embedding_service.bedrock_calls,
+            "seconds": round(time.time() - started, 2),
+        }
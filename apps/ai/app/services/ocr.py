@@ -0,0 +1,65 @@
+import hashlib
+import io
+import os
+from typing import Iterator, Optional
+import PyPDF2
+from PIL import Image
+
+try:
+    import pytesseract
+except ImportError:  # Optional: without it scanned pages stay empty
+    pytesseract = None
+
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_ENGINE = f"tesseract-{OCR_LANG}"
+MIN_TEXT_CHARS = 20  # Less than this on a page with images means there is no real text layer
+
+
+def _image_xobjects(page) -> Iterator[PyPDF2.generic.StreamObject]:
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if not xobjects:
+        return
+    for ref in xobjects.get_object().values():
+        obj = ref.get_object()
+        if obj.get("/Subtype") == "/Image":
+            yield obj
+
+
+def is_scanned(page, text: str) -> bool:
+    """A page whose text layer is (nearly) empty but which carries images"""
+    return len(text.strip()) < MIN_TEXT_CHARS and any(True for _ in _image_xobjects(page))
+
+
+def page_content_hash(page) -> Optional[str]:
+    """
+    SHA-256 over the page's encoded image streams: identical scans hash equal across
+    files. None when an image stream has no bytes to hash; such pages are not cached.
+    """
+    digest = hashlib.sha256()
+    for image in _image_xobjects(page):
+        data = image._data
+        if not data:
+            return None
+        digest.update(data if isinstance(data, bytes) else data.encode("latin-1"))
+    return digest.hexdigest()
+
+
+def ocr_page(path: str, page_no: int) -> str:
+    """Rasterised text of one page via Tesseract. Runs inside a worker process."""
+    if pytesseract is None:
+        raise RuntimeError("pytesseract is not installed")
+
+    try:
+        # Scanned pages are their embedded images; OCR each one at native resolution
+        page = PyPDF2.PdfReader(path).pages[page_no - 1]
+        texts = []
+        for image_file in page.images:
+            with Image.open(io.BytesIO(image_file.data)) as image:
+                text = pytesseract.image_to_string(image, lang=OCR_LANG).strip()
+            if text:
+                texts.append(text)
+        return "\n".join(texts)
+    except Exception as e:
+        # pytesseract's exceptions don't unpickle, which would break the whole process pool
+        raise RuntimeError(f"OCR failed on page {page_no}: {e}") from None
@@ -1,28 +1,46 @@
 import boto3
-from fastapi import UploadFile
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from typing import Optional
 import os
 
+MB = 1024 * 1024
+
 class S3Service:
     def __init__(self):
         self.s3_client = boto3.client('s3')
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'myfundfinder-documents')
+        # Files above the threshold go up (and down) as concurrent multipart transfers
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * MB,
+            multipart_chunksize=8 * MB,
+            max_concurrency=int(os.getenv('S3_TRANSFER_CONCURRENCY', '8')),
+            use_threads=True
+        )
     
-    async def upload_file(self, file: UploadFile, s3_key: str) -> str:
-        """Upload file to S3 and return the key"""
+    def upload_path(self, path: str, s3_key: str, content_type: str = None) -> str:
+        """Upload a file on disk; parts are read straight from the file in parallel"""
         try:
-            content = await file.read()
-            
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=content,
-                ContentType=file.content_type
+            self.s3_client.upload_file(
+                path,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': content_type or 'application/octet-stream'},
+                Config=self.transfer_config
             )
             
             return s3_key
         except Exception as e:
             raise Exception(f"Failed to upload file to S3: {str(e)}")
     
+    def download_path(self, s3_key: str, path: str) -> str:
+        """Download an object to a file on disk"""
+        try:
+            self.s3_client.download_file(self.bucket_name, s3_key, path, Config=self.transfer_config)
+            return path
+        except Exception as e:
+            raise Exception(f"Failed to download file from S3: {str(e)}")
+    
     def get_file_url(self, s3_key: str) -> str:
         """Generate presigned URL for file access"""
         try:
@@ -34,3 +52,27 @@ class S3Service:
             return url
         except Exception as e:
             raise Exception(f"Failed to generate presigned URL: {str(e)}")
+    
+    def get_upload_url(self, s3_key: str, content_type: str = None, expires_in: int = 900) -> str:
+        """Presigned PUT URL, so a client sends the file straight to S3 instead of through the API"""
+        try:
+            return self.s3_client.generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': self.bucket_name,
+                    'Key': s3_key,
+                    'ContentType': content_type or 'application/octet-stream'
+                },
+                ExpiresIn=expires_in
+            )
+        except Exception as e:
+            raise Exception(f"Failed to generate presigned upload URL: {str(e)}")
+    
+    def get_size(self, s3_key: str) -> Optional[int]:
+        """Size of an object in bytes, or None if it does not exist"""
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)['ContentLength']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise Exception(f"Failed to read S3 object metadata: {str(e)}")
@@ -0,0 +1,67 @@
+import math
+import os
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the regex approximation
+    tiktoken = None
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+class Tokenizer:
+    """
+    Counts tokens with a BPE encoding (tiktoken) when it is installed and its
+    vocabulary is available locally; otherwise approximates BPE by splitting
+    words into ~4-character pieces and counting punctuation separately.
+    """
+
+    def __init__(self, encoding_name: str = None):
+        self.encoding_name = encoding_name or os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+        self.encoding = None
+
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                print(f"⚠️ tiktoken encoding '{self.encoding_name}' unavailable, approximating tokens ({e.__class__.__name__})")
+
+    @property
+    def is_exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+
+        return sum(self._approximate(piece) for piece in _WORD_PATTERN.findall(text))
+
+    def truncate(self, text: str, max_tokens: int, marker: str = " …") -> str:
+        """Leading part of text that fits in max_tokens (marker included), cut on a token boundary"""
+        if self.count(text) <= max_tokens:
+            return text
+
+        budget = max(max_tokens - self.count(marker), 0)
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:budget]) + marker
+
+        end = 0
+        for match in _WORD_PATTERN.finditer(text):
+            budget -= self._approximate(match.group())
+            if budget < 0:
+                break
+            end = match.end()
+        return text[:end] + marker
+
+    @staticmethod
+    def _approximate(piece: str) -> int:
+        return math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str = None) -> Tokenizer:
+    """Shared tokenizer instance per encoding"""
+    return Tokenizer(encoding_name)
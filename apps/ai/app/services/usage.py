@@ -0,0 +1,92 @@
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+from ..models.models import BedrockUsage
+from ..utils.metrics import BEDROCK_ERRORS, BEDROCK_LATENCY, BEDROCK_TOKENS
+
+
+class UsageLog:
+    """
+    Buffers one row per Bedrock call (tokens as reported by Bedrock, wall-clock
+    latency). Calls may come from worker threads; `flush` writes the buffered
+    rows into the caller's transaction with one multi-row insert.
+    """
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        model_id: str,
+        operation: str,
+        latency_ms: float,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        row = {
+            "model_id": model_id,
+            "operation": operation,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": round(latency_ms, 1),
+            "error": error[:500] if error else None,
+            "created_at": datetime.utcnow()
+        }
+        BEDROCK_LATENCY.observe(latency_ms / 1000, model=model_id, operation=operation)
+        if error:
+            BEDROCK_ERRORS.inc(model=model_id, operation=operation)
+        if input_tokens:
+            BEDROCK_TOKENS.inc(input_tokens, model=model_id, operation=operation, direction="input")
+        if output_tokens:
+            BEDROCK_TOKENS.inc(output_tokens, model=model_id, operation=operation, direction="output")
+
+        with self._lock:
+            self.rows.append(row)
+            self.calls += 1
+            self.input_tokens += input_tokens or 0
+            self.output_tokens += output_tokens or 0
+        return row
+
+    def flush(self, db: Session, session_id: Optional[str] = None, message_id: Optional[int] = None) -> int:
+        """Add buffered rows to the session (nothing commits here); returns the row count"""
+        with self._lock:
+            rows, self.rows = self.rows, []
+        if not rows:
+            return 0
+
+        for row in rows:
+            row.setdefault("session_id", session_id)
+            row.setdefault("message_id", message_id)
+        db.execute(BedrockUsage.__table__.insert(), rows)
+        return len(rows)
+
+
+def usage_by_day(db: Session, since: datetime) -> List[Dict[str, Any]]:
+    """Per day, model and operation: calls, errors, tokens and latency (avg, p95) since `since`"""
+    # A cast rather than date_trunc(%s, ...): GROUP BY must repeat the exact expression, bind parameters included
+    day = cast(BedrockUsage.created_at, Date).label("day")
+    rows = db.execute(
+        select(
+            day,
+            BedrockUsage.model_id,
+            BedrockUsage.operation,
+            func.count().label("calls"),
+            func.count(BedrockUsage.error).label("errors"),
+            func.coalesce(func.sum(BedrockUsage.input_tokens), 0).label("input_tokens"),
+            func.coalesce(func.sum(BedrockUsage.output_tokens), 0).label("output_tokens"),
+            func.avg(BedrockUsage.latency_ms).label("avg_latency_ms"),
+            func.percentile_cont(0.95).within_group(BedrockUsage.latency_ms).label("p95_latency_ms")
+        ).where(
+            BedrockUsage.created_at >= since
+        ).group_by(
+            day, BedrockUsage.model_id, BedrockUsage.operation
+        ).order_by(day.desc(), BedrockUsage.model_id, BedrockUsage.operation)
+    ).all()
+    return [dict(row._mapping) for row in rows]
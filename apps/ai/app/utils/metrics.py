@@ -0,0 +1,308 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+# Seconds; spans a cached lookup (ms) to a slow Nova turn (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+EMF_NAMESPACE = os.getenv("METRICS_NAMESPACE", "MyFundFinder/AI")
+# CloudWatch embedded metric format on stdout; on by default inside Lambda, where /metrics is never scraped
+EMF_ENABLED = os.getenv("METRICS_EMF", "true" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "false").lower() == "true"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], le: Optional[str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """A metric family with fixed label names; updates are safe from worker threads"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in items]
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Set directly, or read at scrape time from `function` (returning {label values: value})"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), function: Optional[Callable[[], Dict]] = None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        if self.function is None:
+            return super().samples()
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in self.function().items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.values.get(key)
+            if series is None:
+                # Per-bucket counts (not cumulative), then sum and count
+                series = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self.values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, str(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, key, '+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+))
+BEDROCK_LATENCY = REGISTRY.register(Histogram(
+    "bedrock_request_duration_seconds", "Bedrock invoke_model latency", ("model", "operation")
+))
+BEDROCK_ERRORS = REGISTRY.register(Counter(
+    "bedrock_errors_total", "Failed Bedrock calls", ("model", "operation")
+))
+BEDROCK_TOKENS = REGISTRY.register(Counter(
+    "bedrock_tokens_total", "Tokens reported by Bedrock", ("model", "operation", "direction")
+))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Duration of single SQL statements", buckets=QUERY_BUCKETS
+))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ("route",), buckets=COUNT_BUCKETS
+))
+DB_TIME_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("route",)
+))
+BEDROCK_RETRIES = REGISTRY.register(Counter(
+    "bedrock_retries_total", "Throttled Bedrock calls retried by the limiter", ("model",)
+))
+BEDROCK_CONCURRENCY = REGISTRY.register(Gauge(
+    "bedrock_concurrency_limit", "Adaptive (AIMD) limit on concurrent Bedrock calls", ("model",)
+))
+BEDROCK_LIMITER_WAIT = REGISTRY.register(Histogram(
+    "bedrock_limiter_wait_seconds", "Time Bedrock calls waited for a concurrency slot and quota", ("model",)
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+))
+SINGLE_FLIGHT = REGISTRY.register(Counter(
+    "singleflight_calls_total", "Coalescable calls by flight and result (leader or shared)", ("flight", "result")
+))
+
+
+def record_cache(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_LOOKUPS.inc(hits, cache=cache, result="hit")
+    if misses:
+        CACHE_LOOKUPS.inc(misses, cache=cache, result="miss")
+
+
+class RequestStats:
+    """SQL work done for one request; shared by reference with its threadpool work"""
+
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine):
+    """Time every statement on `engine` and expose its pool occupancy"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # Failed statements never reach after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    pool = engine.pool
+
+    def pool_state() -> Dict[Tuple[str, ...], float]:
+        # QueuePool: size() persistent connections, up to max_overflow more on demand
+        if not hasattr(pool, "checkedout"):
+            return {}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        return {
+            ("size",): pool.size(),
+            ("checked_out",): checked_out,
+            ("overflow",): max(pool.overflow(), 0),
+            ("saturation",): round(checked_out / capacity, 3) if capacity else 0
+        }
+
+    REGISTRY.register(Gauge("db_pool", "Connection pool occupancy; saturation = checked out / (size + max overflow)", ("state",), function=pool_state))
+
+
+def _route_template(scope) -> str:
+    """Route path with placeholders (/chat/sessions/{session_id}/messages), keeping label cardinality bounded"""
+    app = scope.get("app")
+    endpoint = scope.get("endpoint")
+    if app is not None and endpoint is not None:
+        for route in app.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                return route.path
+    return "unmatched"
+
+
+def emit_emf(route: str, method: str, status: int, seconds: float, stats: RequestStats):
+    """One CloudWatch EMF record per request; CloudWatch turns it into metrics, no agent or API calls"""
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": EMF_NAMESPACE,
+                "Dimensions": [["Route"]],
+                "Metrics": [
+                    {"Name": "Latency", "Unit": "Milliseconds"},
+                    {"Name": "DbQueries", "Unit": "Count"},
+                    {"Name": "DbTime", "Unit": "Milliseconds"},
+                    {"Name": "Errors", "Unit": "Count"}
+                ]
+            }]
+        },
+        "Route": f"{method} {route}",
+        "Status": status,
+        "Latency": round(seconds * 1000, 1),
+        "DbQueries": stats.queries,
+        "DbTime": round(stats.query_seconds * 1000, 1),
+        "Errors": 1 if status >= 500 else 0
+    }
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request latency and per-request SQL work, by route template"""
+
+    def __init__(self, app, emf: bool = EMF_ENABLED):
+        self.app = app
+        self.emf = emf
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        finished = None
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            # Latency as the client sees it; background tasks run after the body is sent
+            elapsed = (finished or time.perf_counter()) - started
+            # The router fills in scope["endpoint"] in place, so the matched route is known here
+            route = _route_template(scope)
+            HTTP_LATENCY.observe(elapsed, method=scope["method"], route=route, status=status)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route=route)
+            DB_TIME_PER_REQUEST.observe(stats.query_seconds, route=route)
+            if self.emf:
+                emit_emf(route, scope["method"], status, elapsed, stats)
@@ -0,0 +1,17 @@
+from typing import Any, Optional
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def newest_first_before(query: Query, model, cursor: Optional[Any]) -> Query:
+    """
+    Keyset page of `query`, newest first by (created_at, id), starting after
+    `cursor` (the row the previous page ended on). Served by an index on
+    (..., created_at, id): the cost is the page size, however deep the page.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(model.created_at, model.id) < (cursor.created_at, cursor.id))
+    return query.order_by(model.created_at.desc(), model.id.desc())
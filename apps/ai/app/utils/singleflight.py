@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+import weakref
+from typing import Any, Awaitable, Callable, Tuple
+
+from .metrics import SINGLE_FLIGHT
+
+
+def flight_key(*parts: str) -> str:
+    """SHA-256 over the parts with runs of whitespace collapsed, so trivially different inputs share a key"""
+    normalized = "\x1f".join(" ".join(part.split()) for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: while a call for a key is running,
+    later callers with the same key await its result (or exception) instead of
+    starting their own. Nothing is kept once the call finishes, so this is not
+    a cache. The call runs as its own task, so a caller that is cancelled (a
+    client disconnect) does not cancel it for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # Futures belong to one event loop; a process may run several (tests, benchmarks)
+        self._inflight = weakref.WeakKeyDictionary()  # loop -> {key: future}
+
+    def __len__(self) -> int:
+        return sum(len(calls) for calls in self._inflight.values())
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of call(), or of the identical call already in flight; the flag is True when shared"""
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        future = inflight.get(key)
+        shared = future is not None
+
+        if not shared:
+            future = asyncio.ensure_future(call())
+            inflight[key] = future
+
+            def done(_):
+                if inflight.get(key) is future:
+                    del inflight[key]
+            future.add_done_callback(done)
+
+        SINGLE_FLIGHT.inc(flight=self.name, result="shared" if shared else "leader")
+        return await asyncio.shield(future), shared
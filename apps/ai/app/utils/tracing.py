@@ -0,0 +1,199 @@
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional: only needed for TRACE_EXPORTER=otel
+    otel_trace = None
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed stage of a request; times are perf_counter seconds"""
+
+    __slots__ = ("name", "parent", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = attributes
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+
+class Trace:
+    """Spans of one request. Shared by reference with threadpool work and background tasks"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()  # Wall clock, for exporters
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.attributes: Dict[str, Any] = {}
+
+    def to_wall_ns(self, perf_seconds: float) -> int:
+        return int((self.started_at + perf_seconds - self.start) * 1e9)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: top-level spans summed by name, then the total"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.parent is None and span.end is not None:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 1),
+            **self.attributes,
+            "spans": [
+                {
+                    "name": span.name,
+                    "parent": span.parent.name if span.parent else None,
+                    "start_ms": round((span.start - self.start) * 1000, 1),
+                    "duration_ms": round(span.duration_ms, 1),
+                    **span.attributes
+                }
+                for span in self.spans
+            ]
+        }
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a child of the current span. Outside a traced request the
+    span is still yielded (so callers can set attributes) but goes nowhere.
+    """
+    trace = _current_trace.get()
+    current = Span(name, _current_span.get(), **attributes)
+    if trace is None:
+        yield current
+        current.end = time.perf_counter()
+        return
+
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set("error", e.__class__.__name__)
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class JsonExporter:
+    """One JSON line per request on stdout (a single CloudWatch event, not one per stage)"""
+
+    def export(self, trace: Trace):
+        sys.stdout.write(json.dumps(trace.to_dict(), default=str) + "\n")
+        sys.stdout.flush()
+
+
+class OpenTelemetryExporter:
+    """
+    Replays finished spans through the OpenTelemetry API with their original
+    timestamps. Provider and exporter (OTLP, X-Ray, ...) are configured by the
+    deployment, e.g. opentelemetry-instrument or OTEL_* environment variables.
+    """
+
+    def __init__(self):
+        self.tracer = otel_trace.get_tracer("myfundfinder.ai")
+
+    def export(self, trace: Trace):
+        root = self.tracer.start_span(trace.name, start_time=trace.to_wall_ns(trace.start), attributes=trace.attributes)
+        started = {}
+        # Spans are appended when they start, so a parent always precedes its children
+        for span in trace.spans:
+            parent = started.get(id(span.parent), root)
+            otel_span = self.tracer.start_span(
+                span.name,
+                context=otel_trace.set_span_in_context(parent),
+                start_time=trace.to_wall_ns(span.start),
+                attributes={key: value for key, value in span.attributes.items() if value is not None}
+            )
+            started[id(span)] = otel_span
+            otel_span.end(end_time=trace.to_wall_ns(span.end or time.perf_counter()))
+        root.end()
+
+
+class NullExporter:
+    def export(self, trace: Trace):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_exporter():
+    """Exporter from TRACE_EXPORTER: json (default), otel or none"""
+    name = os.getenv("TRACE_EXPORTER", "json").lower()
+    if name == "none":
+        return NullExporter()
+    if name == "otel":
+        if otel_trace is not None:
+            return OpenTelemetryExporter()
+        print("⚠️ TRACE_EXPORTER=otel but opentelemetry is not installed, using json")
+    return JsonExporter()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one Trace per HTTP request. Adds a Server-Timing header
+    built from the spans finished before the response starts, and exports the
+    trace once the app returns (after background tasks, which share it).
+    """
+
+    def __init__(self, app, exporter=None):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                trace.attributes["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            try:
+                (self.exporter or get_exporter()).export(trace)
+            except Exception as e:
+                print(f"⚠️ Trace export failed: {e}")
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from .db import SessionLocal
+from .services.active_grants import ActiveGrantService
+from .services.ingestion_jobs import IngestionJobService, VISIBILITY_TIMEOUT_SECONDS
+from .services.matching import GrantMatcher
+
+
+async def drain(seconds: float) -> dict:
+    db = SessionLocal()
+    try:
+        job_service = IngestionJobService(db)
+        # Lambda has no catalog on disk; catalog jobs stay queued for worker.py
+        return await job_service.work(
+            drain=True,
+            uploads_only=True,
+            stop_claiming_at=time.monotonic() + seconds
+        )
+    finally:
+        db.close()
+
+
+def handler(event, context):
+    """
+    Lambda handler for the scheduled ingestion worker: drain queued uploads while
+    a job started now can still finish inside both its lease and the invocation.
+    """
+    remaining = context.get_remaining_time_in_millis() / 1000 if context else VISIBILITY_TIMEOUT_SECONDS * 2
+    counts = asyncio.run(drain(remaining - VISIBILITY_TIMEOUT_SECONDS))
+    print(f"✅ Ingestion worker finished: {counts['succeeded']} succeeded, {counts['failed']} failed")
+    return counts
+
+
+def refresh_active_handler(event, context):
+    """Lambda handler for the scheduled refresh_active.py: expire grants past their deadline"""
+    db = SessionLocal()
+    try:
+        result = ActiveGrantService(db).refresh()
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ {result['fundings_changed']} fundings and {result['chunks_changed']} chunks changed state")
+    return {"fundings_changed": result["fundings_changed"], "chunks_changed": result["chunks_changed"]}
+
+
+async def refresh_matches() -> dict:
+    db = SessionLocal()
+    try:
+        return await GrantMatcher(db).refresh()
+    finally:
+        db.close()
+
+
+def match_handler(event, context):
+    """Lambda handler for the scheduled match.py: incremental match refresh (active flags first)"""
+    report = asyncio.run(refresh_matches())
+    print(f"✅ Match refresh: {report['grants']} active grants in {report['seconds']}s")
+    return report
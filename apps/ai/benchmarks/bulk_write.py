@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunk writes: ORM `db.add(FundingChunk(...))` vs BulkChunkWriter (binary COPY + merge).
+
+Writes synthetic chunks with random 1024-d vectors; their content hashes
+carry a per-run prefix so they are deleted afterwards.
+
+Usage (from apps/ai, with DATABASE_URL pointing at a postgresql+psycopg:// database):
+    python benchmarks/bulk_write.py --rows 100000 [--orm-commit-every 5]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db import SessionLocal
+from app.models.models import FundingChunk
+from app.services.chunk_writer import BulkChunkWriter
+
+DIMENSIONS = 1024
+
+
+def synthetic_rows(prefix: str, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        yield {
+            "content_hash": f"{prefix}{uuid.uuid4().hex}",
+            "chunk_text": f"Synthetic benchmark chunk {i} " + "lorem ipsum " * 40,
+            "embedding": rng.standard_normal(DIMENSIONS, dtype=np.float32)
+        }
+
+
+def bench_orm(db, prefix: str, rows: int, commit_every: int) -> float:
+    """The pre-pipeline path: one ORM object per chunk, Python float lists, periodic commits"""
+    started = time.perf_counter()
+    for i, row in enumerate(synthetic_rows(prefix, rows)):
+        now = datetime.utcnow()
+        db.add(FundingChunk(
+            content_hash=row["content_hash"],
+            chunk_text=row["chunk_text"],
+            embedding=row["embedding"].tolist(),
+            created_at=now,
+            updated_at=now
+        ))
+        if (i + 1) % commit_every == 0:
+            db.commit()
+    db.commit()
+    return time.perf_counter() - started
+
+
+def bench_copy(db, prefix: str, rows: int) -> float:
+    started = time.perf_counter()
+    BulkChunkWriter(db).write(synthetic_rows(prefix, rows))
+    db.commit()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--orm-rows", type=int, default=None, help="Rows for the ORM path (default: --rows)")
+    parser.add_argument("--orm-commit-every", type=int, default=5, help="Mirror the old 'commit every 5 chunks' cadence")
+    args = parser.parse_args()
+    orm_rows = args.orm_rows or args.rows
+
+    db = SessionLocal()
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    benchmark_chunks = FundingChunk.content_hash.startswith(prefix)
+
+    try:
+        print(f"🏁 Writing {args.rows} chunks via COPY...")
+        copy_seconds = bench_copy(db, prefix, args.rows)
+        db.query(FundingChunk).filter(benchmark_chunks).delete(synchronize_session=False)
+        db.commit()
+
+        print(f"🏁 Writing {orm_rows} chunks via ORM (commit every {args.orm_commit_every})...")
+        orm_seconds = bench_orm(db, prefix, orm_rows, args.orm_commit_every)
+
+        print("\n📊 Results")
+        print(f"   {'path':<6} {'rows':>8} {'seconds':>9} {'rows/s':>10}")
+        print(f"   {'orm':<6} {orm_rows:>8} {orm_seconds:>9.2f} {orm_rows / orm_seconds:>10.0f}")
+        print(f"   {'copy':<6} {args.rows:>8} {copy_seconds:>9.2f} {args.rows / copy_seconds:>10.0f}")
+        print(f"   speedup: {(args.rows / copy_seconds) / (orm_rows / orm_seconds):.1f}x")
+    finally:
+        db.rollback()
+        db.query(FundingChunk).filter(benchmark_chunks).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
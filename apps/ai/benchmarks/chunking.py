@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the chunker on the bundled data/*/relevant_docs PDFs.
+
+Pages are extracted once up front so only chunking is timed. The legacy
+sentence chunker (re-splits the growing chunk on every sentence) is kept
+here for comparison. Its per-sentence cost grows with the chunk being built,
+so a sweep over chunk sizes (on the corpus repeated 4x) shows its quadratic
+term; the new chunker's cost should stay flat.
+
+Usage (from apps/ai):
+    python benchmarks/chunking.py [--max-tokens 512] [--min-tokens 128] [--overlap-tokens 64]
+"""
+
+import argparse
+import glob
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.document_processor import DocumentProcessor
+
+
+def legacy_chunk_text(text: str, chunk_size: int = 500):
+    """The chunker this replaced, verbatim"""
+    sentences = text.split('. ')
+    chunks = []
+    current_chunk = ""
+    for sentence in sentences:
+        estimated_tokens = len((current_chunk + sentence).split()) * 1.3
+        if estimated_tokens > chunk_size and current_chunk:
+            chunks.append(current_chunk.strip())
+            current_chunk = sentence
+        else:
+            current_chunk += sentence + ". "
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--min-tokens", type=int, default=128)
+    parser.add_argument("--overlap-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(args.max_tokens, args.min_tokens, args.overlap_tokens)
+    tokenizer = processor.tokenizer
+    print(f"🔤 Tokenizer: {'tiktoken ' + tokenizer.encoding_name if tokenizer.is_exact else 'regex approximation'}")
+
+    # Identical copies (DCG, PTF/tourism) are benchmarked once
+    documents = {}
+    for path in sorted(glob.glob(f"{args.data_dir}/*/relevant_docs/*.pdf")):
+        documents.setdefault(Path(path).name, list(processor.iter_pdf_pages(path)))
+
+    print(f"\n{'document':<48} {'pages':>5} {'chunks':>6} {'tok p50':>7} {'tok p95':>7} {'tok max':>7} {'ms':>7}")
+    all_sizes = []
+    for name, pages in documents.items():
+        started = time.perf_counter()
+        chunks = list(processor.chunk_pages(pages))
+        elapsed = (time.perf_counter() - started) * 1000
+        sizes = [tokenizer.count(chunk) for _, chunk in chunks] or [0]
+        all_sizes.extend(sizes)
+        print(
+            f"{name[:48]:<48} {len(pages):>5} {len(chunks):>6} {statistics.median(sizes):>7.0f} "
+            f"{percentile(sizes, 0.95):>7} {max(sizes):>7} {elapsed:>7.1f}"
+        )
+    print(f"{'all':<48} {'':>5} {len(all_sizes):>6} {statistics.median(all_sizes):>7.0f} "
+          f"{percentile(all_sizes, 0.95):>7} {max(all_sizes):>7}")
+
+    text = "\n".join(text for pages in documents.values() for _, text in pages) * 4
+    print(f"\n{len(text)} chars")
+    print(f"{'max tokens':>10} {'legacy ms':>10} {'new ms':>10}")
+    for max_tokens in (512, 2048, 8192):
+        started = time.perf_counter()
+        legacy_chunk_text(text, max_tokens)
+        legacy_ms = (time.perf_counter() - started) * 1000
+
+        sized = DocumentProcessor(max_tokens, max_tokens // 4, max_tokens // 8)
+        started = time.perf_counter()
+        sized.chunk_text(text)
+        new_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{max_tokens:>10} {legacy_ms:>10.1f} {new_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark of the API, booted in-process with uvicorn and
+driven over loopback HTTP. Bedrock runs on its local backend
+(BEDROCK_BACKEND=local) and Cognito and S3 on the stand-ins in stubs.py, all
+with configurable latency, so what is measured is the app itself: routing,
+auth, SQL, pgvector, prompt building.
+
+At each concurrency level it measures:
+- ingestion: POST /admin/funding/upload (202 latency) and time until the job
+  succeeds, for synthetic HTML grant documents
+- POST /chat/ with a rotating mix of queries (overview, details, amount, follow-up)
+- GET /chat/sessions and GET /chat/sessions/{id}/messages
+
+Needs DATABASE_URL pointing at a scratch Postgres + pgvector database with
+the full schema (web app's prisma migrate deploy, then alembic upgrade head).
+Rows created by the run are deleted afterwards; stand-in embeddings are
+cached under their own model id, so they never mix with real ones.
+
+Usage (from apps/ai):
+    python benchmarks/e2e.py [--concurrency 1,4,16] [--requests 100] [--documents 20]
+                             [--llm-latency-ms 800] [--embed-latency-ms 40] [--auth-latency-ms 30]
+                             [--tokens-per-second 0] [--throttle-rate 0]
+                             [--output benchmark-report.json] [--baseline previous-report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+STUB_EMBEDDING_MODEL = "bench-stub-embedding"
+
+# Configure the app before it is imported: local Bedrock whose embeddings get their own
+# cache key, uploads ingested in-process, and per-request trace/EMF lines kept off stdout.
+# The stand-in has no RPM/TPM quotas; set BEDROCK_QUOTAS to replay production ones
+os.environ["BEDROCK_BACKEND"] = "local"
+os.environ["EMBEDDING_MODEL_ID"] = STUB_EMBEDDING_MODEL
+os.environ["INGESTION_INLINE"] = "true"
+os.environ.setdefault("TRACE_EXPORTER", "none")
+os.environ.setdefault("METRICS_EMF", "false")
+os.environ.setdefault("BEDROCK_QUOTAS", "{}")
+
+import httpx
+import uvicorn
+
+from stubs import Latency, install
+
+CHAT_QUERIES = [
+    "What grants are available for my company?",
+    "Tell me more about the first one",
+    "Is there funding up to RM 500,000 for automation?",
+    "How can we fund a digital transformation project?",
+    "ok",
+]
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "mean_ms": round(float(np.mean(latencies)), 1),
+        "max_ms": round(float(np.max(latencies)), 1)
+    }
+
+
+class Recorder:
+    """Latencies and errors for one endpoint at one concurrency level"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.started = None
+        self.finished = None
+
+    async def call(self, request):
+        self.started = self.started or time.perf_counter()
+        begun = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+            error = None if ok else str(response.status_code)
+        except httpx.HTTPError as e:
+            response, error = None, e.__class__.__name__
+        self.finished = time.perf_counter()
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        else:
+            self.latencies.append((self.finished - begun) * 1000)
+        return response if not error else None
+
+    def report(self) -> Dict[str, Any]:
+        count = len(self.latencies) + sum(self.errors.values())
+        elapsed = (self.finished - self.started) if self.started and self.finished else 0
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(sum(self.errors.values()) / count, 4) if count else 0,
+            "throughput_rps": round(len(self.latencies) / elapsed, 2) if elapsed else 0,
+            **percentiles(self.latencies)
+        }
+
+
+class Fixtures:
+    """Benchmark users and companies, and cleanup of everything the run created"""
+
+    def __init__(self, run_id: str):
+        from app.db import SessionLocal
+        self.db = SessionLocal()
+        self.run_id = run_id
+        self.user_ids: List[str] = []
+
+    def create_users(self, count: int) -> List[str]:
+        from app.models.models import Company, User, UserCompany
+
+        now = datetime.utcnow()
+        for i in range(count):
+            user_id = f"bench-{self.run_id}-{i}"
+            self.db.add(User(
+                id=user_id, email=f"{user_id}@bench.invalid", name=f"Bench user {i}", onboarded=True,
+                createdAt=now, updatedAt=now, created_at=now, updated_at=now
+            ))
+            self.db.add(Company(
+                id=user_id, company_name=f"Bench Company {i}", sector="Technology", location="Kuala Lumpur",
+                revenue=2_000_000, employees=25, created_at=now, updated_at=now
+            ))
+            self.db.flush()
+            self.db.add(UserCompany(user_id=user_id, company_id=user_id, role="owner"))
+            self.user_ids.append(user_id)
+        self.db.commit()
+        return self.user_ids
+
+    def cleanup(self):
+        from sqlalchemy import delete, select
+        from app.models.models import (
+            BedrockUsage, ChatMessage, ChatSession, Company, CompanyGrantMatch, EmbeddingCacheEntry,
+            Funding, FundingChunk, User, UserCompany
+        )
+
+        self.db.rollback()
+        sessions = select(ChatSession.id).where(ChatSession.userId.in_(self.user_ids))
+        self.db.execute(delete(BedrockUsage).where(BedrockUsage.session_id.in_(sessions)))
+        self.db.execute(delete(BedrockUsage).where(BedrockUsage.model_id == STUB_EMBEDDING_MODEL))
+        self.db.execute(delete(ChatMessage).where(ChatMessage.session_id.in_(sessions)))
+        self.db.execute(delete(ChatSession).where(ChatSession.userId.in_(self.user_ids)))
+        self.db.execute(delete(CompanyGrantMatch).where(CompanyGrantMatch.company_id.in_(self.user_ids)))
+        self.db.execute(delete(UserCompany).where(UserCompany.user_id.in_(self.user_ids)))
+        self.db.execute(delete(Company).where(Company.id.in_(self.user_ids)))
+        self.db.execute(delete(User).where(User.id.in_(self.user_ids)))
+        # Links, manifests and jobs go with their funding (ON DELETE CASCADE)
+        self.db.execute(delete(Funding).where(Funding.title.like(f"Bench {self.run_id} %")))
+        self.db.execute(delete(FundingChunk).where(~FundingChunk.links.any()))
+        self.db.execute(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.model_id == STUB_EMBEDDING_MODEL))
+        self.db.commit()
+        self.db.close()
+
+
+def synthetic_document(run_id: str, index: int) -> bytes:
+    """A grant guideline page; every document is distinct so none is deduplicated away"""
+    sections = "".join(
+        f"<h2>Section {s}</h2><p>Applicants for grant {index} of run {run_id} must be Malaysian SMEs "
+        f"with at least 60% local shareholding. Section {s} covers eligible costs such as software, "
+        f"cloud services, automation equipment and consultancy, reimbursed at up to 50% of the "
+        f"approved amount (maximum RM {(index + 1) * 50_000:,}). Claims are submitted quarterly "
+        f"with invoices and proof of payment.</p>"
+        for s in range(12)
+    )
+    return f"<html><body><h1>Bench grant {index}</h1>{sections}</body></html>".encode("utf-8")
+
+
+def auth(user_id: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer bench-token:{user_id}"}
+
+
+async def bench_ingestion(client: httpx.AsyncClient, run_id: str, user_id: str, concurrency: int, documents: int, level: int) -> Dict[str, Any]:
+    upload = Recorder()
+    completion: List[float] = []
+    failed = 0
+    queue = list(range(documents))
+
+    async def worker():
+        nonlocal failed
+        while queue:
+            index = queue.pop()
+            begun = time.perf_counter()
+            response = await upload.call(client.post(
+                "/admin/funding/upload",
+                headers=auth(user_id),
+                data={
+                    "title": f"Bench {run_id} grant {level}-{index}",
+                    "sector": "Technology",
+                    "amount": str((index + 1) * 50_000),
+                    "eligibility": "Malaysian-owned SMEs with fewer than 200 employees"
+                },
+                files={"files": (f"grant-{level}-{index}.html", synthetic_document(run_id, level * 1000 + index), "text/html")}
+            ))
+            if response is None:
+                continue
+
+            # The job runs after the 202 response; poll until it settles
+            for job_id in response.json()["job_ids"]:
+                while True:
+                    job = (await client.get(f"/admin/funding/jobs/{job_id}", headers=auth(user_id))).json()
+                    if job["status"] in ("succeeded", "failed"):
+                        break
+                    await asyncio.sleep(0.05)
+                if job["status"] == "failed":
+                    failed += 1
+            completion.append((time.perf_counter() - begun) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "upload": upload.report(),
+        "ingested": {
+            "documents": len(completion),
+            "failed": failed,
+            "documents_per_s": round(len(completion) / elapsed, 2),
+            **percentiles(completion)
+        }
+    }
+
+
+async def bench_endpoint(concurrency: int, requests: int, make_request) -> Dict[str, Any]:
+    recorder = Recorder()
+    counter = iter(range(requests))
+
+    async def worker(slot: int):
+        for i in counter:
+            await recorder.call(make_request(slot, i))
+
+    await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+    return recorder.report()
+
+
+async def run_level(client: httpx.AsyncClient, args, run_id: str, user_ids: List[str], concurrency: int) -> Dict[str, Any]:
+    print(f"\n⚡ Concurrency {concurrency}")
+    results: Dict[str, Any] = {"concurrency": concurrency}
+
+    if args.documents:
+        results["ingestion"] = await bench_ingestion(client, run_id, user_ids[0], concurrency, args.documents, concurrency)
+        print(f"   ingestion   {results['ingestion']['ingested']}")
+
+    # Each virtual user chats as its own user, so sessions are not shared across workers
+    results["POST /chat/"] = await bench_endpoint(concurrency, args.requests, lambda slot, i: client.post(
+        "/chat/", headers=auth(user_ids[slot]), json={"message": CHAT_QUERIES[i % len(CHAT_QUERIES)]}
+    ))
+    print(f"   chat        {results['POST /chat/']}")
+
+    results["GET /chat/sessions"] = await bench_endpoint(concurrency, args.requests, lambda slot, i: client.get(
+        "/chat/sessions", headers=auth(user_ids[slot])
+    ))
+    print(f"   sessions    {results['GET /chat/sessions']}")
+
+    session_ids = {}
+    for user_id in user_ids[:concurrency]:
+        sessions = (await client.get("/chat/sessions", headers=auth(user_id), params={"limit": 1})).json()
+        session_ids[user_id] = sessions[0]["id"] if sessions else "missing"
+
+    results["GET /chat/sessions/{id}/messages"] = await bench_endpoint(concurrency, args.requests, lambda slot, i: client.get(
+        f"/chat/sessions/{session_ids[user_ids[slot]]}/messages", headers=auth(user_ids[slot])
+    ))
+    print(f"   messages    {results['GET /chat/sessions/{id}/messages']}")
+    return results
+
+
+def start_server(port: int) -> uvicorn.Server:
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.05)
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]):
+    """p95 and throughput change per endpoint against an earlier report"""
+    print(f"\n📊 Against {baseline['run']['commit']}:")
+    previous = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in report["levels"]:
+        old = previous.get(level["concurrency"])
+        if old is None:
+            continue
+        for endpoint, stats in level.items():
+            if not endpoint.startswith(("GET", "POST")) or endpoint not in old or "p95_ms" not in stats:
+                continue
+            before = old[endpoint]
+            change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before.get("p95_ms") else 0
+            print(f"   c={level['concurrency']:<3} {endpoint:<36} p95 {before.get('p95_ms')} → {stats['p95_ms']} ms ({change:+.0f}%)  "
+                  f"{before.get('throughput_rps')} → {stats['throughput_rps']} req/s")
+
+
+async def run(args, port: int, user_ids: List[str], run_id: str) -> List[Dict[str, Any]]:
+    # One connection per virtual user, as separate clients would have
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        return [await run_level(client, args, run_id, user_ids, concurrency) for concurrency in args.concurrency]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=lambda value: [int(c) for c in value.split(",")], default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint per level")
+    parser.add_argument("--documents", type=int, default=20, help="Uploads per level (0 skips ingestion)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--embed-latency-ms", type=float, default=40)
+    parser.add_argument("--auth-latency-ms", type=float, default=30)
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal spread of stand-in latencies (0 = constant)")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="LLM output speed after the first token (0 = instant)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Share of Bedrock calls failing with ThrottlingException")
+    parser.add_argument("--output", default="benchmark-report.json")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ.update({
+        "LOCAL_BEDROCK_CHAT_LATENCY_MS": str(args.llm_latency_ms),
+        "LOCAL_BEDROCK_EMBED_LATENCY_MS": str(args.embed_latency_ms),
+        "LOCAL_BEDROCK_LATENCY_SIGMA": str(args.latency_sigma),
+        "LOCAL_BEDROCK_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "LOCAL_BEDROCK_THROTTLE_RATE": str(args.throttle_rate)
+    })
+    install(auth_latency=Latency(args.auth_latency_ms, args.latency_sigma, seed=3))
+
+    run_id = uuid.uuid4().hex[:8]
+    fixtures = Fixtures(run_id)
+    try:
+        user_ids = fixtures.create_users(max(args.concurrency))
+        port = free_port()
+        server = start_server(port)
+        print(f"🚀 API on :{port} (run {run_id}); stand-in latency: LLM {args.llm_latency_ms} ms, "
+              f"embedding {args.embed_latency_ms} ms, auth {args.auth_latency_ms} ms")
+
+        levels = asyncio.run(run(args, port, user_ids, run_id))
+        server.should_exit = True
+    finally:
+        fixtures.cleanup()
+
+    report = {
+        "run": {
+            "commit": git_commit(),
+            "started_at": datetime.utcnow().isoformat(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+        },
+        "levels": levels
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Report written to {args.output}")
+
+    if args.baseline:
+        compare(report, json.loads(Path(args.baseline).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for the chat API. Authenticated virtual users play
+multi-turn conversation scripts (overview → "tell me more" → "the second one",
+amount questions, off-topic questions the guardrails should deflect, history
+browsing) with think time between turns. Users are added in steps, each
+ramped in gradually; every step reports latency percentiles and error rates
+per endpoint, and the run stops at the first step that breaks the SLO. That
+step's user count is where the target (one worker, one Lambda container)
+falls over.
+
+Targets:
+- a running API (--base-url) with real Cognito access tokens (--tokens-file,
+  one per line; virtual users share them round-robin)
+- --local: the API booted in-process as in e2e.py (local Bedrock, Cognito
+  and S3 stand-ins, fixture users on DATABASE_URL, cleaned up afterwards)
+
+Usage (from apps/ai):
+    python benchmarks/load.py --local [--steps 1,5,10,25,50] [--step-duration 60] [--ramp-up 10]
+    python benchmarks/load.py --base-url https://api.example.com --tokens-file tokens.txt
+                              [--think-time 2] [--slo-p95-ms 10000] [--max-error-rate 0.05]
+                              [--output load-report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from e2e import Recorder, free_port, git_commit
+
+CHAT = "POST /chat/"
+SESSIONS = "GET /chat/sessions"
+MESSAGES = "GET /chat/sessions/{id}/messages"
+
+# (weight, turns); a turn is a chat message, or "sessions"/"messages" to browse history
+SCRIPTS = {
+    "overview_then_details": (5, [
+        "What grants are available for my company?",
+        "Tell me more about the first one",
+        "What about the second one?",
+        "messages",
+    ]),
+    "amount_question": (3, [
+        "Is there funding up to RM 500,000 for automation equipment?",
+        "ok",
+        "sessions",
+    ]),
+    "open_question": (2, [
+        "How can we fund a digital transformation project?",
+        "Explain the eligibility requirements",
+    ]),
+    "off_topic": (1, [
+        "What's the weather today?",
+        "Tell me a joke",
+    ]),
+}
+
+
+class Step:
+    """Requests started while a given number of users was active"""
+
+    def __init__(self, users: int):
+        self.users = users
+        self.endpoints: Dict[str, Recorder] = {}
+
+    def recorder(self, endpoint: str) -> Recorder:
+        return self.endpoints.setdefault(endpoint, Recorder())
+
+    def report(self) -> Dict[str, Any]:
+        return {"users": self.users, **{endpoint: recorder.report() for endpoint, recorder in self.endpoints.items()}}
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, tokens: List[str], args):
+        self.client = client
+        self.tokens = tokens
+        self.args = args
+        self.step: Optional[Step] = None
+        self.random = random.Random(0)
+        self.scripts = list(SCRIPTS.items())
+
+    async def request(self, endpoint: str, call) -> Optional[httpx.Response]:
+        return await self.step.recorder(endpoint).call(call)
+
+    async def think(self):
+        if self.args.think_time > 0:
+            await asyncio.sleep(self.random.expovariate(1 / self.args.think_time))
+
+    async def virtual_user(self, index: int, stop: asyncio.Event):
+        headers = {"Authorization": f"Bearer {self.tokens[index % len(self.tokens)]}"}
+        session_id = None
+
+        while not stop.is_set():
+            _, (_, turns) = self.random.choices(self.scripts, weights=[weight for _, (weight, _) in self.scripts])[0]
+            for turn in turns:
+                if stop.is_set():
+                    return
+                if turn == "sessions":
+                    await self.request(SESSIONS, self.client.get("/chat/sessions", headers=headers))
+                elif turn == "messages":
+                    if session_id:
+                        await self.request(MESSAGES, self.client.get(f"/chat/sessions/{session_id}/messages", headers=headers))
+                else:
+                    response = await self.request(CHAT, self.client.post("/chat/", headers=headers, json={"message": turn}))
+                    if response is not None:
+                        session_id = response.json().get("session_id", session_id)
+                await self.think()
+
+    def broken(self, report: Dict[str, Any]) -> Optional[str]:
+        """Why a step breaks the SLO, if it does"""
+        for endpoint, stats in report.items():
+            if endpoint == "users":
+                continue
+            if stats["error_rate"] > self.args.max_error_rate:
+                return f"{endpoint} error rate {stats['error_rate']:.1%}"
+            if endpoint == CHAT and stats.get("p95_ms", 0) > self.args.slo_p95_ms:
+                return f"{endpoint} p95 {stats['p95_ms']:.0f} ms"
+        return None
+
+    async def run(self) -> Dict[str, Any]:
+        stop = asyncio.Event()
+        users: List[asyncio.Task] = []
+        steps = []
+        breaking = None
+
+        for target in self.args.steps:
+            self.step = Step(target)
+            step_started = time.perf_counter()
+            added = target - len(users)
+            # New users arrive evenly over the ramp-up, not all at once
+            for i in range(added):
+                users.append(asyncio.create_task(self.virtual_user(len(users), stop)))
+                if added > 1 and self.args.ramp_up > 0:
+                    await asyncio.sleep(self.args.ramp_up / added)
+            await asyncio.sleep(max(self.args.step_duration - (time.perf_counter() - step_started), 0))
+
+            report = self.step.report()
+            steps.append(report)
+            chat = report.get(CHAT, {})
+            print(f"👥 {target:>4} users  chat p50 {chat.get('p50_ms', '-')} / p95 {chat.get('p95_ms', '-')} / "
+                  f"p99 {chat.get('p99_ms', '-')} ms  {chat.get('throughput_rps', 0)} req/s  errors {chat.get('error_rate', 0):.1%}")
+
+            reason = self.broken(report)
+            if reason:
+                breaking = {"users": target, "reason": reason}
+                print(f"💥 SLO broken at {target} users: {reason}")
+                break
+
+        stop.set()
+        await asyncio.gather(*users, return_exceptions=True)
+        return {"steps": steps, "breaking_point": breaking}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="Running API to load")
+    target.add_argument("--local", action="store_true", help="Boot the API in-process with AWS stand-ins")
+    parser.add_argument("--tokens-file", help="Bearer tokens, one per line (with --base-url)")
+    parser.add_argument("--steps", type=lambda value: [int(n) for n in value.split(",")], default=[1, 5, 10, 25, 50])
+    parser.add_argument("--step-duration", type=float, default=60, help="Seconds per step, ramp-up included")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds over which a step's new users arrive")
+    parser.add_argument("--think-time", type=float, default=2, help="Mean pause between turns (exponential)")
+    parser.add_argument("--slo-p95-ms", type=float, default=10_000, help="Chat p95 above this breaks the step")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="Error rate above this breaks the step")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="Local Bedrock time to first token (--local)")
+    parser.add_argument("--output", default="load-report.json")
+    args = parser.parse_args()
+    if args.base_url and not args.tokens_file:
+        parser.error("--base-url needs --tokens-file")
+    return args
+
+
+async def drive(base_url: str, tokens: List[str], args) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=max(args.steps) * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        return await LoadTest(client, tokens, args).run()
+
+
+def main():
+    args = parse_args()
+    started_at = time.time()
+
+    if args.local:
+        from e2e import Fixtures, start_server
+        from stubs import Latency, install
+
+        os.environ["LOCAL_BEDROCK_CHAT_LATENCY_MS"] = str(args.llm_latency_ms)
+        install(auth_latency=Latency(30, seed=3))
+        fixtures = Fixtures(uuid.uuid4().hex[:8])
+        try:
+            user_ids = fixtures.create_users(max(args.steps))
+            port = free_port()
+            server = start_server(port)
+            # StubCognito's token format
+            tokens = [f"bench-token:{user_id}" for user_id in user_ids]
+            result = asyncio.run(drive(f"http://127.0.0.1:{port}", tokens, args))
+            server.should_exit = True
+        finally:
+            fixtures.cleanup()
+    else:
+        tokens = [line.strip() for line in Path(args.tokens_file).read_text().splitlines() if line.strip()]
+        result = asyncio.run(drive(args.base_url.rstrip("/"), tokens, args))
+
+    report = {
+        "run": {
+            "commit": git_commit(),
+            "target": "local" if args.local else args.base_url,
+            "started_at": started_at,
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "tokens_file")}
+        },
+        **result
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the blocked company x grant scoring pass behind match.py on
+synthetic data: random unit profile vectors, random eligibility caps and
+sector tags. Only scoring is timed (matrix product, eligibility mask,
+top-N selection); embeddings and database writes are not involved.
+
+Usage (from apps/ai):
+    python benchmarks/match_matrix.py [--companies 100000] [--grants 10000] [--dims 1024] [--block-size 2048] [--top-n 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.matching import GrantMatrix, SECTOR_BITS, eligibility_mask, normalise, top_matches
+
+
+def random_sector_bits(rng, count: int, open_share: float) -> np.ndarray:
+    bits = np.array(list(SECTOR_BITS.values()))[rng.integers(0, len(SECTOR_BITS), count)]
+    return np.where(rng.random(count) < open_share, 0, bits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=100_000)
+    parser.add_argument("--grants", type=int, default=10_000)
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--top-n", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    grants = GrantMatrix(
+        np.arange(args.grants),
+        normalise(rng.standard_normal((args.grants, args.dims), dtype=np.float32)),
+        np.where(rng.random(args.grants) < 0.5, np.nan, rng.integers(5, 500, args.grants)),
+        np.where(rng.random(args.grants) < 0.5, np.nan, rng.integers(1, 50, args.grants) * 1e6),
+        random_sector_bits(rng, args.grants, open_share=0.4),
+        [None] * args.grants
+    )
+
+    print(f"Scoring {args.companies:,} companies x {args.grants:,} grants ({args.dims} dims, blocks of {args.block_size})")
+    started = time.perf_counter()
+    scored = 0
+
+    for start in range(0, args.companies, args.block_size):
+        count = min(args.block_size, args.companies - start)
+        # Profiles are generated per block, as match.py reads them per block
+        vectors = normalise(rng.standard_normal((count, args.dims), dtype=np.float32))
+        mask = eligibility_mask(
+            np.where(rng.random(count) < 0.2, np.nan, rng.integers(1, 1000, count)),
+            np.where(rng.random(count) < 0.2, np.nan, rng.integers(1, 100, count) * 1e6),
+            random_sector_bits(rng, count, open_share=0.1),
+            grants
+        )
+        top_matches(vectors @ grants.vectors.T, mask, args.top_n)
+        scored += count
+
+        elapsed = time.perf_counter() - started
+        if start // args.block_size % 10 == 0:
+            print(f"  {scored:>9,} companies  {elapsed:7.1f}s  {scored / elapsed:9,.0f} companies/s")
+
+    elapsed = time.perf_counter() - started
+    print(f"Total: {elapsed:.1f}s, {scored / elapsed:,.0f} companies/s, {scored * args.grants / elapsed / 1e6:,.0f}M pairs/s")
+
+
+if __name__ == "__main__":
+    main()
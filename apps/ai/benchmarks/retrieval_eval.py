@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Retrieval quality versus latency. Runs the labelled questions in
+retrieval_queries.json (question -> expected funding_ids, source document and
+pages, written against the bundled data/ folders) through each retrieval
+configuration and reports recall@k, MRR and search latency p50/p99 side by
+side. Configurations no other row beats on recall, MRR and p99 at once are
+marked as Pareto-optimal; pick production settings from those.
+
+Modes:
+- memory (default): the bundled documents are chunked and embedded here, so
+  every chunking setting can be compared. The grid is chunking x vector
+  precision (float32 exact, float16, int8 scalar, binary with float32 rescoring
+  of the shortlist) x hybrid keyword weight (BM25 blended into cosine).
+- db: the ingested funding_chunks rows on DATABASE_URL. Active chunks are copied
+  to a temporary table, an HNSW index is built for each --hnsw-m and searched at
+  each --ef-search, next to an exact scan.
+
+Embeddings come from EmbeddingService (Titan v2). With DATABASE_URL set they go
+through the persistent embedding cache, so only the first run pays for them.
+BEDROCK_BACKEND=local runs the harness offline, but its vectors carry no meaning:
+only the keyword side of hybrid rows is then informative.
+
+Usage (from apps/ai):
+    python benchmarks/retrieval_eval.py [--chunking 512:128:64,256:64:32,1024:256:128]
+                                        [--precision float32,float16,int8,binary] [--hybrid 0,0.3,0.5]
+                                        [--k 1,3,5,10] [--repeat 5] [--output retrieval-report.json]
+    python benchmarks/retrieval_eval.py --mode db [--hnsw-m 8,16,32] [--ef-search 10,40,100]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.document_processor import DocumentProcessor
+from app.services.embeddings import EmbeddingService
+from app.services.ingestion import MIN_CHUNK_CHARS
+
+QUERIES = Path(__file__).resolve().parent / "retrieval_queries.json"
+WORD = re.compile(r"[a-z0-9]+")
+
+
+class Chunk:
+    """A distinct chunk text and every (funding, document, pages) it occurs at"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.occurrences: List[Tuple[int, str, Set[int]]] = []
+
+
+def page_spans(starts: List[int], last_page: Optional[int]) -> List[Set[int]]:
+    """
+    Pages each chunk of a document covers, from the start pages of its chunks
+    in order: up to where the next chunk starts (the last one runs to the end
+    of the document, when known). Overlap makes this generous by one page at most.
+    """
+    spans = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else (last_page or start)
+        spans.append(set(range(start, max(start, end) + 1)))
+    return spans
+
+
+def covered_pages(chunk: Chunk, label: Dict[str, Any]) -> Optional[Set[int]]:
+    """Labelled pages a chunk covers, or None if it is not relevant to the question"""
+    wanted = set(label.get("pages") or [])
+    covered = None
+    for funding_id, document, pages in chunk.occurrences:
+        if funding_id not in label["funding_ids"]:
+            continue
+        if label.get("document") and document != label["document"]:
+            continue
+        if wanted and not pages & wanted:
+            continue
+        covered = (covered or set()) | (pages & wanted)
+    return covered
+
+
+def score_ranking(ranked: List[Chunk], label: Dict[str, Any], ks: List[int]) -> Dict[str, float]:
+    """recall@k (share of labelled pages found in the top k) and reciprocal rank"""
+    wanted = set(label.get("pages") or [])
+    found: Set[int] = set()
+    first_hit = None
+    scores = {}
+    for rank, chunk in enumerate(ranked[:max(ks)], 1):
+        covered = covered_pages(chunk, label)
+        if covered is not None:
+            first_hit = first_hit or rank
+            found |= covered
+        if rank in ks:
+            scores[f"recall@{rank}"] = len(found) / len(wanted) if wanted else float(first_hit is not None)
+    for k in ks:
+        # Fewer results than k: recall stays at its final value
+        scores.setdefault(f"recall@{k}", len(found) / len(wanted) if wanted else float(first_hit is not None))
+    scores["rr"] = 1 / first_hit if first_hit else 0.0
+    return scores
+
+
+def summarize(name: str, params: Dict[str, Any], scores: List[Dict[str, float]], latencies_ms: List[float], ks: List[int]) -> Dict[str, Any]:
+    ordered = sorted(latencies_ms)
+    row = {"config": name, **params}
+    for k in ks:
+        row[f"recall@{k}"] = round(statistics.mean(s[f"recall@{k}"] for s in scores), 4)
+    row["mrr"] = round(statistics.mean(s["rr"] for s in scores), 4)
+    row["p50_ms"] = round(ordered[len(ordered) // 2], 3)
+    row["p99_ms"] = round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], 3)
+    return row
+
+
+def mark_pareto(rows: List[Dict[str, Any]], recall_key: str):
+    """A row is Pareto-optimal if no other row is at least as good on recall, MRR and p99 and better on one"""
+    def dominates(a, b):
+        at_least = a[recall_key] >= b[recall_key] and a["mrr"] >= b["mrr"] and a["p99_ms"] <= b["p99_ms"]
+        better = a[recall_key] > b[recall_key] or a["mrr"] > b["mrr"] or a["p99_ms"] < b["p99_ms"]
+        return at_least and better
+
+    for row in rows:
+        row["pareto"] = not any(dominates(other, row) for other in rows if other is not row)
+
+
+def print_table(rows: List[Dict[str, Any]], ks: List[int]):
+    recall_columns = [f"recall@{k}" for k in ks]
+    header = f"{'config':<40} " + " ".join(f"{c:>9}" for c in recall_columns) + f" {'MRR':>6} {'p50 ms':>8} {'p99 ms':>8}  pareto"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for row in sorted(rows, key=lambda r: (not r["pareto"], r["p99_ms"])):
+        print(
+            f"{row['config'][:40]:<40} " + " ".join(f"{row[c]:>9.3f}" for c in recall_columns)
+            + f" {row['mrr']:>6.3f} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}  {'★' if row['pareto'] else ''}"
+        )
+
+
+def embedding_service() -> EmbeddingService:
+    if not os.getenv("DATABASE_URL"):
+        return EmbeddingService()
+    from app.db import SessionLocal
+    return EmbeddingService(SessionLocal())
+
+
+# --- memory mode -------------------------------------------------------------
+
+def load_documents(data_dir: str) -> List[Tuple[int, str, List[Tuple[int, str]]]]:
+    """(funding_id, document name, pages) for every document of every bundled grant folder"""
+    extracted: Dict[str, List[Tuple[int, str]]] = {}
+    documents = []
+    for metadata_path in sorted(glob.glob(f"{data_dir}/*/metadata/*.json")):
+        with open(metadata_path) as f:
+            funding_id = json.load(f)["id"]
+        folder = Path(metadata_path).parents[1]
+        for path in sorted((folder / "relevant_docs").glob("*")):
+            if path.name not in extracted:
+                extracted[path.name] = list(DocumentProcessor().iter_sections(str(path)))
+            documents.append((funding_id, path.name, extracted[path.name]))
+    return documents
+
+
+def build_corpus(documents, processor: DocumentProcessor) -> List[Chunk]:
+    """Chunk like ingestion does; identical chunk texts are stored once and linked to every occurrence"""
+    chunks: Dict[str, Chunk] = {}
+    for funding_id, document, pages in documents:
+        records = [
+            (page_no, text) for page_no, text in processor.chunk_pages(pages)
+            if len(text.strip()) > MIN_CHUNK_CHARS
+        ]
+        last_page = max((page_no for page_no, _ in pages), default=None)
+        spans = page_spans([page_no for page_no, _ in records], last_page)
+        for (_, text), span in zip(records, spans):
+            chunk = chunks.setdefault(text, Chunk(text))
+            chunk.occurrences.append((funding_id, document, span))
+    return list(chunks.values())
+
+
+class BM25:
+    def __init__(self, texts: List[str], k1: float = 1.2, b: float = 0.75):
+        self.docs = [Counter(WORD.findall(text.lower())) for text in texts]
+        self.lengths = np.array([sum(doc.values()) for doc in self.docs], dtype=np.float32)
+        self.k1, self.b = k1, b
+        frequency = Counter(term for doc in self.docs for term in doc)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in frequency.items()}
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(self.lengths.mean(), 1))
+        for term in set(WORD.findall(query.lower())):
+            if term not in self.idf:
+                continue
+            tf = np.array([doc.get(term, 0) for doc in self.docs], dtype=np.float32)
+            scores += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+class VectorIndex:
+    """Exhaustive search over unit vectors stored at one precision"""
+
+    def __init__(self, vectors: np.ndarray, precision: str, rescore: int = 50):
+        self.precision = precision
+        self.rescore = rescore
+        self.full = vectors
+        if precision == "float16":
+            self.stored = vectors.astype(np.float16)
+        elif precision == "int8":
+            # Symmetric per-vector scale; the scale is a common factor per row, so it is kept
+            self.scale = np.abs(vectors).max(axis=1, keepdims=True) / 127
+            self.stored = np.round(vectors / self.scale).astype(np.int8)
+        elif precision == "binary":
+            self.stored = np.packbits(vectors > 0, axis=1)
+        elif precision == "float32":
+            self.stored = vectors
+        else:
+            raise ValueError(f"Unknown precision '{precision}'")
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        if self.precision == "float16":
+            return (self.stored @ query.astype(np.float16)).astype(np.float32)
+        if self.precision == "int8":
+            return (self.stored.astype(np.float32) @ query) * self.scale[:, 0]
+        if self.precision == "binary":
+            # Hamming shortlist, then exact cosine on the shortlist only
+            query_bits = np.packbits(query > 0)
+            distances = np.unpackbits(self.stored ^ query_bits, axis=1).sum(axis=1)
+            shortlist = np.argsort(distances)[:self.rescore]
+            similarities = np.full(len(self.stored), -1.0, dtype=np.float32)
+            similarities[shortlist] = self.full[shortlist] @ query
+            return similarities
+        return self.stored @ query
+
+
+def min_max(values: np.ndarray) -> np.ndarray:
+    spread = values.max() - values.min()
+    return (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+
+
+async def run_memory(args, questions: List[Dict[str, Any]], embedder: EmbeddingService) -> List[Dict[str, Any]]:
+    documents = load_documents(args.data_dir)
+    query_vectors = np.array(await embedder.generate_embeddings([q["question"] for q in questions]), dtype=np.float32)
+    depth = max(args.k)
+    rows = []
+
+    for spec in args.chunking:
+        max_tokens, min_tokens, overlap_tokens = (int(n) for n in spec.split(":"))
+        corpus = build_corpus(documents, DocumentProcessor(max_tokens, min_tokens, overlap_tokens))
+        vectors = np.array(await embedder.generate_embeddings([chunk.text for chunk in corpus]), dtype=np.float32)
+        bm25 = BM25([chunk.text for chunk in corpus])
+        print(f"🧩 chunking {spec}: {len(corpus)} chunks")
+
+        for precision in args.precision:
+            index = VectorIndex(vectors, precision)
+            for weight in args.hybrid:
+                scores, latencies = [], []
+                for question, query_vector in zip(questions, query_vectors):
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        similarities = index.similarities(query_vector)
+                        if weight > 0:
+                            similarities = (1 - weight) * min_max(similarities) + weight * min_max(bm25.scores(question["question"]))
+                        top = np.argsort(-similarities)[:depth]
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    scores.append(score_ranking([corpus[i] for i in top], question, args.k))
+
+                params = {"chunking": spec, "precision": precision, "hybrid_weight": weight, "chunks": len(corpus)}
+                rows.append(summarize(f"chunk {spec} {precision} hybrid {weight}", params, scores, latencies, args.k))
+    return rows
+
+
+# --- db mode -----------------------------------------------------------------
+
+def run_db(args, questions: List[Dict[str, Any]], embedder: EmbeddingService) -> List[Dict[str, Any]]:
+    from sqlalchemy import text
+    from app.db import SessionLocal
+    from app.models.models import FundingChunk, FundingChunkLink, IngestionManifest
+
+    db = SessionLocal()
+    query_vectors = asyncio.run(embedder.generate_embeddings([q["question"] for q in questions]))
+    depth = max(args.k)
+
+    # Occurrences per chunk, in insertion order per document so page spans can be derived
+    links = db.query(
+        FundingChunkLink.chunk_id, FundingChunkLink.funding_id, IngestionManifest.source_path, FundingChunkLink.page_no
+    ).join(FundingChunk, FundingChunk.id == FundingChunkLink.chunk_id).outerjoin(
+        IngestionManifest, IngestionManifest.id == FundingChunkLink.manifest_id
+    ).filter(FundingChunk.is_active).order_by(FundingChunkLink.manifest_id, FundingChunkLink.id).all()
+
+    by_document: Dict[Tuple[int, str], List[Tuple[int, int]]] = {}
+    for chunk_id, funding_id, source_path, page_no in links:
+        by_document.setdefault((funding_id, Path(source_path or "").name), []).append((chunk_id, page_no or 0))
+    chunks: Dict[int, Chunk] = {}
+    for (funding_id, document), records in by_document.items():
+        for (chunk_id, _), span in zip(records, page_spans([page for _, page in records], None)):
+            chunks.setdefault(chunk_id, Chunk("")).occurrences.append((funding_id, document, span))
+    print(f"🧩 {len(chunks)} active chunks")
+
+    db.execute(text(
+        "CREATE TEMP TABLE eval_chunks AS "
+        "SELECT id, embedding FROM funding_chunks WHERE is_active AND embedding IS NOT NULL"
+    ))
+    search = text("SELECT id FROM eval_chunks ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :limit")
+
+    def run(name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        scores, latencies = [], []
+        for question, vector in zip(questions, query_vectors):
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                ids = db.execute(search, {"embedding": str(vector), "limit": depth}).scalars().all()
+                latencies.append((time.perf_counter() - started) * 1000)
+            scores.append(score_ranking([chunks.get(i, Chunk("")) for i in ids], question, args.k))
+        return summarize(name, params, scores, latencies, args.k)
+
+    rows = []
+    try:
+        db.execute(text("SET enable_indexscan = off"))
+        rows.append(run("exact", {"hnsw_m": None, "ef_search": None}))
+        db.execute(text("SET enable_indexscan = on"))
+        # The table is small enough that the planner would otherwise prefer a sequential scan
+        db.execute(text("SET enable_seqscan = off"))
+
+        for m in args.hnsw_m:
+            db.execute(text("DROP INDEX IF EXISTS eval_chunks_hnsw"))
+            started = time.perf_counter()
+            db.execute(text(
+                f"CREATE INDEX eval_chunks_hnsw ON eval_chunks USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {int(m)}, ef_construction = {int(args.ef_construction)})"
+            ))
+            print(f"🏗️  hnsw m={m}: built in {time.perf_counter() - started:.1f}s")
+            for ef_search in args.ef_search:
+                db.execute(text(f"SET hnsw.ef_search = {int(ef_search)}"))
+                rows.append(run(f"hnsw m={m} ef_search={ef_search}", {"hnsw_m": m, "ef_search": ef_search}))
+    finally:
+        db.rollback()
+        db.close()
+    return rows
+
+
+def parse_args():
+    numbers = lambda cast: (lambda value: [cast(n) for n in value.split(",")])
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["memory", "db"], default="memory")
+    parser.add_argument("--queries", default=str(QUERIES), help="Labelled question set")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--k", type=numbers(int), default=[1, 3, 5, 10], help="Cut-offs for recall@k")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed searches per question (latency only)")
+    parser.add_argument("--chunking", type=lambda value: value.split(","), default=["512:128:64", "256:64:32", "1024:256:128"],
+                        help="max:min:overlap token settings (memory mode)")
+    parser.add_argument("--precision", type=lambda value: value.split(","), default=["float32", "float16", "int8", "binary"],
+                        help="Vector precisions (memory mode)")
+    parser.add_argument("--hybrid", type=numbers(float), default=[0.0, 0.3, 0.5], help="BM25 weights blended into cosine (memory mode)")
+    parser.add_argument("--hnsw-m", type=numbers(int), default=[8, 16, 32], help="HNSW m values (db mode)")
+    parser.add_argument("--ef-search", type=numbers(int), default=[10, 40, 100], help="hnsw.ef_search values (db mode)")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW ef_construction (db mode)")
+    parser.add_argument("--output", default="retrieval-report.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.k = sorted(set(args.k))
+    with open(args.queries) as f:
+        questions = json.load(f)
+    embedder = embedding_service()
+    print(f"🔎 {len(questions)} labelled questions, embeddings from {embedder.model_id}")
+
+    rows = asyncio.run(run_memory(args, questions, embedder)) if args.mode == "memory" else run_db(args, questions, embedder)
+    recall_key = f"recall@{args.k[-1]}"
+    mark_pareto(rows, recall_key)
+    print_table(rows, args.k)
+
+    report = {
+        "run": {"mode": args.mode, "queries": len(questions), "embedding_model": embedder.model_id, "pareto_on": [recall_key, "mrr", "p99_ms"]},
+        "results": rows
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Stand-ins for the AWS clients the API creates with boto3.client outside
+Bedrock (which has its own local backend, BEDROCK_BACKEND=local): Cognito
+(get_user) and S3 (file upload/download), so the API runs with no network
+or AWS account.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import boto3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.bedrock_local import Latency
+
+
+class StubCognito:
+    """Accepts tokens of the form bench-token:<user id>"""
+
+    class exceptions:
+        class NotAuthorizedException(Exception):
+            pass
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def get_user(self, AccessToken: str) -> Dict[str, Any]:
+        self.latency.wait()
+        if not AccessToken.startswith("bench-token:"):
+            raise self.exceptions.NotAuthorizedException("Invalid access token")
+        user_id = AccessToken.split(":", 1)[1]
+        return {"Username": user_id, "UserAttributes": [{"Name": "sub", "Value": user_id}]}
+
+
+class StubS3:
+    """Objects kept in a local directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.join(self.root, bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def upload_file(self, path: str, bucket: str, key: str, ExtraArgs=None, Config=None):
+        shutil.copyfile(path, self._path(bucket, key))
+
+    def download_file(self, bucket: str, key: str, path: str, Config=None):
+        shutil.copyfile(self._path(bucket, key), path)
+
+
+def install(auth_latency: Latency) -> str:
+    """Route boto3.client to the stand-ins for this process; returns the local S3 directory"""
+    s3_root = tempfile.mkdtemp(prefix="bench-s3-")
+    clients = {
+        "cognito-idp": StubCognito(auth_latency),
+        "s3": StubS3(s3_root)
+    }
+    real_client = boto3.client
+
+    def client(service_name, *args, **kwargs):
+        return clients[service_name] if service_name in clients else real_client(service_name, *args, **kwargs)
+
+    boto3.client = client
+    return s3_root
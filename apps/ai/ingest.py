@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Ingest the data/ catalog: discover → extract → chunk → embed → bulk write.
+
+Usage:
+    python ingest.py [--workers N] [--embed-concurrency N] [--no-embed] [--report report.json]
+    python ingest.py --enqueue    # queue changed documents for worker.py instead
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from app.db import SessionLocal
+from app.services.ingestion import IngestionPipeline, print_report
+from app.services.ingestion_jobs import IngestionJobService
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest funding metadata and documents")
+    parser.add_argument("--data-dir", default="data", help="Catalog root with one folder per funding")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--embed-concurrency", type=int, default=8, help="Bedrock embedding calls in flight")
+    parser.add_argument("--no-embed", action="store_true", help="Write chunks without embeddings")
+    parser.add_argument("--report", help="Write the per-stage throughput report to this JSON file")
+    parser.add_argument("--enqueue", action="store_true", help="Queue new/changed documents as ingestion jobs for worker.py")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    db = SessionLocal()
+    try:
+        pipeline = IngestionPipeline(
+            db,
+            data_dir=args.data_dir,
+            workers=args.workers,
+            embed_concurrency=args.embed_concurrency,
+            embed=not args.no_embed
+        )
+        return await pipeline.run()
+    finally:
+        db.close()
+
+
+def enqueue(args) -> dict:
+    """Upsert fundings and queue each new or changed document; workers do the rest"""
+    db = SessionLocal()
+    try:
+        pipeline = IngestionPipeline(db, data_dir=args.data_dir, embed=False)
+        job_service = IngestionJobService(db)
+        grants = pipeline.discover()
+
+        job_ids = set()
+        for funding_id, source_path, path, content_hash, _ in pipeline.changed_documents(grants):
+            job = job_service.enqueue(
+                funding_id,
+                source_path=source_path,
+                filename=os.path.basename(path),
+                content_hash=content_hash,
+                size=os.path.getsize(path)
+            )
+            job_ids.add(job.id)
+
+        pipeline.remove_orphan_chunks()
+        return {"fundings": len(grants), "jobs": len(job_ids), **pipeline.counters}
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.enqueue:
+        print("📬 Queueing changed documents...")
+        summary = enqueue(args)
+        print(
+            f"✅ Queued {summary['jobs']} documents across {summary['fundings']} fundings "
+            f"({summary['documents_unchanged']} unchanged, {summary['documents_removed']} removed)"
+        )
+        return
+
+    print("🚀 Starting ingestion...")
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.report}")
+
+    print("✅ Ingestion completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Serve the local Bedrock stand-in over HTTP, speaking the InvokeModel REST API,
+so separate processes (API workers, ingest.py, load tests) exercise the real
+boto3 client path without AWS. Point them at it with:
+
+    BEDROCK_ENDPOINT_URL=http://localhost:8001 AWS_ACCESS_KEY_ID=local AWS_SECRET_ACCESS_KEY=local
+
+Latency, streaming speed and throttling come from the LOCAL_BEDROCK_* variables
+(see app/services/bedrock_local.py) or the flags below.
+
+Usage:
+    python local_bedrock.py [--port 8001] [--chat-latency-ms 500] [--embed-latency-ms 40]
+                            [--tokens-per-second 80] [--throttle-rate 0.0]
+"""
+
+import argparse
+import asyncio
+import os
+
+import uvicorn
+from botocore.exceptions import ClientError
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.services.bedrock_local import LocalBedrock
+
+
+def create_app(backend: LocalBedrock) -> FastAPI:
+    app = FastAPI(title="Local Bedrock stand-in")
+
+    @app.post("/model/{model_id}/invoke")
+    async def invoke(model_id: str, request: Request):
+        body = await request.body()
+        try:
+            # Sleeps like the real service; off the loop so concurrent calls overlap
+            result = await asyncio.to_thread(backend.invoke_model, modelId=model_id, body=body)
+        except ClientError as e:
+            error = e.response["Error"]
+            return JSONResponse(
+                {"message": error["Message"]},
+                status_code=e.response["ResponseMetadata"]["HTTPStatusCode"],
+                headers={"x-amzn-ErrorType": error["Code"]}
+            )
+        return Response(result["body"].read(), media_type="application/json")
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local Bedrock stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--chat-latency-ms", type=float, help="Median time to first token")
+    parser.add_argument("--embed-latency-ms", type=float, help="Median embedding latency")
+    parser.add_argument("--tokens-per-second", type=float, help="Output speed after the first token (0 = instant)")
+    parser.add_argument("--throttle-rate", type=float, help="Share of calls failing with ThrottlingException")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    for flag, variable in [
+        ("chat_latency_ms", "LOCAL_BEDROCK_CHAT_LATENCY_MS"),
+        ("embed_latency_ms", "LOCAL_BEDROCK_EMBED_LATENCY_MS"),
+        ("tokens_per_second", "LOCAL_BEDROCK_TOKENS_PER_SECOND"),
+        ("throttle_rate", "LOCAL_BEDROCK_THROTTLE_RATE"),
+    ]:
+        if getattr(args, flag) is not None:
+            os.environ[variable] = str(getattr(args, flag))
+
+    print(f"🧪 Local Bedrock on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(LocalBedrock.from_env()), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
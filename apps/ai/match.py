@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Refresh company_grant_matches: every company's top-N active grants by profile
+similarity, after structured eligibility checks. Runs are incremental: only
+companies and grants whose updated_at moved since the last run are rescored.
+Schedule it (cron, EventBridge) after ingestion and onboarding batches.
+
+Usage:
+    python match.py [--full] [--top-n 20] [--block-size 2048] [--embed-concurrency 8] [--report match-report.json]
+"""
+
+import argparse
+import asyncio
+import json
+from app.db import SessionLocal
+from app.services.matching import GrantMatcher, TOP_N, BLOCK_SIZE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute company x grant matches")
+    parser.add_argument("--full", action="store_true", help="Rescore every company instead of only what changed")
+    parser.add_argument("--top-n", type=int, default=TOP_N, help="Matches kept per company")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="Companies scored per matrix product")
+    parser.add_argument("--embed-concurrency", type=int, default=8, help="Concurrent Bedrock calls for uncached profiles")
+    parser.add_argument("--report", default=None, help="Write the run report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    db = SessionLocal()
+    try:
+        matcher = GrantMatcher(db, top_n=args.top_n, block_size=args.block_size, concurrency=args.embed_concurrency)
+        return await matcher.refresh(full=args.full)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
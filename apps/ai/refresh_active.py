@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Refresh the is_active flags on fundings and funding_chunks: grants whose
+deadline has passed drop out of every hot query (and of the partial indexes
+they use). With --watch, sleeps until the next deadline boundary and
+refreshes again; schedule the one-shot form (cron, EventBridge) otherwise.
+
+Usage:
+    python refresh_active.py [--watch] [--max-sleep 3600]
+"""
+
+import argparse
+import time
+from datetime import datetime
+from app.db import SessionLocal
+from app.services.active_grants import ActiveGrantService
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Expire grants past their deadline")
+    parser.add_argument("--watch", action="store_true", help="Keep running, refreshing at each deadline boundary")
+    parser.add_argument("--max-sleep", type=float, default=3600, help="Longest wait between refreshes in --watch mode (new grants, extended deadlines)")
+    return parser.parse_args(argv)
+
+
+def refresh() -> dict:
+    db = SessionLocal()
+    try:
+        result = ActiveGrantService(db).refresh()
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    while True:
+        result = refresh()
+        print(f"✅ {result['fundings_changed']} fundings and {result['chunks_changed']} chunks changed state; next deadline: {result['next_boundary'] or 'none'}")
+        if not args.watch:
+            return
+
+        sleep_for = args.max_sleep
+        if result["next_boundary"] is not None:
+            # Deadlines are stored as naive UTC; wake just after the boundary
+            sleep_for = min(sleep_for, max((result["next_boundary"] - datetime.utcnow()).total_seconds() + 1, 1))
+        time.sleep(sleep_for)
+
+
+if __name__ == "__main__":
+    main()
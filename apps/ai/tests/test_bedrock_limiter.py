@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the shared Bedrock limiter: quota buckets, AIMD concurrency and retries within the deadline.
+"""
+
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.bedrock_limiter import (
+    BedrockLimiter,
+    LimitedBedrock,
+    LimiterTimeout,
+    ModelLimiter,
+    TokenBucket,
+    bedrock_deadline,
+)
+from app.services.bedrock_local import Latency, LocalBedrock
+
+
+class FlakyBackend:
+    """Throttles the first `failures` calls, then answers like Titan"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def invoke_model(self, modelId: str, body, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"},
+                               "ResponseMetadata": {"HTTPStatusCode": 429}}, "InvokeModel")
+        return {"body": io.BytesIO(json.dumps({"embedding": [1.0], "inputTextTokenCount": 3}).encode())}
+
+
+def test_token_bucket_refills_at_quota_rate():
+    bucket = TokenBucket(per_minute=60, burst_seconds=2)  # 1 per second, 2 banked
+    now = bucket.updated
+
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert abs(bucket.wait_time(1, now) - 1.0) < 1e-9
+    assert bucket.wait_time(1, now + 1) == 0
+    # A request larger than the bucket waits for a full bucket, then borrows
+    assert abs(bucket.wait_time(10, now + 1) - 1.0) < 1e-9
+
+
+def test_concurrency_is_aimd():
+    limiter = ModelLimiter("test-model", initial_concurrency=8, max_concurrency=16)
+    deadline = time.monotonic() + 1
+
+    for _ in range(3):
+        limiter.acquire(10, deadline)
+    limiter.release("throttled")
+    limiter.release("throttled")  # Same burst: cooldown keeps it from halving twice
+    assert limiter.limit == 4
+
+    limiter.release("ok")
+    assert limiter.limit == 4.25
+    assert limiter.in_flight == 0
+
+
+def test_full_limiter_times_out_at_deadline():
+    limiter = ModelLimiter("test-model", initial_concurrency=1)
+    limiter.acquire(10, time.monotonic() + 1)
+
+    started = time.monotonic()
+    try:
+        limiter.acquire(10, time.monotonic() + 0.05)
+    except LimiterTimeout:
+        assert time.monotonic() - started < 0.5
+    else:
+        raise AssertionError("expected LimiterTimeout")
+
+
+def test_throttles_are_retried():
+    backend = FlakyBackend(failures=2)
+    client = LimitedBedrock(backend, BedrockLimiter(quotas={}))
+
+    with bedrock_deadline(10):
+        response = client.invoke_model(modelId="titan", body=json.dumps({"inputText": "grants"}))
+
+    assert backend.calls == 3
+    assert json.loads(response["body"].read())["embedding"] == [1.0]
+
+
+def test_retries_stop_at_the_deadline():
+    backend = LocalBedrock(embed_latency=Latency(0), chat_latency=Latency(0), throttle_rate=1.0)
+    client = LimitedBedrock(backend, BedrockLimiter(quotas={}))
+
+    started = time.monotonic()
+    try:
+        with bedrock_deadline(0.3):
+            client.invoke_model(modelId="titan", body=json.dumps({"inputText": "grants"}))
+    except ClientError as e:
+        assert e.response["Error"]["Code"] == "ThrottlingException"
+    else:
+        raise AssertionError("expected ThrottlingException")
+    assert time.monotonic() - started < 0.3
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
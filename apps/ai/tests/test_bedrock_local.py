@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the local Bedrock stand-in against the services' own request/response handling.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.bedrock_local import Latency, LocalBedrock
+from app.services.embeddings import EmbeddingService
+
+
+def instant_backend(**kwargs) -> LocalBedrock:
+    return LocalBedrock(embed_latency=Latency(0), chat_latency=Latency(0), **kwargs)
+
+
+def test_embeddings_are_deterministic_unit_vectors():
+    service = EmbeddingService()
+    service.bedrock = instant_backend()
+
+    first = asyncio.run(service.generate_embedding("Digital Content Grant eligibility"))
+    again = asyncio.run(service.generate_embedding("Digital Content Grant eligibility"))
+    other = asyncio.run(service.generate_embedding("SME Automation and Digitalisation Facility"))
+
+    assert len(first) == service.dimensions
+    assert first == again
+    assert first != other
+    assert abs(sum(x * x for x in first) - 1) < 1e-9
+    assert service.usage.calls == 3
+
+
+def test_chat_reply_names_grants_from_tool_results():
+    body = json.dumps({
+        "messages": [{"role": "user", "content": [{"text": 'Tool Results: [{"title": "DCG Mini Grant"}, {"title": "MDXG"}]'}]}],
+        "inferenceConfig": {"maxTokens": 1000}
+    })
+
+    response = json.loads(instant_backend().invoke_model(modelId="amazon.nova-pro-v1:0", body=body)["body"].read())
+    reply = response["output"]["message"]["content"][0]["text"]
+
+    assert "DCG Mini Grant" in reply and "MDXG" in reply
+    assert response["usage"]["outputTokens"] > 0
+
+
+def test_streamed_reply_matches_invoke():
+    backend = instant_backend()
+    body = json.dumps({"messages": [{"role": "user", "content": [{"text": "hello"}]}]})
+
+    events = [json.loads(event["chunk"]["bytes"]) for event in backend.invoke_model_with_response_stream(modelId="nova", body=body)["body"]]
+    streamed = "".join(event["contentBlockDelta"]["delta"]["text"] for event in events if "contentBlockDelta" in event)
+    invoked = json.loads(backend.invoke_model(modelId="nova", body=body)["body"].read())
+
+    assert streamed == invoked["output"]["message"]["content"][0]["text"]
+
+
+def test_throttling_raises_client_error():
+    backend = instant_backend(throttle_rate=1.0)
+
+    try:
+        backend.invoke_model(modelId="nova", body=json.dumps({"inputText": "x"}))
+    except ClientError as e:
+        assert e.response["Error"]["Code"] == "ThrottlingException"
+    else:
+        raise AssertionError("expected ThrottlingException")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
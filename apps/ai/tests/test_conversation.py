@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test that chat prompt context stays within its token budget, and when the summary is updated.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.conversation import ConversationSummarizer, EXCHANGE_TOKENS, SUMMARY_TOKENS, SUMMARY_TRIGGER_TOKENS
+from app.services.tokenizer import get_tokenizer
+
+
+class StoredMessages(ConversationSummarizer):
+    """Summarizer over an in-memory message list instead of chat_messages"""
+
+    def __init__(self, messages):
+        super().__init__(db=None)
+        self.messages = messages
+
+    def latest_messages(self, session_id, limit):
+        return self.messages[-limit:]
+
+    def _unsummarized(self, session):
+        folded = session.summary_message_id or 0
+        return [message for message in self.messages[:-2] if message.id > folded]
+
+
+def message(id: int, role: str, words: int) -> SimpleNamespace:
+    return SimpleNamespace(id=id, role=role, content=" ".join(f"word{i}" for i in range(words)))
+
+
+def test_truncate_respects_budget():
+    tokenizer = get_tokenizer()
+    text = "Eligible SMEs may apply for matching grants. " * 200
+
+    truncated = tokenizer.truncate(text, 50)
+
+    assert tokenizer.count(truncated) <= 50
+    assert text.startswith(truncated[:-2])
+    assert tokenizer.truncate("short text", 50) == "short text"
+
+
+def test_context_is_bounded_however_long_the_chat():
+    tokenizer = get_tokenizer()
+    history = [message(i, "user" if i % 2 == 0 else "assistant", 2000) for i in range(1, 200)]
+    current = message(200, "user", 10)
+    summarizer = StoredMessages(history + [current])
+    session = SimpleNamespace(id="s1", summary="earlier " * 5000, summary_message_id=197)
+
+    context = summarizer.build_context(session, current_message_id=current.id)
+
+    assert [m["role"] for m in context["exchange"]] == ["user", "assistant"]
+    assert tokenizer.count(context["summary"]) <= SUMMARY_TOKENS
+    assert sum(tokenizer.count(m["content"]) for m in context["exchange"]) <= EXCHANGE_TOKENS
+
+
+def test_unsummarized_messages_are_carried_within_budget():
+    tokenizer = get_tokenizer()
+    history = [message(i, "user" if i % 2 == 0 else "assistant", 2000) for i in range(1, 200)]
+    current = message(200, "user", 10)
+    session = SimpleNamespace(id="s1", summary="earlier", summary_message_id=180)
+
+    context = StoredMessages(history + [current]).build_context(session, current_message_id=current.id)
+
+    exchange = context["exchange"]
+    assert len(exchange) > 2
+    assert exchange[-1]["role"] == "assistant"
+    assert sum(tokenizer.count(m["content"]) for m in exchange) <= SUMMARY_TRIGGER_TOKENS + EXCHANGE_TOKENS
+
+
+def test_summary_is_due_only_past_the_trigger():
+    short = [message(i, "user" if i % 2 == 1 else "assistant", 20) for i in range(1, 5)]
+    long = [message(i, "user" if i % 2 == 1 else "assistant", 2000) for i in range(1, 5)]
+
+    assert not StoredMessages(short).is_due(SimpleNamespace(id="s1", summary_message_id=None))
+    assert StoredMessages(long).is_due(SimpleNamespace(id="s1", summary_message_id=None))
+    assert not StoredMessages(long).is_due(SimpleNamespace(id="s1", summary_message_id=2))
+
+
+def test_first_turn_has_no_context():
+    current = message(1, "user", 10)
+    context = StoredMessages([current]).build_context(
+        SimpleNamespace(id="s1", summary=None, summary_message_id=None), current_message_id=1
+    )
+
+    assert context == {"summary": "", "exchange": []}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test page-streaming extraction and token-bounded chunking.
+"""
+
+import sys
+from pathlib import Path
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.document_processor import DocumentProcessor
+from app.services.extractors import iter_docx_sections, iter_html_sections
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def sentences(count: int, words: int = 12) -> str:
+    return " ".join(
+        f"Sentence {i} " + " ".join(f"word{j}" for j in range(words)) + "."
+        for i in range(count)
+    )
+
+
+def test_pdf_pages_are_numbered_in_order():
+    processor = DocumentProcessor()
+    pages = list(processor.iter_pdf_pages(DATA_DIR / "PTF" / "relevant_docs" / "ptf_faq_en_v2.pdf"))
+
+    assert [page_no for page_no, _ in pages] == list(range(1, len(pages) + 1))
+    assert all(text.strip() for _, text in pages)
+
+
+def test_scanned_pages_are_listed_and_take_ocr_text():
+    processor = DocumentProcessor()
+    deck = next((DATA_DIR / "DCG PRIME" / "relevant_docs").glob("*.pdf"))
+
+    scanned = {}
+    pages = list(processor.iter_pdf_pages(deck, scanned_pages=scanned))
+    assert list(scanned) == [len(pages)]
+
+    ocr_text = "Thank you for attending the briefing."
+    pages = list(processor.iter_pdf_pages(deck, ocr_texts={len(pages): ocr_text}))
+    assert pages[-1] == (len(pages), ocr_text)
+
+
+def test_docx_sections_split_at_headings(tmp_path):
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph("Digital Grant Guidelines", style="Title")
+    document.add_paragraph("Applicants must be Malaysian SMEs.")
+    document.add_heading("Eligible Costs", level=1)
+    document.add_paragraph("Software subscriptions are covered.")
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Item"
+    table.rows[0].cells[1].text = "Cap"
+    path = tmp_path / "guidelines.docx"
+    document.save(path)
+
+    sections = list(iter_docx_sections(str(path)))
+    assert [section_no for section_no, _ in sections] == [1, 2]
+    assert sections[0][1] == "Digital Grant Guidelines\nApplicants must be Malaysian SMEs."
+    assert sections[1][1] == "Eligible Costs\nSoftware subscriptions are covered.\nItem | Cap"
+
+
+def test_html_sections_skip_scripts_and_split_at_headings(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_text(
+        "<html><head><title>x</title><script>var a = 1;</script></head><body>"
+        "<h1>Tourism Fund</h1><p>Loans for <b>tourism</b> SMEs.</p>"
+        "<h2>Eligibility</h2><ul><li>Licensed operators</li><li>Homestays</li></ul>"
+        "</body></html>",
+        encoding="utf-8"
+    )
+
+    sections = list(iter_html_sections(str(path)))
+    assert sections == [
+        (1, "Tourism Fund\nLoans for tourism SMEs."),
+        (2, "Eligibility\nLicensed operators\nHomestays")
+    ]
+
+
+def test_chunks_respect_max_tokens():
+    processor = DocumentProcessor(max_tokens=100, min_tokens=20, overlap_tokens=0)
+    chunks = processor.chunk_text(sentences(200))
+
+    assert len(chunks) > 1
+    assert all(processor.tokenizer.count(chunk) <= 100 for chunk in chunks)
+
+
+def test_size_split_carries_overlap():
+    processor = DocumentProcessor(max_tokens=100, min_tokens=20, overlap_tokens=40)
+    chunks = processor.chunk_text(sentences(50))
+
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit("Sentence ", 1)[1]
+        assert current.startswith("Sentence " + last_sentence)
+
+
+def test_chunks_start_on_their_own_page():
+    processor = DocumentProcessor(max_tokens=100, min_tokens=20, overlap_tokens=0)
+    pages = [(1, sentences(3)), (2, sentences(3)), (3, "Short.")]
+    chunks = list(processor.chunk_pages(pages))
+
+    assert [page_no for page_no, _ in chunks] == [1, 2, 3]
+
+
+def test_short_page_merges_into_next():
+    processor = DocumentProcessor(max_tokens=100, min_tokens=20, overlap_tokens=0)
+    chunks = list(processor.chunk_pages([(1, "Intro."), (2, sentences(3))]))
+
+    assert len(chunks) == 1
+    assert chunks[0][0] == 1
+
+
+def test_heading_starts_new_chunk():
+    processor = DocumentProcessor(max_tokens=500, min_tokens=20, overlap_tokens=0)
+    text = sentences(5) + "\nELIGIBILITY CRITERIA\n" + sentences(5)
+    chunks = processor.chunk_text(text)
+
+    assert len(chunks) == 2
+    assert chunks[1].startswith("ELIGIBILITY CRITERIA")
+
+
+if __name__ == "__main__":
+    import inspect
+    import tempfile
+
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            if "tmp_path" in inspect.signature(test).parameters:
+                with tempfile.TemporaryDirectory() as tmp:
+                    test(Path(tmp))
+            else:
+                test()
+            print(f"✓ {name}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test structured eligibility extraction from grant metadata.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.eligibility import extract_criteria, sector_tags
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def load_metadata(grant_dir: str) -> dict:
+    return json.loads(next((DATA_DIR / grant_dir / "metadata").glob("*.json")).read_text())
+
+
+def test_revenue_cap_and_malaysian_equity():
+    metadata = load_metadata("DCG MINI")
+    criteria = extract_criteria(metadata["sector"], metadata["eligibility"])
+
+    assert criteria["max_revenue"] == 3_000_000
+    assert criteria["malaysian_owned"] is True
+    assert "creative" in criteria["sectors"]
+
+
+def test_foreign_route_is_not_an_ownership_requirement():
+    criteria = extract_criteria(
+        "Technology Export",
+        "Local-owned: ≥51% Malaysian equity; Foreign-majority: HQ in Malaysia, min share capital RM500k."
+    )
+
+    assert criteria["malaysian_owned"] is False
+    assert criteria["sectors"] == ["technology"]
+
+
+def test_all_sectors_leaves_sectors_open():
+    criteria = extract_criteria(
+        "SME Financing, Sustainability",
+        "SMEs in all sectors committed to low carbon and sustainable operations."
+    )
+
+    assert criteria["sectors"] is None
+
+
+def test_employee_cap_and_minimum_amount():
+    criteria = extract_criteria(
+        "Manufacturing",
+        "Sales turnover not exceeding RM50 million or not more than 200 full-time employees. "
+        "Minimum financing amount of RM100,000."
+    )
+
+    assert criteria["max_revenue"] == 50_000_000
+    assert criteria["max_employees"] == 200
+    assert criteria["min_amount"] == 100_000
+
+
+def test_funding_purposes_are_not_sectors():
+    assert sector_tags("SME Financing, Automation, Digitalisation") == []
+    assert sector_tags("Tourism & Hospitality") == ["tourism"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
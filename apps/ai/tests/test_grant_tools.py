@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the grant search tools against an in-memory database.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import ARRAY, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.models import Base, CompanyGrantMatch, Funding, FundingChunk, FundingChunkLink, IngestionManifest
+from app.services.grant_tools import GrantTools
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_text(type_, compiler, **kw):
+    # SQLite has no arrays; the tools under test never read these columns
+    return "TEXT"
+
+
+def seeded_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Funding.__table__, IngestionManifest.__table__, FundingChunk.__table__, FundingChunkLink.__table__,
+        CompanyGrantMatch.__table__
+    ])
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+
+    def funding(id, title, is_active=True):
+        return Funding(id=id, title=title, description="Digital content grant", is_active=is_active,
+                       malaysian_owned=False, created_at=now, updated_at=now)
+
+    db.add_all([
+        funding(1, "Digital Content Grant (DCG) – Mini Grant"),
+        funding(2, "Digital Content Grant (DCG) – Prime Grant"),
+        funding(3, "Digital Content Grant 2019", is_active=False),
+        FundingChunk(id=10, chunk_text="Ceiling Amount : RM300,000", content_hash="a" * 64, is_active=True,
+                     created_at=now, updated_at=now),
+        FundingChunkLink(funding_id=1, chunk_id=10, page_no=4),
+        *(CompanyGrantMatch(company_id=7, funding_id=funding_id, score=score, rank=rank, computed_at=now)
+          for rank, (funding_id, score) in enumerate([(3, 0.9), (2, 0.8), (1, 0.7)], 1)),
+    ])
+    db.commit()
+    return db
+
+
+def test_search_grants_with_chunks_includes_document_content():
+    results = GrantTools(seeded_session()).search_grants_with_chunks("digital content")
+
+    assert [grant["id"] for grant in results] == [1, 2]
+    assert results[0]["detailed_content"] == [{"text": "Ceiling Amount : RM300,000", "page": 4}]
+    assert results[1]["total_chunks"] == 0
+
+
+def test_search_grants_with_chunks_limited_to_eligible_grants():
+    results = GrantTools(seeded_session()).search_grants_with_chunks("digital content", grant_ids=[2, 3])
+
+    assert [grant["id"] for grant in results] == [2]
+
+
+
+def test_matched_grants_skip_grants_expired_since_the_refresh():
+    results = GrantTools(seeded_session()).get_matched_grants(7)
+
+    assert [(grant["id"], grant["match_score"]) for grant in results] == [(2, 0.8), (1, 0.7)]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
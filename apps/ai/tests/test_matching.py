@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the vectorised company x grant scoring used by match.py.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.matching import GrantMatrix, eligibility_mask, sector_mask, top_matches
+
+
+def grants(max_employees, max_revenue, sectors) -> GrantMatrix:
+    count = len(sectors)
+    return GrantMatrix(
+        range(1, count + 1),
+        np.eye(count, 4),
+        [np.nan if cap is None else cap for cap in max_employees],
+        [np.nan if cap is None else cap for cap in max_revenue],
+        [sector_mask(tags) for tags in sectors],
+        [datetime(2026, 1, 1)] * count
+    )
+
+
+def test_unknown_values_never_exclude():
+    matrix = grants([50, None], [None, 3_000_000], [["tourism"], None])
+    mask = eligibility_mask(
+        np.array([np.nan, 100, 10]),
+        np.array([np.nan, np.nan, 5_000_000]),
+        np.array([0, sector_mask(["tourism"]), sector_mask(["technology"])]),
+        matrix
+    )
+
+    assert mask.tolist() == [
+        [True, True],    # Nothing known about the company
+        [False, True],   # Too many employees for grant 1
+        [False, False],  # Wrong sector for grant 1, revenue over grant 2's cap
+    ]
+
+
+def test_top_matches_skips_ineligible_and_sorts():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7]], dtype=np.float32)
+    mask = np.array([[True, False, True, True]])
+    columns, best = top_matches(scores, mask, top_n=3)
+
+    assert columns.tolist() == [[3, 2, 0]]
+    assert np.allclose(best, [[0.7, 0.5, 0.1]])
+
+
+def test_top_matches_pads_with_negative_infinity():
+    scores = np.array([[0.3, 0.8]], dtype=np.float32)
+    mask = np.array([[False, True]])
+    columns, best = top_matches(scores, mask, top_n=5)
+
+    assert columns.shape == (1, 2)
+    assert best[0, 0] == np.float32(0.8)
+    assert np.isneginf(best[0, 1])
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus exposition and SQL instrumentation.
+"""
+
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.metrics import Counter, Histogram, RequestStats, _request_stats, instrument_engine
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Test latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, route="/chat/")
+
+    samples = histogram.samples()
+
+    assert 'latency_seconds_bucket{route="/chat/",le="0.1"} 1' in samples
+    assert 'latency_seconds_bucket{route="/chat/",le="1"} 3' in samples
+    assert 'latency_seconds_bucket{route="/chat/",le="+Inf"} 4' in samples
+    assert 'latency_seconds_count{route="/chat/"} 4' in samples
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("errors_total", "Test errors", ("model",))
+    counter.inc(model='nova "pro"')
+    counter.inc(2, model='nova "pro"')
+
+    assert counter.render().splitlines()[-1] == 'errors_total{model="nova \\"pro\\""} 3'
+
+
+def test_queries_counted_per_request():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("select 1"))
+            try:
+                connection.execute(text("select missing_column"))
+            except Exception:
+                pass
+            connection.execute(text("select 2"))
+            assert connection.info["query_started"] == []
+    finally:
+        _request_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.query_seconds > 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
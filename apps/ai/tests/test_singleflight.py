@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test coalescing of identical in-flight calls.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.bedrock_local import Latency, LocalBedrock
+from app.services.chat_tools import ToolBasedChatService
+from app.services.embeddings import EmbeddingService
+from app.utils.singleflight import SingleFlight, flight_key
+
+
+def test_identical_calls_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def main():
+        results = await asyncio.gather(
+            *(flight.do(flight_key("q", "what grants  are available?"), lambda: call(1)) for _ in range(5)),
+            flight.do(flight_key("q", "something else"), lambda: call(2))
+        )
+        assert len(flight) == 0
+        # Finished calls are not cached
+        again = await flight.do(flight_key("q", "what grants are available?"), lambda: call(3))
+        return results, again
+
+    results, again = asyncio.run(main())
+
+    assert [result for result, _ in results] == [2, 2, 2, 2, 2, 4]
+    assert [shared for _, shared in results] == [False, True, True, True, True, False]
+    assert calls == [1, 2, 3]
+    assert again == (6, False)
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("ThrottlingException")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight("test")
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "reply"
+
+    async def main():
+        first = asyncio.create_task(flight.do("key", call))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("key", call))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == ("reply", True)
+
+
+def test_concurrent_embeddings_make_one_bedrock_call():
+    backend = LocalBedrock(embed_latency=Latency(20, sigma=0), chat_latency=Latency(0))
+    services = [EmbeddingService() for _ in range(10)]
+    for service in services:
+        service.bedrock = backend
+
+    async def main():
+        return await asyncio.gather(*(
+            service.generate_embedding("Which grants fit a digital content studio?") for service in services
+        ))
+
+    embeddings = asyncio.run(main())
+
+    assert all(embedding == embeddings[0] for embedding in embeddings)
+    assert sum(service.usage.calls for service in services) == 1
+
+
+class CountingBedrock(LocalBedrock):
+    def __init__(self):
+        super().__init__(embed_latency=Latency(0), chat_latency=Latency(50, sigma=0))
+        self.calls = 0
+
+    def invoke_model(self, modelId: str, body, **kwargs):
+        self.calls += 1
+        return super().invoke_model(modelId, body, **kwargs)
+
+
+class NewSessions:
+    """Just enough of a Session for a first turn: every chat session exists and is empty"""
+
+    def get(self, model, session_id):
+        return SimpleNamespace(id=session_id, summary=None, summary_message_id=None)
+
+
+def chat_service(backend: CountingBedrock, history=()) -> ToolBasedChatService:
+    service = ToolBasedChatService(NewSessions())
+    service.bedrock = backend
+    service.summarizer.latest_messages = lambda session_id, limit: list(history)
+    return service
+
+
+def test_identical_chat_prompts_from_different_sessions_share_one_call():
+    backend = CountingBedrock()
+    company = SimpleNamespace(id=1, company_name="Studio Satu", sector="Creative", employees=12)
+    earlier = [SimpleNamespace(id=1, role="assistant", content="Digital Content Grant fits your studio.")]
+    services = [chat_service(backend), chat_service(backend), chat_service(backend, history=earlier)]
+
+    async def main():
+        return await asyncio.gather(*(
+            service.generate_response_with_tools("sure", company, f"session-{i}")
+            for i, service in enumerate(services)
+        ))
+
+    replies = asyncio.run(main())
+
+    # Coalescing is exact-duplicate only: the third session's history makes its prompt different
+    assert backend.calls == 2
+    assert replies[0] == replies[1]
+    assert sorted(service.last_usage["input_tokens"] is None for service in services[:2]) == [False, True]
+    assert services[2].last_usage["input_tokens"] is not None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
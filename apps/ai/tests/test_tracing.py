@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test request tracing: nested spans, Server-Timing header and export.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add apps/ai to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.tracing import TracingMiddleware, Trace, span
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+async def traced_app(scope, receive, send):
+    with span("auth"):
+        time.sleep(0.002)
+    with span("tools") as tools:
+        tools.set("tool", "search_grants")
+        with span("embed"):
+            pass
+    with span("persist"):
+        pass
+    with span("persist"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(app):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app({"type": "http", "method": "POST", "path": "/chat/"}, receive, send))
+    return messages
+
+
+def test_server_timing_lists_top_level_spans():
+    exporter = CollectingExporter()
+    messages = call(TracingMiddleware(traced_app, exporter=exporter))
+
+    headers = dict(messages[0]["headers"])
+    timing = headers[b"server-timing"].decode()
+    names = [entry.split(";")[0] for entry in timing.split(", ")]
+
+    assert names == ["auth", "tools", "persist", "total"]  # Repeated names summed, children left out
+    assert float(timing.split(", ")[0].split("dur=")[1]) >= 2
+
+
+def test_trace_exported_with_nested_spans():
+    exporter = CollectingExporter()
+    call(TracingMiddleware(traced_app, exporter=exporter))
+
+    exported = exporter.traces[0].to_dict()
+    spans = {s["name"]: s for s in exported["spans"]}
+
+    assert exported["name"] == "POST /chat/"
+    assert exported["status"] == 200
+    assert spans["embed"]["parent"] == "tools"
+    assert spans["tools"]["tool"] == "search_grants"
+    assert len(exported["spans"]) == 5
+
+
+def test_span_outside_request_is_inert():
+    with span("llm") as llm:
+        llm.set("input_tokens", 10)
+
+    assert llm.end is not None
+    assert Trace("x").spans == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Drain the ingestion_jobs queue. Run as many of these as you like, on as many
+machines as you like: jobs are claimed with FOR UPDATE SKIP LOCKED and leased
+for --visibility-timeout seconds, so a crashed worker's job is retried elsewhere.
+
+Usage:
+    python worker.py [--drain] [--max-jobs N] [--poll-interval 5] [--visibility-timeout 300] [--data-dir data]
+"""
+
+import argparse
+import asyncio
+from app.db import SessionLocal
+from app.services.ingestion_jobs import IngestionJobService, VISIBILITY_TIMEOUT_SECONDS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process queued ingestion jobs")
+    parser.add_argument("--data-dir", default="data", help="Catalog root for catalog jobs (same layout on every node)")
+    parser.add_argument("--drain", action="store_true", help="Exit once no job is claimable instead of polling")
+    parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between polls of an empty queue")
+    parser.add_argument("--visibility-timeout", type=int, default=VISIBILITY_TIMEOUT_SECONDS, help="Lease length in seconds")
+    parser.add_argument("--worker-id", default=None, help="Name recorded in locked_by (default: host:pid)")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    db = SessionLocal()
+    try:
+        job_service = IngestionJobService(db, worker_id=args.worker_id, visibility_seconds=args.visibility_timeout)
+        print(f"👷 Worker {job_service.worker_id} started")
+        return await job_service.work(
+            data_dir=args.data_dir,
+            drain=args.drain,
+            max_jobs=args.max_jobs,
+            poll_interval=args.poll_interval
+        )
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = asyncio.run(run(args))
+    print(f"✅ Worker finished: {counts['succeeded']} succeeded, {counts['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()